@@ -5,21 +5,25 @@ from flask import Flask
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 
 import os
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 import argparse
 from datetime import date, timedelta
 import json
+import sys
+import time
+import subprocess
 
 from nbp import create_app
 from nbp.models import db, Entity
 from nbp.services.stats import recompute_all_florida
 
-def _chunks(seq, n):
-    for i in range(0, len(seq), n):
-        yield seq[i:i+n]
-
-def _upsert_entities(rows, dry_run: bool) -> int:
-    """Upsert a list of entity dicts. Returns number of inserts."""
+def _upsert_entities(rows, dry_run: bool, strict: bool = False, verified_at: datetime = None) -> int:
+    """
+    Upsert a list of entity dicts. Returns number of inserts.
+    strict=True re-raises a failed commit (after rollback) instead of logging it.
+    verified_at is stamped on every row only when the rows come from a live
+    detail fetch; bulk and archive loads leave it unset.
+    """
     inserted = 0
     if dry_run:
         return inserted
@@ -33,6 +37,7 @@ def _upsert_entities(rows, dry_run: bool) -> int:
 
     batch_size = int(os.getenv("NBP_FLUSH_EVERY", "300"))
     counter = 0
+    by_doc = {}  # this commit batch's entities, loaded with one IN query
 
     for rec in rows:
         rec["name"] = (rec.get("name") or "")[:255]
@@ -42,8 +47,13 @@ def _upsert_entities(rows, dry_run: bool) -> int:
             rec["last_event"] = rec["last_event"][:100]
         if rec.get("doc_number"):
             rec["doc_number"] = rec["doc_number"][:100]
+        if rec.get("status"):
+            rec["status"] = rec["status"][:50]
 
-        existing = Entity.query.filter_by(doc_number=rec["doc_number"]).first()
+        if counter % batch_size == 0:
+            upcoming = {(r.get("doc_number") or "")[:100] for r in rows[counter:counter + batch_size]}
+            by_doc = {e.doc_number: e for e in Entity.query.filter(Entity.doc_number.in_(upcoming))}
+        existing = by_doc.get(rec["doc_number"])
 
         if "officers_json" not in rec and "officers" in rec:
             rec["officers_json"] = _officers_to_json(rec["officers"])
@@ -53,21 +63,21 @@ def _upsert_entities(rows, dry_run: bool) -> int:
             "registered_agent","principal_address","mailing_address",
             "fei_ein","effective_date","last_event","event_date_filed",
             "event_effective_date","registered_agent_address","officers_json",
+            "status",
         )
 
         if existing:
-            changed = False
             for k in update_keys:
                 if k not in rec: 
                     continue
                 v = rec.get(k)
                 if v is not None and getattr(existing, k) != v:
                     setattr(existing, k, v)
-                    changed = True
-            if changed:
-                db.session.add(existing)
+            if verified_at is not None:
+                existing.verified_at = verified_at
+            db.session.add(existing)
         else:
-            db.session.add(Entity(
+            existing = Entity(
                 name=rec.get("name") or "",
                 entity_type=rec.get("entity_type"),
                 filing_date=rec.get("filing_date") or date.today(),
@@ -85,7 +95,11 @@ def _upsert_entities(rows, dry_run: bool) -> int:
                 registered_agent_address=rec.get("registered_agent_address") or None,
                 officers_json=rec.get("officers_json") or _officers_to_json(rec.get("officers")),
                 doc_number=(rec.get("doc_number") or "")[:100],
-            ))
+                status=rec.get("status") or None,
+                verified_at=verified_at,
+            )
+            db.session.add(existing)
+            by_doc[existing.doc_number] = existing  # a repeat later in the batch updates it
             inserted += 1
 
         counter += 1
@@ -96,6 +110,8 @@ def _upsert_entities(rows, dry_run: bool) -> int:
             except Exception as e:
                 db.session.rollback()
                 print(f"[sunbiz] batch commit failed at {counter}: {e}")
+                if strict:
+                    raise
 
     # final flush
     if counter % batch_size != 0:
@@ -105,14 +121,153 @@ def _upsert_entities(rows, dry_run: bool) -> int:
         except Exception as e:
             db.session.rollback()
             print(f"[sunbiz] final commit failed: {e}")
+            if strict:
+                raise
 
     return inserted
 
-def run_all(bootstrap=False):
+def _checkpoint_writer(run_id, checkpoints, dry_run):
+    """
+    write(rows, marks) for run_pipeline and the stream ingester, plus the
+    running {"seen", "inserted"} totals it keeps. `checkpoints` is updated in place.
+    """
+    from nbp.services.checkpoints import save_checkpoint
+    from nbp.services.work_units import record_prefix_pages
+    from nbp.services import crawl_metrics as metrics
+
+    totals = {"seen": 0, "inserted": 0}
+
+    def write(rows, marks):
+        # Runs in the caller's thread only; the batch is committed before any checkpoint moves,
+        # so a resume never skips unsaved rows.
+        t0 = time.monotonic()
+        totals["inserted"] += _upsert_entities(rows, dry_run, strict=True,
+                                              verified_at=datetime.utcnow())
+        totals["seen"] += len(rows)
+        metrics.inc("db_rows", len(rows))
+        for prefix, m in marks.items():
+            cp = checkpoints.setdefault(prefix, {"page": 0})
+            cp["page"] = max(cp["page"], m["page"])
+            if m["last_row"]:
+                cp["last_name"], cp["last_doc"] = m["last_row"].get("name"), m["last_row"].get("doc")
+            cp["done"] = cp.get("done") or m["done"]
+            cp["rows_kept"] = cp.get("rows_kept", 0) + m["rows"]
+            if not dry_run:
+                save_checkpoint(run_id, prefix, m["page"], m["last_row"], m["rows"], m["done"])
+                if m["done"] and cp["page"]:
+                    record_prefix_pages(prefix, cp["page"], cp["rows_kept"])
+            if m["done"]:
+                print(f"[sunbiz][{prefix}] finished")
+        metrics.observe("db_write_seconds", time.monotonic() - t0)
+        print(f"[sunbiz] cumulative seen={totals['seen']} inserted={totals['inserted']}")
+
+    return write, totals
+
+def _crawl_engine(use_browser):
+    """(engine name, fetch_recent) for this process; also loads the known-docs skip set."""
+    from nbp.services.scrape_sunbiz_playwright import set_known_docs
+
+    # skip detail pages of docs we verified recently (NBP_SKIP_KNOWN=0 to open everything)
+    if os.getenv("NBP_SKIP_KNOWN", "1") == "1":
+        from nbp.services.known_docs import load_known_docs
+        known = load_known_docs()
+        set_known_docs(known)
+        print(f"[sunbiz] known docs loaded: {len(known)}")
+
+    if use_browser:
+        from nbp.services.scrape_sunbiz_playwright import (
+            fetch_recent_by_name_prefixes_async,
+            fetch_recent_by_name_prefixes_parallel,
+        )
+
+        # async = one shared Chromium with a page budget; process = legacy browser-per-prefix
+        engine = os.getenv("NBP_ENGINE", "async")
+        return engine, (fetch_recent_by_name_prefixes_async if engine == "async"
+                        else fetch_recent_by_name_prefixes_parallel)
+
+    # plain HTTP: pooled keep-alive sessions, no Chromium
+    from nbp.services.scrape_sunbiz_http import fetch_recent_by_name_prefixes_http
+
+    return "http", fetch_recent_by_name_prefixes_http
+
+def _crawl_plan(bootstrap, checkpoints):
+    """(work units, longest first; concurrency; window_days) for a run."""
+    from nbp.services.work_units import (
+        load_prefix_pages, load_prefix_durations, plan_work_units, estimate_seconds, order_longest_first,
+    )
+
+    prefixes_env = os.getenv("NBP_PREFIXES", "")
+    if prefixes_env.strip():
+        prefixes = [p.strip() for p in prefixes_env.split(",") if p.strip()]
+    else:
+        prefixes = list("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+    concurrency = int(os.getenv("NBP_CONCURRENCY", "2"))  # be polite by default
+    page_counts = load_prefix_pages()
+
+    # split hot letters into sub-prefix units using page counts from earlier runs
+    if os.getenv("NBP_SPLIT_PREFIXES", "1") == "1":
+        top_level = len(prefixes)
+        prefixes = plan_work_units(prefixes, page_counts, concurrency=concurrency,
+                                   pinned=checkpoints.keys())
+        if len(prefixes) != top_level:
+            print(f"[sunbiz] split {top_level} prefixes into {len(prefixes)} work units")
+
+    # longest first: workers pull the next unit as they free up, so the run ends
+    # near total work / workers instead of behind one late-started long unit
+    est = estimate_seconds(prefixes, load_prefix_durations(), page_counts)
+    prefixes = order_longest_first(prefixes, est)
+    if est:
+        total = sum(est.values())
+        print(f"[sunbiz] longest-first: ~{total:.0f}s of work, ~{max(total / concurrency, max(est.values())):.0f}s "
+              f"makespan on {concurrency} workers (longest unit {prefixes[0]} ~{est[prefixes[0]]:.0f}s)")
+
+    window_days = (90 if bootstrap else int(os.getenv("NBP_WINDOW_DAYS", "90")))
+    return prefixes, concurrency, window_days
+
+def _crawl_via_spool(crawl, write, run_id):
+    """
+    crawl(on_page) appends pages to the run's on-disk spool; unless
+    NBP_SPOOL_INGEST=0, this thread tails it into write() meanwhile. A failed
+    write stops the ingest, not the crawl: the rest keeps spooling for
+    --ingest-spool (or --resume) to replay.
+    """
+    import threading
+    from nbp.services.pipeline import WRITE_BATCH
+    from nbp.services.spool import SPOOL_DIR, SpoolWriter, ingest_spool
+
+    spool = SpoolWriter(SPOOL_DIR, run_id)
+
+    def _produce():
+        try:
+            crawl(spool.on_page)
+        finally:
+            spool.close()
+
+    if os.getenv("NBP_SPOOL_INGEST", "1") != "1":
+        _produce()
+        print(f"[spool] crawl spooled {spool.pages} pages / {spool.rows} rows; load them with --ingest-spool {run_id}")
+        return
+
+    t = threading.Thread(target=_produce, name="crawl-spool", daemon=True)
+    t.start()
+    try:
+        # the crawl thread always closes the spool, so tail until CLOSED however long a page takes
+        stats = ingest_spool(SPOOL_DIR, run_id, write, batch_size=WRITE_BATCH, idle_exit_s=float("inf"))
+    except Exception:
+        print(f"[spool] DB write failed; crawl continues into the spool (replay with --ingest-spool {run_id})")
+        t.join()
+        raise
+    t.join()
+    print("[spool] ingested", stats)
+
+def run_all(bootstrap=False, resume=None):
     """
     Run the Sunbiz ingestion + stats recompute.
     - bootstrap=True: scrape last 60 days (initial backfill)
     - bootstrap=False: scrape the last N days (default 1)
+    - resume: run_id (or "latest") of an interrupted run; finished prefixes
+      are skipped and the rest continue from their last completed page
     """
     app = create_app()
     with app.app_context():
@@ -126,60 +281,79 @@ def run_all(bootstrap=False):
             days_back = int(os.getenv("NBP_DAYS_BACK", "1"))
             target_dates = {date.today() - timedelta(days=i) for i in range(days_back)}
 
+        from nbp.services.checkpoints import new_run_id, latest_unfinished_run, load_checkpoints
+        from nbp.services.pipeline import run_pipeline, PipelineStopped, WRITE_BATCH
+        from nbp.services.spool import SPOOL_DIR, ingest_spool, pending as spool_pending
+        from nbp.services import crawl_metrics as metrics
+
+        metrics.reset()
+
+        run_id = resume
+        if run_id == "latest":
+            run_id = latest_unfinished_run()
+        run_id = run_id or os.getenv("NBP_RUN_ID") or new_run_id(bootstrap)
+        checkpoints = load_checkpoints(run_id)
+
         print("[sunbiz] starting", {
             "bootstrap": bootstrap,
             "days_back": days_back,
             "dry_run": dry_run,
-            "browser": use_browser
+            "browser": use_browser,
+            "run_id": run_id,
+            "resumed_prefixes": len(checkpoints),
         })
 
-        total_seen = 0
-        total_inserted = 0
+        write, totals = _checkpoint_writer(run_id, checkpoints, dry_run)
 
-        if use_browser:
-            from nbp.services.scrape_sunbiz_playwright import fetch_recent_by_name_prefixes_parallel
+        # pages crawled before a crash but never committed: into the DB (and checkpoints) first
+        if SPOOL_DIR and spool_pending(SPOOL_DIR, run_id):
+            print(f"[spool] replaying uncommitted pages of {run_id}")
+            ingest_spool(SPOOL_DIR, run_id, write, batch_size=WRITE_BATCH, follow=False)
 
-            prefixes_env = os.getenv("NBP_PREFIXES", "")
-            if prefixes_env.strip():
-                prefixes = [p.strip() for p in prefixes_env.split(",") if p.strip()]
+        from nbp.services.scrape_sunbiz_playwright import SKIP_COUNTS
+        from nbp.services.rate_control import get_controller
+
+        rate = get_controller()  # shared by every worker; NBP_RATE_CONTROL=0 restores fixed sleeps
+        engine, fetch_recent = _crawl_engine(use_browser)
+
+        prefixes, concurrency, window_days = _crawl_plan(bootstrap, checkpoints)
+        print(f"[sunbiz] crawl plan: prefixes={len(prefixes)} window_days={window_days} concurrency={concurrency} engine={engine}")
+
+        todo = [p for p in prefixes if not checkpoints.get(p, {}).get("done")]
+        resumed = {p for p in todo if checkpoints.get(p, {}).get("page")}
+
+        def crawl(on_page):
+            # one call over the whole (longest-first) list; the engine's workers share it,
+            # each unit is crawled exactly once and rows stream out through on_page
+            print(f"[sunbiz] fetching {len(todo)} units")
+            try:
+                fetch_recent(
+                    window_days=window_days,
+                    prefixes=todo,
+                    concurrency=concurrency,
+                    resume={p: checkpoints[p] for p in todo if p in checkpoints},
+                    on_page=on_page,
+                )
+            except PipelineStopped:
+                raise
+            except Exception as e:
+                print(f"[sunbiz] ERROR fetching: {e}")
+
+        try:
+            if SPOOL_DIR:
+                _crawl_via_spool(crawl, write, run_id)
             else:
-                prefixes = list("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ")
-
-            concurrency = int(os.getenv("NBP_CONCURRENCY", "2"))  # be polite by default
-            batch_size  = int(os.getenv("NBP_PREFIX_BATCH", "2"))  # scrape a couple of prefixes, then upsert
-
-            window_days = (90 if bootstrap else int(os.getenv("NBP_WINDOW_DAYS", "90")))
-            print(f"[sunbiz] crawl plan: prefixes={len(prefixes)} window_days={window_days} batch={batch_size} concurrency={concurrency}")
-
-            for i in range(0, len(prefixes), batch_size):
-                batch = prefixes[i:i+batch_size]
-                try:
-                    print(f"[sunbiz] fetching batch {i//batch_size+1}/{(len(prefixes)+batch_size-1)//batch_size}: {batch}")
-                    batch_size = int(os.getenv("NBP_PREFIX_BATCH", "2"))
-                    for pref_batch in _chunks(prefixes, batch_size):
-                        print(f"[sunbiz] fetching batch {pref_batch}")
-                        rows = fetch_recent_by_name_prefixes_parallel(
-                            window_days=(90 if bootstrap else int(os.getenv("NBP_WINDOW_DAYS", "90"))),
-                            prefixes=pref_batch,
-                            concurrency=int(os.getenv("NBP_CONCURRENCY", "2")),
-                        )
-                        print(f"[sunbiz] parsed rows this batch: {len(rows)} from {pref_batch}")
-                        inserted = _upsert_entities(rows, dry_run)
-                        total_inserted += inserted
-                        total_seen += len(rows)
-                        print(f"[sunbiz] cumulative seen={total_seen} inserted={total_inserted}")
-                except Exception as e:
-                    print(f"[sunbiz] ERROR fetching batch {batch}: {e}")
-                    rows = []
-
-                print(f"[sunbiz] parsed rows this batch: {len(rows)}")
-                total_seen += len(rows)
-                inserted = _upsert_entities(rows, dry_run)
-                total_inserted += inserted
-                print(f"[sunbiz] cumulative seen={total_seen} inserted={total_inserted}")
+                run_pipeline(crawl, write)
+        except Exception as e:
+            print(f"[sunbiz] ERROR writing rows: {e}; resume with --resume {run_id}")
+            raise
 
-        else:
-            print("[sunbiz] requests mode not supported here")
+        # wall time of the units crawled start to finish here orders the next run
+        if not dry_run:
+            from nbp.services.work_units import record_prefix_durations
+            secs = {p: c["prefix_seconds"] for p, c in metrics.summary()["prefixes"].items()
+                    if c.get("prefix_seconds") and p not in resumed and checkpoints.get(p, {}).get("done")}
+            record_prefix_durations(secs)
 
         # Recompute rollups for SEO pages
         try:
@@ -189,15 +363,433 @@ def run_all(bootstrap=False):
             print("[stats] ERROR recomputing:", e)
 
         print("[sunbiz] done", {
+            "run_id": run_id,
+            "seen": totals["seen"],
+            "inserted": totals["inserted"],
+            "detail_fetches_saved": dict(SKIP_COUNTS),  # in-process engines only
+            "rate": rate.snapshot() if rate else None,
+            "dry_run": dry_run
+        })
+        metrics.emit({"run_id": run_id, "engine": engine,
+                      "rate": rate.snapshot() if rate else None})
+
+def run_enqueue(bootstrap=False, resume=None):
+    """
+    Plan a run and put its work units in the Redis queue for --worker
+    processes on any host. Units already finished in the DB checkpoints of
+    `resume` are left out; the rest carry their resume point.
+    """
+    app = create_app()
+    with app.app_context():
+        from nbp.services.checkpoints import new_run_id, latest_unfinished_run, load_checkpoints
+        from nbp.services.redis_queue import WorkQueue, get_client
+
+        run_id = resume
+        if run_id == "latest":
+            run_id = latest_unfinished_run()
+        run_id = run_id or os.getenv("NBP_RUN_ID") or new_run_id(bootstrap)
+        checkpoints = load_checkpoints(run_id)
+
+        prefixes, concurrency, window_days = _crawl_plan(bootstrap, checkpoints)
+        todo = [p for p in prefixes if not checkpoints.get(p, {}).get("done")]
+
+        q = WorkQueue(get_client(), run_id)
+        n = q.enqueue(todo, resume={p: checkpoints[p] for p in todo if p in checkpoints},
+                      meta={"window_days": window_days, "bootstrap": bootstrap,
+                            "enqueued_at": datetime.utcnow()})
+        print("[queue] enqueued", {"run_id": run_id, "units": n, "window_days": window_days, **q.counts()})
+
+def run_queue_worker(run_id=None):
+    """
+    Lease units of a queued run and crawl them; results go to the run's Redis
+    stream (see run_ingest_stream). NBP_CONCURRENCY units are crawled at once.
+    """
+    app = create_app()
+    with app.app_context():
+        from nbp.services.redis_queue import WorkQueue, get_client, run_worker
+        from nbp.services.rate_control import get_controller
+        from nbp.services import crawl_metrics as metrics
+
+        client = get_client()
+        run_id = run_id or WorkQueue.latest_run(client)
+        if not run_id:
+            print("[queue] nothing enqueued")
+            return
+        q = WorkQueue(client, run_id)
+        meta = q.meta()
+
+        metrics.reset()
+        rate = get_controller()  # per worker host: NBP_RATE_START/MAX are this machine's share
+        engine, fetch_recent = _crawl_engine(os.getenv("NBP_USE_BROWSER", "1") == "1")
+        threads = int(os.getenv("NBP_CONCURRENCY", "2"))
+        print("[queue] worker starting", {"run_id": run_id, "engine": engine, "threads": threads, **q.counts()})
+
+        stats = run_worker(q, fetch_recent, window_days=int(meta.get("window_days", 90)), threads=threads)
+
+        print("[queue] worker done", {"run_id": run_id, **stats, **q.counts()})
+        metrics.emit({"run_id": run_id, "engine": engine, "role": "worker",
+                      "rate": rate.snapshot() if rate else None})
+
+def run_ingest_stream(run_id=None):
+    """
+    The single consumer of a queued run's results stream: upsert each batch,
+    move the checkpoints, then ack. Entries left unacked by a crashed
+    ingester are replayed first (upserts are idempotent). Exits once every
+    unit is finished and the stream is drained.
+    """
+    app = create_app()
+    with app.app_context():
+        from nbp.services.checkpoints import load_checkpoints
+        from nbp.services.pipeline import WRITE_BATCH, IDLE_FLUSH_S, _merge_mark
+        from nbp.services.redis_queue import WorkQueue, get_client
+        from nbp.services import crawl_metrics as metrics
+
+        dry_run = os.getenv("NBP_DRY_RUN", "0") == "1"
+        client = get_client()
+        run_id = run_id or WorkQueue.latest_run(client)
+        if not run_id:
+            print("[queue] nothing enqueued")
+            return
+        q = WorkQueue(client, run_id)
+        checkpoints = load_checkpoints(run_id)
+        write, totals = _checkpoint_writer(run_id, checkpoints, dry_run)
+        metrics.reset()
+        print("[queue] ingesting", {"run_id": run_id, "dry_run": dry_run, **q.counts()})
+
+        pending = True
+        entries = None
+        while True:
+            if entries is None:
+                entries = q.read_results(count=64, block_s=IDLE_FLUSH_S, pending=pending)
+            if pending and not entries:
+                pending = False
+                entries = None
+                continue
+            ids, buf, marks = [], [], {}
+            while entries:
+                for msg_id, page in entries:
+                    ids.append(msg_id)
+                    buf.extend(page["rows"])
+                    _merge_mark(marks, page["unit"], page["page"], len(page["rows"]),
+                                page["last_row"], page["done"])
+                if pending or len(buf) >= WRITE_BATCH:
+                    break  # a replayed batch is re-read from "0" until acked, so take it alone
+                entries = q.read_results(count=64, block_s=0.1)
+            entries = None
+            if ids:
+                write(buf, marks)
+                q.ack(ids)
+                continue
+            if not pending and q.remaining() == 0:
+                # a worker's last page and the removal of its unit commit together, possibly
+                # after the read above came back empty: drain what is there before exiting
+                entries = q.read_results(count=64, block_s=0)
+                if not entries:
+                    break
+
+        try:
+            n = recompute_all_florida()
+            print("[stats] recomputed jurisdictions:", n)
+        except Exception as e:
+            print("[stats] ERROR recomputing:", e)
+
+        print("[queue] ingest done", {
+            "run_id": run_id,
+            "seen": totals["seen"],
+            "inserted": totals["inserted"],
+            "dry_run": dry_run,
+            **q.counts(),
+        })
+        metrics.emit({"run_id": run_id, "role": "ingester"})
+
+def run_bulk_ingest(path, since=None):
+    """
+    Load a Sunbiz fixed-width corporate data file (quarterly extract or daily
+    update, unzipped) through the normal upsert path, then recompute stats.
+    """
+    app = create_app()
+    with app.app_context():
+        from nbp.services.sunbiz_bulk import iter_batches
+        from nbp.services.pipeline import WRITE_BATCH
+
+        dry_run = os.getenv("NBP_DRY_RUN", "0") == "1"
+        t0 = time.monotonic()
+        total_seen = 0
+        total_inserted = 0
+        for rows in iter_batches(path, max(WRITE_BATCH, 1000), since=since):
+            total_seen += len(rows)
+            total_inserted += _upsert_entities(rows, dry_run)
+            rate = total_seen / max(time.monotonic() - t0, 1e-9)
+            print(f"[bulk] cumulative seen={total_seen} inserted={total_inserted} ({rate:.0f} rows/s)")
+
+        try:
+            n = recompute_all_florida()
+            print("[stats] recomputed jurisdictions:", n)
+        except Exception as e:
+            print("[stats] ERROR recomputing:", e)
+
+        print("[bulk] done", {
+            "file": path,
             "seen": total_seen,
             "inserted": total_inserted,
+            "seconds": round(time.monotonic() - t0, 1),
+            "dry_run": dry_run
+        })
+
+def run_ingest_spool(run_id=None):
+    """
+    Load a run's spooled pages into the database from the committed offset,
+    tailing until the crawl closes the spool. Safe to re-run after a crash or
+    a failed commit: only pages past the committed offset are written.
+    """
+    app = create_app()
+    with app.app_context():
+        from nbp.services.checkpoints import load_checkpoints
+        from nbp.services.pipeline import WRITE_BATCH
+        from nbp.services.spool import SPOOL_DIR, ingest_spool
+
+        if not SPOOL_DIR:
+            print("[spool] NBP_SPOOL_DIR is not set")
+            return
+        if not run_id:
+            runs = [d for d in os.listdir(SPOOL_DIR) if os.path.isdir(os.path.join(SPOOL_DIR, d))] \
+                if os.path.isdir(SPOOL_DIR) else []
+            run_id = max(runs, key=lambda d: os.path.getmtime(os.path.join(SPOOL_DIR, d)), default=None)
+            if not run_id:
+                print(f"[spool] nothing spooled in {SPOOL_DIR}")
+                return
+
+        dry_run = os.getenv("NBP_DRY_RUN", "0") == "1"
+        checkpoints = load_checkpoints(run_id)
+        write, totals = _checkpoint_writer(run_id, checkpoints, dry_run)
+        print("[spool] ingesting", {"run_id": run_id, "dir": SPOOL_DIR, "dry_run": dry_run})
+        # the crawl thread always closes the spool, so tail until CLOSED however long a page takes
+        stats = ingest_spool(SPOOL_DIR, run_id, write, batch_size=WRITE_BATCH, idle_exit_s=float("inf"))
+
+        try:
+            n = recompute_all_florida()
+            print("[stats] recomputed jurisdictions:", n)
+        except Exception as e:
+            print("[stats] ERROR recomputing:", e)
+
+        print("[spool] done", {
+            "run_id": run_id,
+            "seen": totals["seen"],
+            "inserted": totals["inserted"],
+            **stats,
             "dry_run": dry_run
         })
 
+def run_frontier():
+    """
+    Daily incremental by document number: probe forward from each series'
+    frontier instead of walking every name prefix, then recompute stats.
+    """
+    app = create_app()
+    with app.app_context():
+        from nbp.services.sunbiz_frontier import crawl_frontier, save_frontier
+
+        dry_run = os.getenv("NBP_DRY_RUN", "0") == "1"
+        total_seen = 0
+        total_inserted = 0
+        for series, year, rows, last_hit in crawl_frontier():
+            total_seen += len(rows)
+            total_inserted += _upsert_entities(rows, dry_run, verified_at=datetime.utcnow())
+            if not dry_run:
+                save_frontier(series, year, last_hit)
+
+        try:
+            n = recompute_all_florida()
+            print("[stats] recomputed jurisdictions:", n)
+        except Exception as e:
+            print("[stats] ERROR recomputing:", e)
+
+        print("[frontier] done", {
+            "seen": total_seen,
+            "inserted": total_inserted,
+            "dry_run": dry_run
+        })
+
+
+def run_reparse_archive(since=None):
+    """
+    Re-apply _parse_detail to the raw HTML archive (no Sunbiz traffic) and
+    upsert the results. Existing docs are refreshed; archived docs that were
+    never kept are inserted only if they now pass the crawler's keep rules.
+    """
+    app = create_app()
+    with app.app_context():
+        from nbp.services.html_archive import reparse_archive
+
+        dry_run = os.getenv("NBP_DRY_RUN", "0") == "1"
+        workers = int(os.getenv("NBP_REPARSE_WORKERS", "0")) or None
+        known = {d for (d,) in db.session.query(Entity.doc_number) if d}
+
+        total_seen = 0
+        total_inserted = 0
+        for rows in reparse_archive(known=known, since=since, workers=workers):
+            total_seen += len(rows)
+            total_inserted += _upsert_entities(rows, dry_run)
+            print(f"[archive] cumulative reparsed={total_seen} inserted={total_inserted}")
+
+        print("[archive] done", {
+            "reparsed": total_seen,
+            "inserted": total_inserted,
+            "dry_run": dry_run
+        })
+
+
+def run_reverify(limit=None):
+    """
+    Work the staleness queue (nbp/services/reverify.py): re-fetch due
+    entities' detail pages by doc number at NBP_REVERIFY_PER_DAY and write
+    changed fields. limit=None keeps running as a background worker.
+    """
+    app = create_app()
+    with app.app_context():
+        from nbp.services.reverify import run_reverify as reverify, mark_verified
+        from nbp.services import crawl_metrics as metrics
+
+        dry_run = os.getenv("NBP_DRY_RUN", "0") == "1"
+        metrics.reset()
+
+        def write(rows, missing):
+            # existing rows: only changed fields are set
+            _upsert_entities(rows, dry_run, strict=True, verified_at=datetime.utcnow())
+            if not dry_run:
+                mark_verified(missing)
+
+        print("[reverify] starting", {"limit": limit, "dry_run": dry_run})
+        stats = reverify(write, limit=limit)
+        print("[reverify] done", {**stats, "dry_run": dry_run})
+        metrics.emit({"role": "reverify"})
+
+def _run_pass(plan, run_id):
+    """Run one scheduled pass as jobs.py child processes; returns the first non-zero exit code."""
+    env = dict(os.environ)
+    env.update({
+        "NBP_RUN_ID": run_id,
+        "NBP_WINDOW_DAYS": str(plan["window_days"]),
+        "NBP_WINDOW_YTD": "1" if plan["window_ytd"] else "0",
+        "NBP_REVERIFY_DAYS": str(plan["reverify_days"]),
+        "NBP_PREFIXES": ",".join(plan["prefixes"] or []),
+    })
+    steps = []
+    if plan["frontier"]:
+        steps.append(["--frontier"])
+    steps.append(["--resume", plan["resume"]] if plan["resume"] else [])
+    code = 0
+    for args in steps:
+        print(f"[sched] {plan['kind']}: jobs.py {' '.join(args)}".rstrip())
+        rc = subprocess.call([sys.executable, os.path.abspath(__file__), *args], env=env)
+        code = code or rc
+    return code
+
+def run_scheduler(daemon=False, plan_only=False):
+    """
+    Population-weighted crawl schedule (see nbp/services/crawl_scheduler.py).
+    plan_only prints what is due and the prefix ranking; otherwise run the
+    pass that is due now (cron-friendly) or, with daemon, keep running passes
+    as they come due.
+    """
+    app = create_app()
+    with app.app_context():
+        from nbp.services import crawl_scheduler as sched
+
+        if plan_only:
+            weights, _ = sched.county_weights()
+            scores = sched.prefix_scores()
+            for kind in sched.ORDER:
+                print(f"[sched] {kind}: last={sched.covered_at(kind)} every={sched.PASSES[kind]['every_h']}h",
+                      sched.plan_pass(kind, scores))
+            print("[sched] next:", sched.next_due())
+            print("[sched] top counties:", sorted(weights.items(), key=lambda kv: -kv[1])[:10])
+            print("[sched] prefix scores:", {p: round(v, 1) for p, v in sorted(scores.items(), key=lambda kv: -kv[1])})
+            return
+
+        if daemon:
+            n = sched.abandon_running()
+            if n:
+                print(f"[sched] marked {n} interrupted pass(es) failed")
+        poll_s = float(os.getenv("NBP_SCHED_POLL_S", "300"))
+
+        while True:
+            kind, due = sched.next_due()
+            now = datetime.utcnow()
+            if due > now:
+                if not daemon:
+                    print(f"[sched] nothing due; next is {kind} at {due:%Y-%m-%d %H:%M} UTC")
+                    return
+                db.session.remove()  # don't hold a connection while idle
+                time.sleep(min(poll_s, (due - now).total_seconds()))
+                continue
+
+            plan = sched.plan_pass(kind)
+            run_id = plan["resume"] or f"{datetime.utcnow():%Y%m%d-%H%M%S}-{kind}"
+            run = sched.start_run(plan, run_id)
+            print("[sched] starting", {"run_id": run_id, **plan})
+            code = 1
+            try:
+                code = _run_pass(plan, run_id)
+            finally:
+                run = sched.finish_run(run, code)
+                print("[sched] finished", {"kind": kind, "run_id": run_id, "status": run.status,
+                                           "rows_kept": run.rows_kept,
+                                           "minutes": round((run.finished_at - run.started_at).total_seconds() / 60, 1)})
+            if not daemon:
+                return
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--bootstrap", action="store_true", help="Scrape last 60 days")
+    parser.add_argument("--resume", nargs="?", const="latest", default=None, metavar="RUN_ID",
+                        help="Resume an interrupted run (default: the latest unfinished one)")
+    parser.add_argument("--frontier", action="store_true",
+                        help="Fetch new filings by probing document numbers past each series' frontier")
+    parser.add_argument("--reparse-archive", action="store_true",
+                        help="Re-parse archived detail pages and upsert (no crawling)")
+    parser.add_argument("--since", type=date.fromisoformat, default=None,
+                        help="With --reparse-archive: only pages fetched on/after YYYY-MM-DD; "
+                             "with --bulk-file: only filings dated on/after it")
+    parser.add_argument("--ingest-spool", nargs="?", const="", default=None, metavar="RUN_ID",
+                        help="Load a run's on-disk spool (NBP_SPOOL_DIR) into the database "
+                             "(default: the most recent run)")
+    parser.add_argument("--bulk-file", default=None, metavar="PATH",
+                        help="Load a Sunbiz fixed-width corporate data file (no crawling)")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Plan the run and queue its work units in Redis (NBP_REDIS_URL) for --worker")
+    parser.add_argument("--worker", nargs="?", const="", default=None, metavar="RUN_ID",
+                        help="Crawl units from the Redis queue (default: the latest enqueued run)")
+    parser.add_argument("--ingest-stream", nargs="?", const="", default=None, metavar="RUN_ID",
+                        help="Write a queued run's results stream to the database (run exactly one)")
+    parser.add_argument("--reverify", nargs="?", type=int, const=0, default=None, metavar="N",
+                        help="Re-check stale entities by doc number; stop after N (default: keep running)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running scheduled incremental/verify/deep passes as they come due")
+    parser.add_argument("--scheduled", action="store_true",
+                        help="Run the scheduled pass that is due now, if any, and exit (for cron)")
+    parser.add_argument("--plan", action="store_true",
+                        help="Print the crawl schedule and prefix ranking without crawling")
     args = parser.parse_args()
-    run_all(bootstrap=args.bootstrap)
+    if args.plan or args.daemon or args.scheduled:
+        run_scheduler(daemon=args.daemon, plan_only=args.plan)
+    elif args.reverify is not None:
+        run_reverify(args.reverify or None)
+    elif args.enqueue:
+        run_enqueue(bootstrap=args.bootstrap, resume=args.resume)
+    elif args.worker is not None:
+        run_queue_worker(args.worker or None)
+    elif args.ingest_stream is not None:
+        run_ingest_stream(args.ingest_stream or None)
+    elif args.ingest_spool is not None:
+        run_ingest_spool(args.ingest_spool or None)
+    elif args.bulk_file:
+        run_bulk_ingest(args.bulk_file, since=args.since)
+    elif args.frontier:
+        run_frontier()
+    elif args.reparse_archive:
+        run_reparse_archive(since=args.since)
+    else:
+        run_all(bootstrap=args.bootstrap, resume=args.resume)
 
@@ -83,6 +83,8 @@ class Entity(db.Model):
     event_effective_date  = db.Column(db.Date)
     registered_agent_address = db.Column(db.Text)
     officers_json         = db.Column(db.Text)
+    verified_at           = db.Column(db.DateTime, index=True)  # last time a crawl saw the detail page
+    status                = db.Column(db.String(50))  # Sunbiz status as last seen ("Active", "Inactive", ...)
 
     @property
     def officers(self):
@@ -114,6 +116,63 @@ class Stat(db.Model):
         Index("ix_stats_jur_day", "jurisdiction_id", "day"),
     )
 
+class CrawlCheckpoint(db.Model):
+    """Per-prefix progress of one crawl run, so an interrupted run can resume."""
+    __tablename__ = "crawl_checkpoints"
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String(64), nullable=False)
+    prefix = db.Column(db.String(32), nullable=False)
+    last_page = db.Column(db.Integer, nullable=False, default=0)  # result pages fully processed
+    last_name = db.Column(db.String(255))  # last row on that page → search term to seek back
+    last_doc = db.Column(db.String(100))
+    rows_kept = db.Column(db.Integer, nullable=False, default=0)
+    done = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("run_id", "prefix", name="uq_crawl_checkpoints_run_prefix"),
+    )
+
+class CrawlFrontier(db.Model):
+    """Highest document sequence seen per Sunbiz series/year (e.g. L + 2025)."""
+    __tablename__ = "crawl_frontiers"
+    id = db.Column(db.Integer, primary_key=True)
+    series = db.Column(db.String(4), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("series", "year", name="uq_crawl_frontiers_series_year"),
+    )
+
+class CrawlPrefixStat(db.Model):
+    """Result pages walked and wall time per name prefix (or sub-prefix) in its latest complete crawl."""
+    __tablename__ = "crawl_prefix_stats"
+    id = db.Column(db.Integer, primary_key=True)
+    prefix = db.Column(db.String(32), nullable=False, unique=True)
+    pages = db.Column(db.Integer, nullable=False, default=0)
+    rows_kept = db.Column(db.Integer, nullable=False, default=0)
+    duration_s = db.Column(db.Float)  # start to finish in one run; orders the next run longest-first
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CrawlRun(db.Model):
+    """One scheduled crawl pass (see services/crawl_scheduler.py)."""
+    __tablename__ = "crawl_runs"
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # incremental | verify | deep
+    run_id = db.Column(db.String(64))  # crawl_checkpoints run of the name-prefix step
+    status = db.Column(db.String(20), nullable=False, default="running")  # running | ok | failed
+    prefixes = db.Column(db.Text)  # comma-separated prefixes crawled; NULL = all
+    rows_kept = db.Column(db.Integer, nullable=False, default=0)
+    exit_code = db.Column(db.Integer)
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        Index("ix_crawl_runs_kind_started", "kind", "started_at"),
+    )
+
 class Subscription(db.Model):
     __tablename__ = "subscriptions"
     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,49 @@
+# nbp/services/checkpoints.py
+from datetime import datetime
+from typing import Dict, Optional
+from ..models import db, CrawlCheckpoint
+
+
+def new_run_id(bootstrap: bool) -> str:
+    return f"{datetime.utcnow():%Y%m%d-%H%M%S}-{'boot' if bootstrap else 'inc'}"
+
+
+def latest_unfinished_run() -> Optional[str]:
+    """run_id of the most recently updated run that still has an unfinished prefix."""
+    cp = (CrawlCheckpoint.query.filter_by(done=False)
+          .order_by(CrawlCheckpoint.updated_at.desc()).first())
+    return cp.run_id if cp else None
+
+
+def load_checkpoints(run_id: str) -> Dict[str, Dict]:
+    """{prefix: {'page','last_name','last_doc','rows_kept','done'}} for one run."""
+    out = {}
+    for cp in CrawlCheckpoint.query.filter_by(run_id=run_id):
+        out[cp.prefix] = {
+            "page": cp.last_page,
+            "last_name": cp.last_name,
+            "last_doc": cp.last_doc,
+            "rows_kept": cp.rows_kept,
+            "done": cp.done,
+        }
+    return out
+
+
+def save_checkpoint(run_id: str, prefix: str, page: int, last_row: Optional[Dict],
+                    rows_kept: int, done: bool = False) -> CrawlCheckpoint:
+    """
+    Record that `page` result pages of `prefix` are fully processed.
+    Call only after that page's rows are committed, so a resume never skips unsaved rows.
+    """
+    cp = CrawlCheckpoint.query.filter_by(run_id=run_id, prefix=prefix).first()
+    if not cp:
+        cp = CrawlCheckpoint(run_id=run_id, prefix=prefix, last_page=0, rows_kept=0, done=False)
+        db.session.add(cp)
+    cp.last_page = max(cp.last_page or 0, page)
+    if last_row:
+        cp.last_name = (last_row.get("name") or "")[:255]
+        cp.last_doc = (last_row.get("doc") or "")[:100]
+    cp.rows_kept = (cp.rows_kept or 0) + rows_kept
+    cp.done = cp.done or done
+    db.session.commit()
+    return cp
@@ -0,0 +1,197 @@
+# nbp/services/crawl_metrics.py
+# In-process crawl telemetry: labelled counters and latency histograms, a JSON
+# run summary and an optional Prometheus textfile (node_exporter textfile
+# collector). Process-pool workers send snapshot() back with their rows and
+# the parent merge()s it, so the summary covers every engine.
+import os, json, time, threading
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+# histogram bucket upper bounds, seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+SUMMARY_PATH = os.getenv("NBP_METRICS_JSON", "")   # also printed as a [metrics] line
+PROM_PATH = os.getenv("NBP_METRICS_PROM", "")      # e.g. /var/lib/node_exporter/textfile/nbp_crawl.prom
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple], float] = {}
+_hists: Dict[Tuple[str, Tuple], Dict] = {}
+_started = time.time()
+
+
+def _key(name: str, labels: Dict) -> Tuple[str, Tuple]:
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name: str, n: float = 1, **labels):
+    k = _key(name, labels)
+    with _lock:
+        _counters[k] = _counters.get(k, 0) + n
+
+
+def observe(name: str, seconds: float, **labels):
+    k = _key(name, labels)
+    with _lock:
+        h = _hists.get(k)
+        if h is None:
+            h = _hists[k] = {"buckets": [0] * (len(BUCKETS) + 1), "sum": 0.0, "count": 0}
+        i = next((i for i, b in enumerate(BUCKETS) if seconds <= b), len(BUCKETS))
+        h["buckets"][i] += 1
+        h["sum"] += seconds
+        h["count"] += 1
+
+
+@contextmanager
+def timer(name: str, **labels):
+    t0 = time.monotonic()
+    try:
+        yield
+    finally:
+        observe(name, time.monotonic() - t0, **labels)
+
+
+def reset():
+    global _started
+    with _lock:
+        _counters.clear()
+        _hists.clear()
+        _started = time.time()
+
+
+def snapshot() -> Dict:
+    """Picklable copy of everything recorded in this process."""
+    with _lock:
+        return {
+            "counters": [(n, list(l), v) for (n, l), v in _counters.items()],
+            "hists": [(n, list(l), dict(h, buckets=list(h["buckets"]))) for (n, l), h in _hists.items()],
+        }
+
+
+def merge(snap: Dict):
+    """Add a worker process's snapshot() into this process."""
+    if not snap:
+        return
+    with _lock:
+        for n, l, v in snap["counters"]:
+            k = (n, tuple(tuple(x) for x in l))
+            _counters[k] = _counters.get(k, 0) + v
+        for n, l, h in snap["hists"]:
+            k = (n, tuple(tuple(x) for x in l))
+            mine = _hists.setdefault(k, {"buckets": [0] * (len(BUCKETS) + 1), "sum": 0.0, "count": 0})
+            mine["buckets"] = [a + b for a, b in zip(mine["buckets"], h["buckets"])]
+            mine["sum"] += h["sum"]
+            mine["count"] += h["count"]
+
+
+def _quantile(h: Dict, q: float):
+    """Bucket upper bound at quantile q (None when the histogram is empty)."""
+    if not h["count"]:
+        return None
+    target = q * h["count"]
+    seen = 0
+    for i, c in enumerate(h["buckets"]):
+        seen += c
+        if seen >= target:
+            return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+    return float("inf")
+
+
+def summary() -> Dict:
+    """Run summary: totals, per-prefix throughput and latency percentiles."""
+    elapsed = max(time.time() - _started, 1e-9)
+    with _lock:
+        counters = dict(_counters)
+        hists = {k: dict(h) for k, h in _hists.items()}
+
+    totals: Dict[str, float] = {}
+    by_label: Dict[str, Dict[str, float]] = {}
+    per_prefix: Dict[str, Dict[str, float]] = {}
+    for (name, labels), v in counters.items():
+        labels = dict(labels)
+        totals[name] = totals.get(name, 0) + v
+        if "prefix" in labels:
+            per_prefix.setdefault(labels["prefix"], {})[name] = v
+        elif labels:
+            tag = ",".join(f"{k}={x}" for k, x in sorted(labels.items()))
+            by_label.setdefault(name, {})[tag] = v
+
+    latency = {}
+    for (name, labels), h in hists.items():
+        tag = name + "".join(f"[{k}={x}]" for k, x in labels)
+        latency[tag] = {
+            "count": h["count"],
+            "mean_s": round(h["sum"] / h["count"], 4) if h["count"] else None,
+            "p50_s": _quantile(h, 0.5),
+            "p90_s": _quantile(h, 0.9),
+            "p99_s": _quantile(h, 0.99),
+            "total_s": round(h["sum"], 2),
+        }
+
+    for pref, c in per_prefix.items():
+        secs = c.get("prefix_seconds") or 0
+        c["pages_per_sec"] = round(c.get("results_pages", 0) / secs, 3) if secs else None
+
+    return {
+        "elapsed_s": round(elapsed, 1),
+        "pages_per_sec": round(totals.get("results_pages", 0) / elapsed, 3),
+        "details_per_sec": round(totals.get("detail_pages", 0) / elapsed, 3),
+        # everything the browser (or session) downloaded per HTML page it loaded
+        "bytes_per_page": (round(totals.get("bytes_transferred", 0) / totals["documents"])
+                           if totals.get("documents") else None),
+        "totals": totals,
+        "by_label": by_label,
+        "latency": latency,
+        "prefixes": per_prefix,
+    }
+
+
+def _prom_labels(labels) -> str:
+    if not labels:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels) + "}"
+
+
+def prometheus_text() -> str:
+    with _lock:
+        counters = dict(_counters)
+        hists = {k: dict(h) for k, h in _hists.items()}
+    lines = []
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# TYPE nbp_crawl_{name} counter")
+        for (n, labels), v in sorted(counters.items()):
+            if n == name:
+                lines.append(f"nbp_crawl_{n}{_prom_labels(labels)} {v:g}")
+    for name in sorted({n for n, _ in hists}):
+        lines.append(f"# TYPE nbp_crawl_{name} histogram")
+        for (n, labels), h in sorted(hists.items()):
+            if n != name:
+                continue
+            cum = 0
+            for b, c in zip(list(BUCKETS) + ["+Inf"], h["buckets"]):
+                cum += c
+                lines.append(f"nbp_crawl_{n}_bucket{_prom_labels(labels + (('le', b),))} {cum}")
+            lines.append(f"nbp_crawl_{n}_sum{_prom_labels(labels)} {h['sum']:.6f}")
+            lines.append(f"nbp_crawl_{n}_count{_prom_labels(labels)} {h['count']}")
+    lines.append(f"nbp_crawl_last_run_timestamp_seconds {time.time():.0f}")
+    return "\n".join(lines) + "\n"
+
+
+def emit(extra: Dict = None) -> Dict:
+    """Print the JSON summary and write NBP_METRICS_JSON / NBP_METRICS_PROM when set."""
+    out = summary()
+    if extra:
+        out.update(extra)
+    print("[metrics] " + json.dumps(out, default=str))
+    for path, body in ((SUMMARY_PATH, lambda: json.dumps(out, indent=2, default=str)),
+                       (PROM_PATH, prometheus_text)):
+        if not path:
+            continue
+        try:
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(body())
+            os.replace(tmp, path)  # textfile collectors must never see a half-written file
+        except Exception as e:
+            print(f"[metrics] write failed {path}: {e}")
+    return out
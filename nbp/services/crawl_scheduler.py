@@ -0,0 +1,208 @@
+# nbp/services/crawl_scheduler.py
+# Decide which crawl pass is due and what it covers, so crawl budget follows
+# demand instead of one flat pass. Three passes, lightest to heaviest:
+#
+#   incremental  every few hours: frontier probe + the "hot" name prefixes, short window
+#   verify       nightly: every prefix, short window, known docs skipped (cheap)
+#   deep         weekly: every prefix, the full window
+#
+# The short windows are just the last N days (NBP_WINDOW_YTD=0); deep keeps
+# the crawler's usual last-N-days-or-year-to-date window.
+#
+# A heavier pass also counts as each lighter one. Hot prefixes are the ones
+# whose recent filings land in jurisdictions that matter most: each county is
+# weighted by how often its pages change (the sitemap changefreq tier of its
+# population) times its recent filing volume from stats.
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from ..models import db, Entity, Jurisdiction, Stat, CrawlCheckpoint, CrawlRun
+from .sitemap import get_changefreq
+
+ALL_PREFIXES = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+VISITS_PER_WEEK = {"daily": 7.0, "weekly": 1.0, "monthly": 0.25}
+
+LOOKBACK_DAYS = int(os.getenv("NBP_SCHED_LOOKBACK_DAYS", "30"))  # filings used to score prefixes
+HOT_SHARE = float(os.getenv("NBP_SCHED_HOT_SHARE", "0.8"))       # incremental covers this share of the score
+HOT_MAX = int(os.getenv("NBP_SCHED_HOT_MAX", "12"))              # ...with at most this many prefixes
+RETRY_MIN = float(os.getenv("NBP_SCHED_RETRY_MIN", "30"))        # wait after a failed pass before retrying it
+
+PASSES = {
+    "deep": {
+        "every_h": float(os.getenv("NBP_SCHED_DEEP_H", "168")),
+        "window_days": int(os.getenv("NBP_SCHED_DEEP_WINDOW", "90")),
+        "window_ytd": True,
+        "reverify_days": int(os.getenv("NBP_REVERIFY_DAYS", "7")),
+    },
+    "verify": {
+        "every_h": float(os.getenv("NBP_SCHED_VERIFY_H", "24")),
+        "window_days": int(os.getenv("NBP_SCHED_VERIFY_WINDOW", "7")),
+        "window_ytd": False,
+        "reverify_days": int(os.getenv("NBP_SCHED_VERIFY_REVERIFY_DAYS", "30")),
+    },
+    "incremental": {
+        "every_h": float(os.getenv("NBP_SCHED_INCREMENTAL_H", "4")),
+        "window_days": int(os.getenv("NBP_SCHED_INCREMENTAL_WINDOW", "3")),
+        "window_ytd": False,
+        "reverify_days": int(os.getenv("NBP_SCHED_INCREMENTAL_REVERIFY_DAYS", "30")),
+    },
+}
+ORDER = ("deep", "verify", "incremental")  # heaviest first; each covers the ones after it
+
+
+def _latest_stats() -> Dict[int, int]:
+    """{jurisdiction_id: count_mtd} from each jurisdiction's most recent stats row."""
+    last = (db.session.query(Stat.jurisdiction_id, func.max(Stat.day).label("day"))
+            .group_by(Stat.jurisdiction_id).subquery())
+    q = (db.session.query(Stat.jurisdiction_id, Stat.count_mtd)
+         .join(last, (Stat.jurisdiction_id == last.c.jurisdiction_id) & (Stat.day == last.c.day)))
+    return {jid: n or 0 for jid, n in q}
+
+
+def county_weights() -> Tuple[Dict[str, float], Dict[str, str]]:
+    """
+    ({county name: weight}, {city name: county name}) for Florida.
+    weight = refreshes per week of the county's changefreq tier × (recent filings + 1);
+    recent filings is the larger of the county's own count_mtd and its cities' sum
+    (crawled entities carry a city but rarely a county).
+    """
+    fl = Jurisdiction.query.filter_by(kind="state", slug="florida").first()
+    if not fl:
+        return {}, {}
+    volume = _latest_stats()
+    weights, city_county = {}, {}
+    for county in fl.children:
+        cities = sum(volume.get(c.id, 0) for c in county.children)
+        recent = max(volume.get(county.id, 0), cities)
+        weights[county.name] = VISITS_PER_WEEK[get_changefreq(county.population)] * (recent + 1)
+        for c in county.children:
+            city_county[c.name] = county.name
+    return weights, city_county
+
+
+def prefix_scores(lookback_days: int = None) -> Dict[str, float]:
+    """
+    {top-level prefix: score} over the last `lookback_days` of filings. Each
+    county's weight is shared among prefixes by their share of its recent
+    filings; filings with no known county get the lowest tier's weight.
+    """
+    if lookback_days is None:
+        lookback_days = LOOKBACK_DAYS
+    weights, city_county = county_weights()
+    since = date.today() - timedelta(days=lookback_days)
+    first = func.upper(func.substr(Entity.name, 1, 1))
+    q = (db.session.query(first, Entity.county, Entity.city, func.count(Entity.id))
+         .filter(Entity.filing_date >= since)
+         .group_by(first, Entity.county, Entity.city))
+
+    counts: Dict[Tuple[str, str], int] = {}
+    per_county: Dict[str, int] = {}
+    for ch, county, city, n in q:
+        if not ch or ch not in ALL_PREFIXES:
+            continue
+        county = county or city_county.get(city) or ""
+        counts[(ch, county)] = counts.get((ch, county), 0) + n
+        per_county[county] = per_county.get(county, 0) + n
+
+    scores: Dict[str, float] = {}
+    for (ch, county), n in counts.items():
+        w = weights.get(county) or VISITS_PER_WEEK["monthly"] * (per_county[county] + 1)
+        scores[ch] = scores.get(ch, 0.0) + w * n / per_county[county]
+    return scores
+
+
+def hot_prefixes(scores: Dict[str, float], share: float = None, limit: int = None) -> List[str]:
+    """Highest-scoring prefixes covering `share` of the total score (at most `limit`)."""
+    share = HOT_SHARE if share is None else share
+    limit = HOT_MAX if limit is None else limit
+    total = sum(scores.values())
+    if not total:
+        return list(ALL_PREFIXES)  # no history yet: everything is hot
+    out, acc = [], 0.0
+    for p, s in sorted(scores.items(), key=lambda kv: -kv[1]):
+        if acc >= share * total or len(out) >= limit:
+            break
+        out.append(p)
+        acc += s
+    return out
+
+
+def _last_run(kinds, status: str = None) -> Optional[CrawlRun]:
+    q = CrawlRun.query.filter(CrawlRun.kind.in_(kinds))
+    if status:
+        q = q.filter(CrawlRun.status == status)
+    return q.order_by(CrawlRun.started_at.desc()).first()
+
+
+def covered_at(kind: str) -> Optional[datetime]:
+    """When the last successful pass of `kind` (or a heavier one) started."""
+    run = _last_run(ORDER[:ORDER.index(kind) + 1], status="ok")
+    return run.started_at if run else None
+
+
+def next_due(now: datetime = None) -> Tuple[str, datetime]:
+    """(kind, due time) of the pass to run next; heavier kinds win ties."""
+    now = now or datetime.utcnow()
+    best = None
+    for kind in ORDER:
+        last = covered_at(kind)
+        due = last + timedelta(hours=PASSES[kind]["every_h"]) if last else now
+        failed = _last_run([kind])
+        if failed and failed.status == "failed":
+            due = max(due, failed.started_at + timedelta(minutes=RETRY_MIN))
+        if due <= now:
+            return kind, due
+        if best is None or due < best[1]:
+            best = (kind, due)
+    return best
+
+
+def plan_pass(kind: str, scores: Dict[str, float] = None) -> Dict:
+    """
+    What `kind` crawls: {"kind", "prefixes" (None = all), "frontier",
+    "window_days", "window_ytd", "reverify_days", "resume"}. A failed verify/deep pass is
+    resumed from its checkpoints while it is still within its interval.
+    """
+    cfg = PASSES[kind]
+    if scores is None:
+        scores = prefix_scores()
+    plan = {"kind": kind, "prefixes": None, "frontier": kind == "incremental",
+            "window_days": cfg["window_days"], "window_ytd": cfg["window_ytd"],
+            "reverify_days": cfg["reverify_days"], "resume": None}
+    if kind == "incremental":
+        plan["prefixes"] = hot_prefixes(scores)
+    else:
+        last = _last_run([kind])
+        if (last and last.status == "failed" and last.run_id
+                and datetime.utcnow() - last.started_at < timedelta(hours=cfg["every_h"])):
+            plan["resume"] = last.run_id
+            plan["prefixes"] = last.prefixes.split(",") if last.prefixes else None
+    return plan
+
+
+def start_run(plan: Dict, run_id: str) -> CrawlRun:
+    run = CrawlRun(kind=plan["kind"], run_id=run_id, status="running",
+                   prefixes=",".join(plan["prefixes"]) if plan["prefixes"] else None, rows_kept=0)
+    db.session.add(run)
+    db.session.commit()
+    return run
+
+
+def finish_run(run: CrawlRun, exit_code: int) -> CrawlRun:
+    rows = (db.session.query(func.coalesce(func.sum(CrawlCheckpoint.rows_kept), 0))
+            .filter(CrawlCheckpoint.run_id == run.run_id).scalar())
+    run.rows_kept = int(rows or 0)
+    run.exit_code = exit_code
+    run.status = "ok" if exit_code == 0 else "failed"
+    run.finished_at = datetime.utcnow()
+    db.session.commit()
+    return run
+
+
+def abandon_running() -> int:
+    """Mark passes left 'running' by a scheduler that died as failed (call once at startup)."""
+    n = CrawlRun.query.filter_by(status="running").update(
+        {"status": "failed", "finished_at": datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    return n
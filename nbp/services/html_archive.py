@@ -0,0 +1,162 @@
+# nbp/services/html_archive.py
+# Content-addressed archive of raw Sunbiz pages written during the crawl, so a
+# parser fix can be re-applied to stored HTML instead of re-crawling the site.
+#
+# Layout under NBP_ARCHIVE_DIR:
+#   blobs/ab/cd/<sha256>.html.zst|gz   one compressed copy per distinct page
+#   index/YYYYMMDD-<pid>.jsonl         {kind, doc, name, prefix, page, url, sha, codec, fetched_at}
+import os, json, gzip, hashlib
+from datetime import datetime, date
+from typing import Dict, Iterable, Iterator, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # optional; fall back to gzip
+    zstandard = None
+
+ARCHIVE_DIR = os.getenv("NBP_ARCHIVE_DIR", "sunbiz_archive")  # "" disables archiving
+CODEC = "zst" if zstandard else "gz"
+
+
+def _blob_path(root: str, sha: str, codec: str) -> str:
+    return os.path.join(root, "blobs", sha[:2], sha[2:4], f"{sha}.html.{codec}")
+
+
+def _compress(data: bytes) -> bytes:
+    if CODEC == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("archive blob is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def archive_page(kind: str, html: str, *, doc_number: str = None, name: str = None,
+                 prefix: str = None, page: int = None, url: str = None,
+                 fetched_at: datetime = None) -> Optional[str]:
+    """
+    Store one fetched page ('results' or 'detail') and index it.
+    Identical HTML is stored once; every fetch still gets its own index line.
+    Returns the content hash, or None when archiving is disabled or fails.
+    """
+    if not ARCHIVE_DIR or not html:
+        return None
+    try:
+        data = html.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = _blob_path(ARCHIVE_DIR, sha, CODEC)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(_compress(data))
+            os.replace(tmp, path)
+
+        fetched_at = fetched_at or datetime.utcnow()
+        entry = {
+            "kind": kind, "doc": doc_number, "name": name, "prefix": prefix, "page": page,
+            "url": url, "sha": sha, "codec": CODEC, "fetched_at": fetched_at.isoformat(timespec="seconds"),
+        }
+        index_dir = os.path.join(ARCHIVE_DIR, "index")
+        os.makedirs(index_dir, exist_ok=True)
+        # one index file per process/day → appends never interleave
+        index_path = os.path.join(index_dir, f"{fetched_at:%Y%m%d}-{os.getpid()}.jsonl")
+        with open(index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        return sha
+    except Exception as e:
+        print("[archive] write failed:", e)
+        return None
+
+
+def read_page(entry: Dict, root: str = None) -> str:
+    root = root or ARCHIVE_DIR
+    with open(_blob_path(root, entry["sha"], entry["codec"]), "rb") as f:
+        return _decompress(f.read(), entry["codec"]).decode("utf-8")
+
+
+def iter_index(kind: str = None, since: date = None, root: str = None) -> Iterator[Dict]:
+    root = root or ARCHIVE_DIR
+    index_dir = os.path.join(root, "index")
+    if not os.path.isdir(index_dir):
+        return
+    for fn in sorted(os.listdir(index_dir)):
+        if not fn.endswith(".jsonl"):
+            continue
+        if since and fn[:8] < since.strftime("%Y%m%d"):
+            continue
+        with open(os.path.join(index_dir, fn), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a killed worker
+                if kind and entry.get("kind") != kind:
+                    continue
+                yield entry
+
+
+def latest_details(since: date = None, root: str = None) -> List[Dict]:
+    """Most recent archived detail page per document number."""
+    latest: Dict[str, Dict] = {}
+    for entry in iter_index("detail", since=since, root=root):
+        doc = entry.get("doc")
+        if not doc:
+            continue
+        prev = latest.get(doc)
+        if prev is None or entry["fetched_at"] >= prev["fetched_at"]:
+            latest[doc] = entry
+    return list(latest.values())
+
+
+def _reparse_one(args):
+    entry, root, window_days = args
+    from .scrape_sunbiz_playwright import _parse_detail, _build_record, _status_ok, _window_start
+    try:
+        info = _parse_detail(read_page(entry, root))
+    except Exception as e:
+        print(f"[archive] reparse failed {entry.get('doc')}: {e}")
+        return None, False
+
+    today = date.today()
+    window_start = _window_start(window_days)
+    keep = (not info.get("status") or _status_ok(info["status"])) and any(
+        d is not None and window_start <= d <= today
+        for d in (info.get("filing_date"), info.get("event_date_filed"))
+    )
+    row = {"name": entry.get("name") or "", "doc": entry["doc"]}
+    return _build_record(row, info), keep
+
+
+def reparse_archive(*, known: Iterable[str] = (), since: date = None, window_days: int = None,
+                    workers: int = None, batch_size: int = 500, root: str = None) -> Iterator[List[Dict]]:
+    """
+    Re-run _parse_detail over the latest archived detail page of every doc in
+    a process pool. Yields record batches for docs already in `known`, plus
+    new docs that pass the crawler's status/window rules.
+    """
+    root = root or ARCHIVE_DIR
+    if window_days is None:
+        window_days = int(os.getenv("NBP_WINDOW_DAYS", "90"))
+    known = set(known)
+    entries = latest_details(since=since, root=root)
+    print(f"[archive] reparsing {len(entries)} detail pages from {root}")
+
+    batch: List[Dict] = []
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        jobs = ((e, root, window_days) for e in entries)
+        for rec, keep in ex.map(_reparse_one, jobs, chunksize=64):
+            if rec is None or not (keep or rec["doc_number"] in known):
+                continue
+            batch.append(rec)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
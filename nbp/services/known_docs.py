@@ -0,0 +1,23 @@
+# nbp/services/known_docs.py
+import os
+from datetime import datetime, timedelta
+from typing import FrozenSet
+from sqlalchemy import func
+from ..models import db, Entity
+
+
+def load_known_docs(reverify_days: int = None) -> FrozenSet[str]:
+    """
+    doc_numbers verified within the last `reverify_days` (NBP_REVERIFY_DAYS).
+    Crawlers skip the detail page of these rows; older ones are due for
+    re-verification and get fetched again.
+
+    An exact set rather than a Bloom filter: a false positive would silently
+    drop a brand-new filing, and ~1M 12-char doc numbers still fit comfortably.
+    """
+    if reverify_days is None:
+        reverify_days = int(os.getenv("NBP_REVERIFY_DAYS", "7"))
+    cutoff = datetime.utcnow() - timedelta(days=reverify_days)
+    seen_at = func.coalesce(Entity.verified_at, Entity.created_at)
+    q = db.session.query(Entity.doc_number).filter(Entity.doc_number.isnot(None), seen_at >= cutoff)
+    return frozenset(d for (d,) in q.yield_per(10000))
@@ -0,0 +1,115 @@
+# nbp/services/parse_pool.py
+# Detail-page parsing off the crawl threads. Crawlers hand the raw page to a
+# small process pool and keep navigating; the parsed dict comes back as a
+# future. At most NBP_PARSE_MAX_PENDING pages are in flight per process, so a
+# slow parser makes the crawler wait instead of piling up HTML in memory.
+import os, time, asyncio, threading, multiprocessing as mp
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from . import crawl_metrics as metrics
+
+_WORKERS_ENV = os.getenv("NBP_PARSE_WORKERS", "auto")  # 0 = parse inline on the crawl thread
+MAX_PENDING = int(os.getenv("NBP_PARSE_MAX_PENDING", "32"))
+
+
+def _default_workers() -> int:
+    if _WORKERS_ENV != "auto":
+        return int(_WORKERS_ENV)
+    # leave a core for Chromium / the crawl loop; on one core a pool only adds overhead
+    return min(4, max(0, (os.cpu_count() or 1) - 1))
+
+
+def _parse(html: str) -> Dict:
+    from .scrape_sunbiz_playwright import _parse_detail
+    return _parse_detail(html)
+
+
+def _parse_job(html: str) -> Tuple[Dict, float]:
+    """Pool-worker entry: (parsed detail, parse seconds) for the parent's metrics."""
+    t0 = time.monotonic()
+    info = _parse(html)
+    return info, time.monotonic() - t0
+
+
+def done_future(info: Dict) -> Future:
+    """An already-parsed detail in the same shape as ParsePool.submit()."""
+    f: Future = Future()
+    f.set_result(info)
+    return f
+
+
+class ParsePool:
+    """
+    submit() from threads, asubmit() from an event loop; both return a
+    concurrent Future of the parsed detail dict and block (or await) while
+    max_pending parses are outstanding. workers=0 parses inline.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = MAX_PENDING):
+        self.workers = _default_workers() if workers is None else workers
+        self.max_pending = max(1, max_pending)
+        # spawn: the crawl process has Playwright and worker threads running, unsafe to fork
+        self._ex = (ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context("spawn"))
+                    if self.workers > 0 else None)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._aslots: Optional[asyncio.Semaphore] = None
+        self._aloop = None
+
+    def _start(self, html: str, release) -> Future:
+        out: Future = Future()
+        if self._ex is None:
+            try:
+                out.set_result(_parse(html))
+            except Exception as e:
+                out.set_exception(e)
+            finally:
+                release()
+            return out
+
+        def _done(f: Future):
+            release()
+            try:
+                info, secs = f.result()
+            except Exception as e:
+                out.set_exception(e)
+                return
+            metrics.observe("parse_seconds", secs, kind="detail")
+            out.set_result(info)
+
+        self._ex.submit(_parse_job, html).add_done_callback(_done)
+        return out
+
+    def submit(self, html: str) -> Future:
+        t0 = time.monotonic()
+        self._slots.acquire()
+        metrics.observe("parse_wait_seconds", time.monotonic() - t0)
+        return self._start(html, self._slots.release)
+
+    async def asubmit(self, html: str) -> Future:
+        loop = asyncio.get_running_loop()
+        if self._aloop is not loop:  # each asyncio.run() gets its own loop
+            self._aslots, self._aloop = asyncio.Semaphore(self.max_pending), loop
+        slots = self._aslots
+        t0 = time.monotonic()
+        await slots.acquire()
+        metrics.observe("parse_wait_seconds", time.monotonic() - t0)
+        return self._start(html, lambda: loop.call_soon_threadsafe(slots.release))
+
+    def close(self):
+        if self._ex is not None:
+            self._ex.shutdown(wait=True)
+            self._ex = None
+
+
+_pool: Optional[ParsePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ParsePool:
+    """This process's pool, created on first use. Pool workers (process engine) parse inline."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParsePool(0 if mp.parent_process() is not None else None)
+        return _pool
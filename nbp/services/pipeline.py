@@ -0,0 +1,103 @@
+# nbp/services/pipeline.py
+# Crawl → DB as a producer/consumer pipeline. Crawl workers hand each results
+# page to a bounded queue (blocking when the writer falls behind), and the
+# caller's thread drains it into ~fixed-size transactions. Memory stays at
+# queue + one batch no matter how long the run is, and progress marks
+# (checkpoints) are only released to the writer together with their rows.
+import os, queue, threading
+from typing import Callable, Dict, List
+
+QUEUE_SIZE = int(os.getenv("NBP_QUEUE_PAGES", "64"))      # results pages in flight
+WRITE_BATCH = int(os.getenv("NBP_WRITE_BATCH", os.getenv("NBP_FLUSH_EVERY", "300")))
+IDLE_FLUSH_S = float(os.getenv("NBP_IDLE_FLUSH_S", "10"))  # flush a partial batch when the crawl is quiet
+
+_END = object()
+
+
+class PipelineStopped(RuntimeError):
+    """Raised in crawl workers once the writer has failed, so they stop crawling."""
+
+
+def _merge_mark(marks: Dict[str, Dict], prefix: str, page_no: int, rows: int, last_row, done: bool):
+    m = marks.setdefault(prefix, {"page": 0, "last_row": None, "rows": 0, "done": False})
+    m["page"] = max(m["page"], page_no)
+    m["rows"] += rows
+    if last_row:
+        m["last_row"] = last_row
+    m["done"] = m["done"] or done
+
+
+def run_pipeline(crawl: Callable, write: Callable, *, queue_size: int = QUEUE_SIZE,
+                 batch_size: int = WRITE_BATCH, idle_flush_s: float = IDLE_FLUSH_S) -> Dict:
+    """
+    Run crawl(on_page) in a background thread and write from this one.
+
+    on_page(prefix, page_no, rows, last_row, done=False) is the crawler
+    callback; it may be called from any worker thread. write(rows, marks) gets
+    about `batch_size` rows plus {prefix: {page, last_row, rows, done}} for
+    every page whose rows are all in that batch; it must commit before
+    returning. If write raises, the crawl is stopped and the error re-raised.
+    """
+    q: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+    stopped = threading.Event()
+    crawl_error: List[BaseException] = []
+
+    def on_page(prefix, page_no, rows, last_row, done=False):
+        item = (prefix, page_no, rows, last_row, done)
+        while True:
+            if stopped.is_set():
+                raise PipelineStopped("writer stopped")
+            try:
+                q.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def _producer():
+        try:
+            crawl(on_page)
+        except BaseException as e:  # surfaced to the caller after draining
+            crawl_error.append(e)
+        finally:
+            q.put(_END)
+
+    t = threading.Thread(target=_producer, name="crawl-producer", daemon=True)
+    t.start()
+
+    buf: List[Dict] = []
+    marks: Dict[str, Dict] = {}
+    stats = {"rows": 0, "batches": 0, "pages": 0}
+
+    def _flush():
+        nonlocal buf, marks
+        if not buf and not marks:
+            return
+        write(buf, marks)
+        stats["rows"] += len(buf)
+        stats["batches"] += 1
+        buf, marks = [], {}
+
+    try:
+        while True:
+            try:
+                item = q.get(timeout=idle_flush_s)
+            except queue.Empty:
+                _flush()
+                continue
+            if item is _END:
+                break
+            prefix, page_no, rows, last_row, done = item
+            buf.extend(rows)
+            _merge_mark(marks, prefix, page_no, len(rows), last_row, done)
+            stats["pages"] += 1
+            if len(buf) >= batch_size:
+                _flush()
+        _flush()
+    except BaseException:
+        stopped.set()
+        raise
+
+    t.join()
+    if crawl_error:
+        raise crawl_error[0]
+    return stats
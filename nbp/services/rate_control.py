@@ -0,0 +1,140 @@
+# nbp/services/rate_control.py
+# One request budget for the whole crawl. Every worker thread, asyncio task and
+# pool process takes a token before its next Sunbiz request; the refill rate
+# grows additively while responses are fast and clean, and is cut
+# multiplicatively on slow responses, timeouts and error pages (AIMD).
+#
+# State lives in shared memory so ProcessPool workers draw from the same
+# bucket: pass the controller through the pool initializer (install()).
+import os, re, time, asyncio, random, threading
+import multiprocessing as mp
+from typing import Dict, Optional
+
+ENABLED = os.getenv("NBP_RATE_CONTROL", "1") == "1"
+START_RATE = float(os.getenv("NBP_RATE_START", "1.5"))   # requests/sec across all workers
+MIN_RATE = float(os.getenv("NBP_RATE_MIN", "0.2"))
+MAX_RATE = float(os.getenv("NBP_RATE_MAX", "8"))
+BURST = float(os.getenv("NBP_RATE_BURST", "2"))           # tokens that may pile up while idle
+STEP = float(os.getenv("NBP_RATE_STEP", "0.1"))           # additive increase, ≈ req/s per second
+BACKOFF = float(os.getenv("NBP_RATE_BACKOFF", "0.5"))     # multiplicative decrease factor
+SLOW_MS = int(os.getenv("NBP_RATE_SLOW_MS", "3000"))      # a response slower than this counts as congestion
+COOLDOWN_S = float(os.getenv("NBP_RATE_COOLDOWN_S", "10"))  # no increase (or second cut) right after a cut
+LOG_S = float(os.getenv("NBP_RATE_LOG_S", "30"))
+JITTER_MS = int(os.getenv("NBP_JITTER_MS", "0"))
+
+ERROR_PAGE_RX = re.compile(
+    r"Service Unavailable|Too Many Requests|temporarily unavailable|Access Denied|Request Rejected",
+    re.I,
+)
+
+# slots in the shared array
+_RATE, _TOKENS, _LAST, _BACKOFF_UNTIL, _LAST_LOG, _OK, _BAD, _CUTS = range(8)
+
+
+def is_error_page(html: str) -> bool:
+    """Throttle/outage pages Sunbiz (or its front end) serves with a 200."""
+    return bool(html) and bool(ERROR_PAGE_RX.search(html[:20000]))
+
+
+def response_ok(status: int, html: str) -> bool:
+    # 404 is a normal answer (e.g. a frontier miss), not congestion
+    return status != 429 and status < 500 and not is_error_page(html)
+
+
+class RateController:
+    """Token bucket with an AIMD-controlled refill rate, shared across processes."""
+
+    def __init__(self, rate: float = START_RATE, min_rate: float = MIN_RATE,
+                 max_rate: float = MAX_RATE, burst: float = BURST):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1.0, burst)
+        self._lock = mp.Lock()
+        now = time.monotonic()
+        self._s = mp.RawArray("d", [min(max(rate, min_rate), max_rate), self.burst, now, 0.0, now, 0, 0, 0])
+
+    def _reserve(self) -> float:
+        """Take a token (possibly on credit) and return how long to wait for it."""
+        with self._lock:
+            s = self._s
+            now = time.monotonic()
+            s[_TOKENS] = min(self.burst, s[_TOKENS] + (now - s[_LAST]) * s[_RATE])
+            s[_LAST] = now
+            s[_TOKENS] -= 1
+            wait = 0.0 if s[_TOKENS] >= 0 else -s[_TOKENS] / s[_RATE]
+        if JITTER_MS > 0:
+            wait += random.randint(0, JITTER_MS) / 1000
+        return wait
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def observe(self, latency_s: float, ok: bool = True):
+        """Feed back one response: ok=False for timeouts, 4xx/5xx and error pages."""
+        ok = ok and latency_s * 1000 <= SLOW_MS
+        line = None
+        with self._lock:
+            s = self._s
+            now = time.monotonic()
+            if ok:
+                s[_OK] += 1
+                if now >= s[_BACKOFF_UNTIL]:
+                    s[_RATE] = min(self.max_rate, s[_RATE] + STEP / max(s[_RATE], 1.0))
+            else:
+                s[_BAD] += 1
+                # one cut per cooldown, so a burst of concurrent failures isn't counted N times
+                if now >= s[_BACKOFF_UNTIL]:
+                    s[_RATE] = max(self.min_rate, s[_RATE] * BACKOFF)
+                    s[_BACKOFF_UNTIL] = now + COOLDOWN_S
+                    s[_CUTS] += 1
+                    line = f"[rate] backing off to {s[_RATE]:.2f} req/s (latency={latency_s:.1f}s)"
+            if line is None and now - s[_LAST_LOG] >= LOG_S:
+                line = self._status_line(now)
+            if line:
+                s[_LAST_LOG] = now
+        if line:
+            print(line)
+
+    def _status_line(self, now: float) -> str:
+        s = self._s
+        left = max(0.0, s[_BACKOFF_UNTIL] - now)
+        return (f"[rate] {s[_RATE]:.2f} req/s ok={int(s[_OK])} bad={int(s[_BAD])} "
+                f"cuts={int(s[_CUTS])} backoff={'%.0fs' % left if left else 'no'}")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            s = self._s
+            return {
+                "rate": round(s[_RATE], 2),
+                "ok": int(s[_OK]),
+                "bad": int(s[_BAD]),
+                "cuts": int(s[_CUTS]),
+                "backing_off": time.monotonic() < s[_BACKOFF_UNTIL],
+            }
+
+
+_controller: Optional[RateController] = None
+_controller_lock = threading.Lock()
+
+
+def get_controller() -> Optional[RateController]:
+    """The process-wide controller (None when NBP_RATE_CONTROL=0)."""
+    global _controller
+    if _controller is None and ENABLED:
+        with _controller_lock:
+            if _controller is None:
+                _controller = RateController()
+    return _controller
+
+
+def install(controller: Optional[RateController]):
+    """Adopt the parent's controller in a pool worker process."""
+    global _controller
+    _controller = controller
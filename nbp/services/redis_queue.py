@@ -0,0 +1,331 @@
+# nbp/services/redis_queue.py
+# Redis work queue for crawling one run from several machines.
+#
+#   jobs.py --enqueue        plans the run and puts its work units in Redis
+#   jobs.py --worker         (any number, any host) leases units, crawls them and
+#                            XADDs each results page to the run's results stream
+#   jobs.py --ingest-stream  (exactly one) reads the stream into the database and
+#                            moves the crawl checkpoints
+#
+# A lease is a score in the `ready` sorted set: the time the unit becomes
+# visible again. Workers heartbeat to push it forward; a crashed worker's unit
+# reappears after NBP_LEASE_S and the next worker resumes it from the last page
+# it published. Every write a worker makes is fenced on its lease token, so a
+# worker that lost its lease cannot move progress backwards. Times come from the
+# Redis server clock, so worker hosts don't need synchronised clocks.
+#
+# Pass any redis-py compatible client (a fakeredis.FakeRedis works) for tests.
+import os, time, uuid, socket
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .spool import dumps as _encode, loads as _decode
+
+REDIS_URL = os.getenv("NBP_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+LEASE_S = float(os.getenv("NBP_LEASE_S", "300"))          # visibility timeout
+HEARTBEAT_S = float(os.getenv("NBP_HEARTBEAT_S", str(max(1.0, LEASE_S / 3))))
+MAX_ATTEMPTS = int(os.getenv("NBP_QUEUE_MAX_ATTEMPTS", "5"))
+POLL_S = float(os.getenv("NBP_QUEUE_POLL_S", "5"))         # idle worker / ingester wait
+KEY_PREFIX = os.getenv("NBP_QUEUE_PREFIX", "nbp:crawl")
+INGEST_GROUP = "ingest"
+
+
+class LeaseLost(RuntimeError):
+    """The unit's lease expired (or it was finished elsewhere); stop working on it."""
+
+
+def get_client(url: str = None):
+    import redis  # only the queue mode needs it
+    return redis.Redis.from_url(url or REDIS_URL)
+
+
+def _str(v) -> Optional[str]:
+    return v.decode("utf-8") if isinstance(v, bytes) else v
+
+
+class Lease:
+    def __init__(self, unit: str, token: str, resume: Optional[Dict], attempts: int):
+        self.unit = unit
+        self.token = token
+        self.resume = resume
+        self.attempts = attempts
+        self.lost = False
+        self.finished = False  # the crawler reported done=True for the unit
+
+
+class WorkQueue:
+    """Work units, leases and the results stream of one crawl run."""
+
+    def __init__(self, client, run_id: str, lease_s: float = LEASE_S):
+        self.r = client
+        self.run_id = run_id
+        self.lease_s = lease_s
+        k = f"{KEY_PREFIX}:{run_id}"
+        self.k_meta = f"{k}:meta"          # hash: run settings
+        self.k_units = f"{k}:units"        # hash: unit -> {"resume", "attempts"}
+        self.k_ready = f"{k}:ready"        # zset: unit -> visible-at (server time)
+        self.k_owner = f"{k}:owner"        # hash: unit -> lease token
+        self.k_done = f"{k}:done"          # set
+        self.k_failed = f"{k}:failed"      # set: gave up after MAX_ATTEMPTS
+        self.k_results = f"{k}:results"    # stream: one entry per results page
+
+    @staticmethod
+    def latest_run(client) -> Optional[str]:
+        return _str(client.get(f"{KEY_PREFIX}:latest"))
+
+    def _now(self) -> float:
+        sec, usec = self.r.time()
+        return sec + usec / 1e6
+
+    def _fenced(self, lease: Lease, fn):
+        """Run fn(pipe) in a MULTI only while `lease` still owns its unit."""
+        import redis
+        with self.r.pipeline() as p:
+            while True:
+                try:
+                    p.watch(self.k_owner)
+                    if _str(p.hget(self.k_owner, lease.unit)) != lease.token:
+                        lease.lost = True
+                        raise LeaseLost(f"lease on {lease.unit} lost")
+                    p.multi()
+                    fn(p)
+                    return p.execute()
+                except redis.WatchError:
+                    continue
+
+    # --- producer ---------------------------------------------------------
+
+    def enqueue(self, units: Iterable[str], resume: Dict[str, Dict] = None, meta: Dict = None) -> int:
+        """Add units (idempotent: already queued or finished units are left alone)."""
+        resume = resume or {}
+        now = self._now()
+        done = {_str(u) for u in self.r.smembers(self.k_done)}
+        p = self.r.pipeline()
+        if meta:
+            p.hset(self.k_meta, mapping={k: _encode(v) for k, v in meta.items()})
+        n = 0
+        for u in units:
+            if u in done:
+                continue
+            p.hsetnx(self.k_units, u, _encode({"resume": resume.get(u), "attempts": 0}))
+            # staggered by a millisecond so units are leased in the given (longest-first) order
+            p.zadd(self.k_ready, {u: now + n * 0.001}, nx=True)
+            n += 1
+        p.set(f"{KEY_PREFIX}:latest", self.run_id)
+        p.execute()
+        return n
+
+    def meta(self) -> Dict:
+        return {_str(k): _decode(v) for k, v in self.r.hgetall(self.k_meta).items()}
+
+    # --- worker -----------------------------------------------------------
+
+    def lease(self) -> Optional[Lease]:
+        """Take the next visible unit, or None if every remaining unit is leased."""
+        import redis
+        token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        with self.r.pipeline() as p:
+            while True:
+                try:
+                    p.watch(self.k_ready)
+                    now = self._now()
+                    due = p.zrangebyscore(self.k_ready, "-inf", now, start=0, num=1)
+                    if not due:
+                        return None
+                    unit = _str(due[0])
+                    state = _decode(p.hget(self.k_units, unit) or "{}")
+                    state["attempts"] = state.get("attempts", 0) + 1
+                    p.multi()
+                    if state["attempts"] > MAX_ATTEMPTS:
+                        p.zrem(self.k_ready, unit)
+                        p.hdel(self.k_owner, unit)
+                        p.sadd(self.k_failed, unit)
+                        p.execute()
+                        print(f"[queue][{unit}] giving up after {MAX_ATTEMPTS} attempts")
+                        continue
+                    p.zadd(self.k_ready, {unit: now + self.lease_s})
+                    p.hset(self.k_owner, unit, token)
+                    p.hset(self.k_units, unit, _encode(state))
+                    p.execute()
+                    return Lease(unit, token, state.get("resume"), state["attempts"])
+                except redis.WatchError:
+                    continue
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """Push the lease's deadline forward; False once it has been lost."""
+        try:
+            deadline = self._now() + self.lease_s
+            self._fenced(lease, lambda p: p.zadd(self.k_ready, {lease.unit: deadline}, xx=True))
+            return True
+        except LeaseLost:
+            return False
+
+    def publish(self, lease: Lease, page_no: int, rows: List[Dict], last_row: Optional[Dict],
+                done: bool = False, worker: str = ""):
+        """Append one results page to the stream and remember it as the unit's resume point."""
+        fields = {
+            "unit": lease.unit,
+            "page": page_no,
+            "rows": _encode(rows),
+            "last_row": _encode(last_row),
+            "done": int(done),
+            "worker": worker,
+        }
+
+        def _tx(p):
+            p.xadd(self.k_results, fields)
+            if page_no:
+                state = {"resume": {"page": page_no,
+                                    "last_name": (last_row or {}).get("name"),
+                                    "last_doc": (last_row or {}).get("doc")},
+                         "attempts": lease.attempts}
+                p.hset(self.k_units, lease.unit, _encode(state))
+            if done:
+                p.zrem(self.k_ready, lease.unit)
+                p.hdel(self.k_owner, lease.unit)
+                p.sadd(self.k_done, lease.unit)
+
+        self._fenced(lease, _tx)
+        if done:
+            lease.finished = True
+
+    def release(self, lease: Lease):
+        """Give an unfinished unit back right away (after an error) instead of waiting out the lease."""
+        try:
+            now = self._now()
+            self._fenced(lease, lambda p: (p.zadd(self.k_ready, {lease.unit: now}, xx=True),
+                                           p.hdel(self.k_owner, lease.unit)))
+        except LeaseLost:
+            pass
+
+    def remaining(self) -> int:
+        """Units not yet finished (queued or leased)."""
+        return self.r.zcard(self.k_ready)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "units": self.r.hlen(self.k_units),
+            "remaining": self.remaining(),
+            "leased": self.r.hlen(self.k_owner),
+            "done": self.r.scard(self.k_done),
+            "failed": self.r.scard(self.k_failed),
+            "stream": self.r.xlen(self.k_results),
+        }
+
+    # --- ingester ---------------------------------------------------------
+
+    def read_results(self, count: int, block_s: float, consumer: str = "ingester",
+                     pending: bool = False) -> List[Tuple[str, Dict]]:
+        """
+        Next stream entries for the ingest consumer group as (id, page) pairs,
+        page = {unit, page, rows, last_row, done}. pending=True re-reads entries
+        delivered earlier but never acked (a crashed ingester's last batch).
+        block_s=0 returns at once with whatever is there.
+        """
+        import redis
+        try:
+            self.r.xgroup_create(self.k_results, INGEST_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        start = "0" if pending else ">"
+        resp = self.r.xreadgroup(INGEST_GROUP, consumer, {self.k_results: start}, count=count,
+                                 block=None if pending or not block_s else int(block_s * 1000))
+        out = []
+        for _stream, entries in resp or []:
+            for msg_id, f in entries:
+                if not f:  # acked and deleted meanwhile
+                    continue
+                f = {_str(k): v for k, v in f.items()}
+                out.append((_str(msg_id), {
+                    "unit": _str(f["unit"]),
+                    "page": int(f["page"]),
+                    "rows": _decode(f["rows"]),
+                    "last_row": _decode(f["last_row"]),
+                    "done": _str(f["done"]) == "1",
+                }))
+        return out
+
+    def ack(self, ids: List[str]):
+        """Mark entries ingested (call after the DB commit) and drop them from the stream."""
+        if not ids:
+            return
+        p = self.r.pipeline()
+        p.xack(self.k_results, INGEST_GROUP, *ids)
+        p.xdel(self.k_results, *ids)
+        p.execute()
+
+
+def run_worker(q: WorkQueue, fetch_recent, *, window_days: int, threads: int = 1,
+               stop_when_empty: bool = True) -> Dict[str, int]:
+    """
+    Lease units and crawl them with fetch_recent (one of the fetch_recent_*
+    engines, one unit per call) in `threads` lease loops, until no unit is left.
+    """
+    import threading
+
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    active: Dict[str, Lease] = {}
+    active_lock = threading.Lock()
+    stop = threading.Event()
+    stats = {"finished": 0, "pages": 0, "rows": 0, "lost": 0, "released": 0}
+    stats_lock = threading.Lock()
+
+    def _beat():
+        while not stop.wait(HEARTBEAT_S):
+            with active_lock:
+                leases = list(active.values())
+            for lease in leases:
+                if not lease.lost and not lease.finished and not q.heartbeat(lease):
+                    print(f"[queue][{lease.unit}] lease lost; abandoning unit")
+
+    def _loop():
+        while not stop.is_set():
+            lease = q.lease()
+            if lease is None:
+                if stop_when_empty and q.remaining() == 0:
+                    return
+                time.sleep(POLL_S)
+                continue
+
+            def on_page(prefix, page_no, rows, last_row, done=False):
+                if lease.lost:
+                    raise LeaseLost(f"lease on {lease.unit} lost")
+                q.publish(lease, page_no, rows, last_row, done=done, worker=worker)
+                with stats_lock:
+                    stats["pages"] += 1
+                    stats["rows"] += len(rows)
+
+            print(f"[queue][{lease.unit}] leased (attempt {lease.attempts})")
+            with active_lock:
+                active[lease.unit] = lease
+            try:
+                fetch_recent(window_days=window_days, prefixes=[lease.unit], concurrency=1,
+                             resume={lease.unit: lease.resume} if lease.resume else None,
+                             on_page=on_page)
+            except Exception as e:
+                print(f"[queue][{lease.unit}] crawl error: {e}")
+            finally:
+                with active_lock:
+                    active.pop(lease.unit, None)
+
+            with stats_lock:
+                if lease.finished:
+                    stats["finished"] += 1
+                elif lease.lost:
+                    stats["lost"] += 1
+                else:
+                    # the engine swallowed an error before the unit's done=True page
+                    stats["released"] += 1
+                    q.release(lease)
+
+    beat = threading.Thread(target=_beat, name="queue-heartbeat", daemon=True)
+    beat.start()
+    loops = [threading.Thread(target=_loop, name=f"queue-worker-{i}") for i in range(max(1, threads))]
+    for t in loops:
+        t.start()
+    try:
+        for t in loops:
+            t.join()
+    finally:
+        stop.set()
+    return stats
@@ -0,0 +1,157 @@
+# nbp/services/reverify.py
+# Re-verification queue for entities already in the DB. Each entity in the
+# window gets a target re-check interval (shorter when it was filed or changed
+# recently, or sits in a county a subscriber sees); the queue is everything
+# past its interval, most overdue first. A single worker fetches detail pages
+# by doc number at NBP_REVERIFY_PER_DAY requests a day, so keeping the window
+# fresh costs a fixed, known number of requests instead of a re-crawl.
+import os, json, time, heapq
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import or_
+from ..models import db, Entity, Jurisdiction, Subscription
+from . import crawl_metrics as metrics
+from .scrape_sunbiz_http import http_session
+from .scrape_sunbiz_playwright import _parse_detail, _build_record, _status_ok
+from .sunbiz_frontier import fetch_detail_by_doc
+
+BASE_DAYS = float(os.getenv("NBP_REVERIFY_BASE_DAYS", "14"))    # interval for an old, unwatched filing
+MIN_DAYS = float(os.getenv("NBP_REVERIFY_MIN_DAYS", "1"))
+RECENT_DAYS = int(os.getenv("NBP_REVERIFY_RECENT_DAYS", "14"))   # "recently filed / changed"
+PER_DAY = int(os.getenv("NBP_REVERIFY_PER_DAY", "5000"))         # detail requests per day
+IDLE_S = float(os.getenv("NBP_REVERIFY_IDLE_S", "600"))          # nothing due: look again after this
+
+
+def visible_places() -> Tuple[Set[str], Set[str]]:
+    """(county names, city names) covered by active county-scoped subscriptions."""
+    slugs = set()
+    for sub in Subscription.query.filter_by(status="active"):
+        try:
+            scope = json.loads(sub.scope_json or "{}")
+        except ValueError:
+            continue
+        if scope.get("kind") == "counties":
+            slugs.update(scope.get("slugs") or [])
+    counties, cities = set(), set()
+    if slugs:
+        for county in Jurisdiction.query.filter(Jurisdiction.kind == "county", Jurisdiction.slug.in_(slugs)):
+            counties.add(county.name)
+            cities.update(c.name for c in county.children)
+    return counties, cities
+
+
+def interval_days(filing_date: Optional[date], event_date: Optional[date], visible: bool,
+                  today: date = None) -> float:
+    """Target days between checks: quartered when just filed, halved when just changed or subscriber-visible."""
+    today = today or date.today()
+    recent = today - timedelta(days=RECENT_DAYS)
+    days = BASE_DAYS
+    if filing_date and filing_date >= recent:
+        days /= 4
+    if event_date and event_date >= recent:
+        days /= 2
+    if visible:
+        days /= 2
+    return max(MIN_DAYS, days)
+
+
+def due_docs(limit: int, window_days: int = None, now: datetime = None) -> Tuple[List[str], Dict]:
+    """
+    Up to `limit` doc_numbers past their interval, most overdue first, plus
+    {"window", "due", "per_day"}: entities in the window, how many are due
+    now, and the requests/day that keeps all of them on schedule.
+    Inactive entities drop out of the queue once we have seen them inactive.
+    """
+    if window_days is None:
+        window_days = int(os.getenv("NBP_WINDOW_DAYS", "90"))
+    now = now or datetime.utcnow()
+    today = now.date()
+    start = today - timedelta(days=window_days)
+    counties, cities = visible_places()
+
+    q = (db.session.query(Entity.doc_number, Entity.filing_date, Entity.event_date_filed,
+                          Entity.verified_at, Entity.created_at, Entity.city, Entity.county, Entity.status)
+         .filter(Entity.doc_number.isnot(None),
+                 or_(Entity.filing_date >= start, Entity.event_date_filed >= start)))
+
+    info = {"window": 0, "due": 0, "per_day": 0.0}
+    due = []
+    for doc, filed, event, verified, created, city, county, status in q.yield_per(10000):
+        if status and not _status_ok(status):
+            continue
+        every = interval_days(filed, event, county in counties or city in cities, today)
+        seen = verified or created or datetime.min
+        overdue = (now - seen).total_seconds() / 86400.0 / every
+        info["window"] += 1
+        info["per_day"] += 1.0 / every
+        if overdue >= 1.0:
+            info["due"] += 1
+            due.append((overdue, doc))
+    info["per_day"] = round(info["per_day"])
+    return [doc for _, doc in heapq.nlargest(limit, due)], info
+
+
+def mark_verified(docs: List[str]):
+    """Push docs Sunbiz no longer shows to the back of the queue."""
+    if docs:
+        Entity.query.filter(Entity.doc_number.in_(docs)).update(
+            {"verified_at": datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+
+
+def run_reverify(write: Callable, *, limit: int = None, per_day: int = PER_DAY,
+                 batch: int = 50, idle_s: float = IDLE_S) -> Dict:
+    """
+    Re-check due entities one request every 86400/per_day seconds and hand
+    each batch to write(rows, missing_docs). Stops after `limit` checks, or
+    with limit=None keeps going (sleeping idle_s when nothing is due).
+    Request errors, block pages and any answer other than the document or
+    "no such document" leave the doc due; it is retried with the next batch.
+    """
+    pace = 86400.0 / max(1, per_day)
+    stats = {"checked": 0, "inactive": 0, "missing": 0, "errors": 0}
+    with http_session(pool_size=1) as s:
+        while limit is None or stats["checked"] < limit:
+            n = batch if limit is None else min(batch, limit - stats["checked"])
+            docs, info = due_docs(n)
+            if not docs:
+                if limit is not None:
+                    break
+                print(f"[reverify] nothing due ({info['window']} in window); sleeping {idle_s:.0f}s")
+                db.session.remove()
+                time.sleep(idle_s)
+                continue
+            print(f"[reverify] {info['due']} due of {info['window']} in window "
+                  f"(~{info['per_day']}/day keeps them on schedule, budget {per_day}/day)")
+
+            rows, missing, errors = [], [], 0
+            for doc in docs:
+                t0 = time.monotonic()
+                try:
+                    hit = fetch_detail_by_doc(s, doc, raise_errors=True)
+                except Exception as e:
+                    errors += 1
+                    metrics.inc("reverify", outcome="error")
+                    print(f"[reverify] fetch failed {doc}: {e}")
+                    hit = False
+                if hit:
+                    name, html = hit
+                    rec = _build_record({"name": name, "doc": doc}, _parse_detail(html))
+                    rows.append(rec)
+                    outcome = "active" if _status_ok(rec.get("status")) else "inactive"
+                    stats["inactive"] += outcome == "inactive"
+                    metrics.inc("reverify", outcome=outcome)
+                elif hit is None:
+                    missing.append(doc)
+                    metrics.inc("reverify", outcome="missing")
+                stats["checked"] += 1
+                time.sleep(max(0.0, pace - (time.monotonic() - t0)))
+
+            write(rows, missing)
+            stats["missing"] += len(missing)
+            stats["errors"] += errors
+            print(f"[reverify] cumulative {stats}")
+            if errors == len(docs):
+                print(f"[reverify] every request in the batch failed; backing off {idle_s:.0f}s")
+                time.sleep(idle_s)
+    return stats
@@ -1,27 +1,56 @@
 # nbp/services/scrape_sunbiz.py
-import os, time, random, re
+import os, time, random, re, threading
 from datetime import date, timedelta
-from typing import Iterable, Dict, Optional, List
+from typing import Iterable, Dict, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from dateutil.parser import parse as parse_dt
 
 from ..models import db, Entity
+from .rate_control import get_controller, response_ok
 
 USER_AGENT = os.getenv("NBP_UA", "NewBizPulseBot/0.1 (contact: you@example.com)")
-BASE_LIST = "https://search.sunbiz.org/Inquiry/CorporationSearch/ByDate"     # form page
+BASE_LIST = os.getenv("NBP_SUNBIZ_BASE", "https://search.sunbiz.org").rstrip("/") + "/Inquiry/CorporationSearch/ByDate"  # form page
 # We will discover the POST action from the <form>, but you can force it here if needed:
 FORCED_POST = os.getenv("NBP_SUNBIZ_POST", "").strip()  # e.g. "https://search.sunbiz.org/Inquiry/CorporationSearch/SearchByDate"
 
 DEBUG = os.getenv("NBP_DEBUG", "0") == "1"
+BS_PARSER = os.getenv("NBP_BS_PARSER", "lxml")
+
+DAYS_IN_FLIGHT = int(os.getenv("NBP_BYDATE_CONCURRENCY", "4"))  # days crawled at once
+MAX_PAGES = int(os.getenv("NBP_BYDATE_MAX_PAGES", "500"))       # per day; a safety stop, reported when hit
+TIMEOUT = int(os.getenv("NBP_HTTP_TIMEOUT", "30"))
 
 def _sleep():
+    # with the shared rate controller, pacing is a token instead of a fixed delay
+    rate = get_controller()
+    if rate:
+        rate.acquire()
+        return
     time.sleep(random.uniform(0.6, 1.6))
 
-def polite_session() -> requests.Session:
+def _observe_response(r, *args, **kwargs):
+    rate = get_controller()
+    if rate:
+        rate.observe(r.elapsed.total_seconds(), response_ok(r.status_code, r.text))
+
+def polite_session(pool_size: int = 1) -> requests.Session:
+    """
+    Keep-alive session, safe to share between the day workers: its connection
+    pool holds `pool_size` connections and 429/5xx answers are retried.
+    """
     s = requests.Session()
     s.headers.update({"User-Agent": USER_AGENT})
+    retry = Retry(total=2, backoff_factor=1.0, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset({"GET", "POST"}))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.hooks["response"].append(_observe_response)
     return s
 
 def _collect_form_payload(form: BeautifulSoup) -> Dict[str, str]:
@@ -77,6 +106,11 @@ def _find_results_table(soup: BeautifulSoup) -> Optional[BeautifulSoup]:
             best_score = score
     return best
 
+DOC_CELL_RX = re.compile(r"^[A-Z]{0,2}\d{5,12}$")
+TYPE_WORDS_RX = re.compile(
+    r"\b(LLC|L\.L\.C|CORP|CORPORATION|INC|COMPANY|PROFIT|LIMITED|LIABILITY|PARTNERSHIP|"
+    r"ASSOCIATION|TRUST|DOMESTIC|FOREIGN|FICTITIOUS)\b", re.I)
+
 def parse_filing_row(tr) -> Optional[Dict]:
     tds = tr.find_all("td")
     if len(tds) < 2:
@@ -94,19 +128,26 @@ def parse_filing_row(tr) -> Optional[Dict]:
     else:
         name = cells[0] if cells else ""
 
-    # Doc number: search any cell for an alphanumeric doc-like token
+    # Doc number: a cell that is a whole doc-number token (L24000123456, P97000012345, A12345),
+    # else the first doc-like token outside the name cell
     doc_number = ""
-    for c in cells[:3]:  # usually early columns
-        m = re.search(r"[A-Z0-9]{6,}", c.replace(" ", ""))
-        if m:
-            doc_number = m.group(0)
-            break
+    doc_idx = next((i for i, c in enumerate(cells[1:], 1) if DOC_CELL_RX.match(c.replace(" ", ""))), None)
+    if doc_idx is not None:
+        doc_number = cells[doc_idx].replace(" ", "")
+    else:
+        for c in cells[1:3]:  # usually early columns
+            m = re.search(r"(?=[A-Z]*\d)[A-Z0-9]{6,}", c.replace(" ", ""))
+            if m:
+                doc_number = m.group(0)
+                break
 
-    # Entity type: best-effort guess from one of the cells
+    # Entity type: the filing-type cell (not the name, doc number or date)
     entity_type = ""
-    for c in cells:
-        if any(k in c.upper() for k in ("LLC", "CORP", "INC", "L.L.C", "CO. ", "COMPANY")):
-            entity_type = c.split()[0][:50]
+    for i, c in enumerate(cells[1:], 1):
+        if i == doc_idx or re.search(r"\d{1,2}/\d{1,2}/\d{4}", c):
+            continue
+        if TYPE_WORDS_RX.search(c):
+            entity_type = c[:50]
             break
 
     # Filing date: sniff mm/dd/yyyy in any cell
@@ -172,23 +213,30 @@ def _find_pagination_links(soup: BeautifulSoup, current_url: str) -> List[str]:
             out.append(u); seen.add(u)
     return out
 
-def fetch_by_date(d: date) -> Iterable[Dict]:
-    s = polite_session()
-
-    # 1) GET the form page to capture hidden fields + action
-    r1 = s.get(BASE_LIST, timeout=30)
-    r1.raise_for_status()
-    _sleep()
-    _save_debug_html(f"sunbiz_form_{d.isoformat()}", r1.text)
-
-    soup1 = BeautifulSoup(r1.text, "html.parser")
-    form, action_url = _first_form_and_action(soup1, r1.url)
-    if not form:
-        print("[sunbiz] no form on page; layout changed?")
-        return []
-    post_url = FORCED_POST or action_url
-    payload = _collect_form_payload(form)
-
+class _ByDateForm:
+    """The ByDate form's hidden fields and POST URL, fetched once per session and shared by the day workers."""
+
+    def __init__(self, s: requests.Session):
+        self.s = s
+        self._lock = threading.Lock()
+        self._form: Optional[Tuple[str, Dict[str, str]]] = None
+
+    def get(self, refresh: bool = False) -> Optional[Tuple[str, Dict[str, str]]]:
+        with self._lock:
+            if self._form is None or refresh:
+                r1 = self.s.get(BASE_LIST, timeout=TIMEOUT)
+                r1.raise_for_status()
+                _sleep()
+                _save_debug_html("sunbiz_form", r1.text)
+                form, action_url = _first_form_and_action(BeautifulSoup(r1.text, BS_PARSER), r1.url)
+                if not form:
+                    print("[sunbiz] no form on page; layout changed?")
+                    return None
+                self._form = (FORCED_POST or action_url, _collect_form_payload(form))
+            post_url, payload = self._form
+            return post_url, dict(payload)
+
+def _date_payload(payload: Dict[str, str], d: date) -> Dict[str, str]:
     # 2) Fill in date fields (common names shown; adjust if your form uses different)
     # Inspect the form markup; if the inputs are called different names, we still set them:
     date_str = d.strftime("%m/%d/%Y")
@@ -204,34 +252,111 @@ def fetch_by_date(d: date) -> Iterable[Dict]:
     # Some forms need a submit button name/value:
     # (If you see it in DevTools, set it; otherwise harmless.)
     payload.setdefault("SearchButton", "Search")
+    return payload
 
-    # 3) POST the form
-    r2 = s.post(post_url, data=payload, timeout=30)
+def fetch_by_date(d: date, s: requests.Session = None, form: _ByDateForm = None) -> Iterable[Dict]:
+    """
+    Every filing listed for day `d`, following all result pages. Pass a shared
+    session and form (as fetch_by_date_range does) to skip the form GET.
+    """
+    s = s or polite_session()
+    form = form or _ByDateForm(s)
+
+    # 1) form fields + action (cached), 3) POST the search; a stale token gets one refresh
+    r2 = None
+    for refresh in (False, True):
+        got = form.get(refresh=refresh)
+        if not got:
+            return []
+        post_url, payload = got
+        r2 = s.post(post_url, data=_date_payload(payload, d), timeout=TIMEOUT)
+        _sleep()
+        if r2.ok:
+            break
     r2.raise_for_status()
-    _sleep()
     _save_debug_html(f"sunbiz_results_{d.isoformat()}_page1", r2.text)
 
-    soup2 = BeautifulSoup(r2.text, "html.parser")
-    table = _find_results_table(soup2)
-    filings = _parse_table_rows(table) if table else []
-
-    # 4) Try pagination (follow “Next”/page number links on first page only)
-    if table:
-        pages = _find_pagination_links(soup2, r2.url)
-        # Limit pages to be polite
-        for i, url in enumerate(pages[:9], start=2):
-            r = s.get(url, timeout=30)
-            if not r.ok:
-                break
-            _sleep()
-            _save_debug_html(f"sunbiz_results_{d.isoformat()}_page{i}", r.text)
-            soup = BeautifulSoup(r.text, "html.parser")
-            t = _find_results_table(soup)
-            if not t:
-                break
-            filings += _parse_table_rows(t)
+    soup = BeautifulSoup(r2.text, BS_PARSER)
+    table = _find_results_table(soup)
+    if not table:
+        return []
+    filings = _parse_table_rows(table)
+
+    # 4) Pagination: every page may link to others ("Next", page numbers);
+    # follow each distinct URL once, breadth-first from page 1.
+    seen_urls = {r2.url}
+    queue = [u for u in _find_pagination_links(soup, r2.url) if u not in seen_urls]
+    seen_urls.update(queue)
+    page_no = 1
+    while queue:
+        if page_no >= MAX_PAGES:
+            print(f"[sunbiz] {d.isoformat()}: stopped at NBP_BYDATE_MAX_PAGES={MAX_PAGES}; "
+                  f"{len(queue)} page links not followed")
+            break
+        url = queue.pop(0)
+        r = s.get(url, timeout=TIMEOUT)
+        _sleep()
+        if not r.ok:
+            print(f"[sunbiz] {d.isoformat()}: page {url} failed ({r.status_code})")
+            continue
+        page_no += 1
+        _save_debug_html(f"sunbiz_results_{d.isoformat()}_page{page_no}", r.text)
+        soup = BeautifulSoup(r.text, BS_PARSER)
+        t = _find_results_table(soup)
+        if not t:
+            continue
+        filings += _parse_table_rows(t)
+        for u in _find_pagination_links(soup, r.url):
+            if u not in seen_urls:
+                seen_urls.add(u)
+                queue.append(u)
+
+    # the same filing can show up on two pages when the list shifts while we page
+    out, seen_docs = [], set()
+    for rec in filings:
+        if rec["doc_number"] not in seen_docs:
+            seen_docs.add(rec["doc_number"])
+            out.append(rec)
+    if DEBUG:
+        print(f"[sunbiz] {d.isoformat()}: {page_no} pages, {len(out)} filings")
+    return out
 
-    return filings
+def fetch_by_date_range(days: Iterable[date], concurrency: int = None) -> Iterable[Tuple[date, List[Dict]]]:
+    """
+    Yield (day, filings) as days finish, with at most `concurrency`
+    (NBP_BYDATE_CONCURRENCY) days in flight on one pooled session.
+    A day that fails is reported and yielded with no rows.
+    """
+    if concurrency is None:
+        concurrency = DAYS_IN_FLIGHT
+    days = list(days)
+    concurrency = max(1, min(concurrency, len(days) or 1))
+    s = polite_session(pool_size=concurrency)
+    form = _ByDateForm(s)
+    todo = iter(days)
+
+    def _one(d: date) -> List[Dict]:
+        return list(fetch_by_date(d, s, form))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        running = {}
+        for d in todo:
+            running[ex.submit(_one, d)] = d
+            if len(running) >= concurrency:
+                break
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                d = running.pop(fut)
+                try:
+                    rows = fut.result()
+                except Exception as e:
+                    print(f"[sunbiz] {d.isoformat()}: fetch failed: {e}")
+                    rows = []
+                nxt = next(todo, None)
+                if nxt is not None:
+                    running[ex.submit(_one, nxt)] = nxt
+                yield d, rows
 
 def upsert_entity(rec: Dict) -> bool:
     existing = Entity.query.filter_by(doc_number=rec["doc_number"]).first()
@@ -267,8 +392,10 @@ def run_sunbiz_scrape(days_back: int = 1, max_rows: int = 2000, dry_run: bool =
     start = today - timedelta(days=days_back - 1)
     all_days = [start + timedelta(days=i) for i in range(days_back)]
 
-    for d in all_days:
-        rows = list(fetch_by_date(d))
+    # days are crawled concurrently; each one is upserted and committed as soon as it lands
+    days_done = 0
+    for d, rows in fetch_by_date_range(all_days):
+        days_done += 1
         if DEBUG and not rows:
             print("[sunbiz] 0 rows parsed; check debug HTML files for", d.isoformat())
         for rec in rows:
@@ -281,6 +408,7 @@ def run_sunbiz_scrape(days_back: int = 1, max_rows: int = 2000, dry_run: bool =
                 break
         if not dry_run:
             db.session.commit()
+        print(f"[sunbiz] {d.isoformat()}: {len(rows)} filings ({days_done}/{len(all_days)} days)")
         if total_seen >= max_rows:
             break
 
@@ -0,0 +1,270 @@
+# nbp/services/scrape_sunbiz_http.py
+# Pure-HTTP ByName crawler (no headless browser). ByName lists and detail pages
+# are server-rendered HTML, so pooled keep-alive sessions are enough. Parsing and
+# record shaping reuse the Playwright crawler's helpers so both modes keep the same rows.
+import os, re, time, threading, html as htmlmod
+from datetime import date
+from typing import List, Dict, Iterable, Optional
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup
+
+from .scrape_sunbiz import _collect_form_payload, _first_form_and_action
+from .html_archive import archive_page
+from . import crawl_metrics as metrics
+from .rate_control import get_controller, response_ok
+from .parse_pool import get_parse_pool
+from .pipeline import PipelineStopped
+from .scrape_sunbiz_playwright import (
+    HOME, BYNAME, USER_AGENT, BS_PARSER,
+    _parse_results_table, _status_ok, _sleep, _save_debug,
+    _window_start, _select_rows, _build_record, _search_start, _resume_rows,
+)
+
+DETAIL_WORKERS = int(os.getenv("NBP_HTTP_DETAIL_WORKERS", "4"))
+TIMEOUT = int(os.getenv("NBP_HTTP_TIMEOUT", "30"))
+
+NEXT_LIST_RX = re.compile(r'<a\b[^>]*\bhref="([^"]+)"[^>]*>\s*(?:Next List|Next&gt;|Next>)', re.I)
+
+
+def _observe_response(r, *args, **kwargs):
+    # wire size when the server says so, else the decoded body
+    metrics.inc("bytes_transferred", int(r.headers.get("Content-Length") or len(r.content)))
+    metrics.inc("documents")
+    rate = get_controller()
+    if rate:
+        rate.observe(r.elapsed.total_seconds(), response_ok(r.status_code, r.text))
+
+
+def observe_failure(t0: float):
+    """Report a request that raised (timeout, reset) to the rate controller."""
+    rate = get_controller()
+    if rate:
+        rate.observe(time.monotonic() - t0, ok=False)
+
+
+class _ObservedRetry(Retry):
+    """Retry that reports each retried 429/5xx or connection error, which the response hook never sees."""
+    def increment(self, *args, **kwargs):
+        metrics.inc("http_retries")
+        rate = get_controller()
+        if rate:
+            rate.observe(0.0, ok=False)
+        return super().increment(*args, **kwargs)
+
+
+def http_session(pool_size: int = None) -> requests.Session:
+    """
+    Keep-alive session with a connection pool sized for the detail workers.
+    Every response is reported to the shared rate controller.
+    """
+    if pool_size is None:
+        pool_size = DETAIL_WORKERS
+    s = requests.Session()
+    s.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US"})
+    retry = _ObservedRetry(total=2, backoff_factor=1.0, status_forcelist=(429, 500, 502, 503, 504),
+                           allowed_methods=frozenset({"GET", "POST"}))
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(2, pool_size), max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.hooks["response"].append(_observe_response)
+    return s
+
+
+def _next_list_url(html: str, current_url: str) -> Optional[str]:
+    m = NEXT_LIST_RX.search(html or "")
+    if not m:
+        return None
+    return urljoin(current_url, htmlmod.unescape(m.group(1)))
+
+
+def _submit_search(s: requests.Session, term: str) -> Optional[requests.Response]:
+    """GET the ByName form (hidden fields + action) and POST the search term."""
+    r1 = s.get(BYNAME, timeout=TIMEOUT)
+    r1.raise_for_status()
+    _sleep()
+
+    soup = BeautifulSoup(r1.text, BS_PARSER)
+    form, action_url = _first_form_and_action(soup, r1.url)
+    if not form:
+        _save_debug(f"byname_form_missing_{term}", r1.text)
+        return None
+    payload = _collect_form_payload(form)
+
+    box = form.find("input", attrs={"name": re.compile("SearchTerm", re.I)}) \
+        or form.find("input", attrs={"type": "text"})
+    if not box or not box.get("name"):
+        _save_debug(f"byname_no_searchterm_{term}", r1.text)
+        return None
+    payload[box["name"]] = term
+
+    r2 = s.post(action_url, data=payload, timeout=TIMEOUT)
+    r2.raise_for_status()
+    _sleep()
+    return r2
+
+
+def _fetch_detail(s: requests.Session, row: Dict) -> Optional[Dict]:
+    detail_url = row["href"]
+    if not detail_url.startswith("http"):
+        detail_url = urljoin(HOME, detail_url)
+    t0 = time.monotonic()
+    try:
+        r = s.get(detail_url, timeout=TIMEOUT)
+        r.raise_for_status()
+    except requests.HTTPError as e:
+        metrics.inc("nav_failures")
+        print(f"[sunbiz][http] detail fetch failed {row.get('doc')}: {e}")
+        return None
+    except Exception as e:
+        metrics.inc("nav_failures")
+        observe_failure(t0)
+        print(f"[sunbiz][http] detail fetch failed {row.get('doc')}: {e}")
+        return None
+    metrics.observe("detail_nav_seconds", time.monotonic() - t0)
+    metrics.inc("detail_pages")
+    _sleep(300)
+    archive_page("detail", r.text, doc_number=row["doc"], name=row["name"], url=detail_url)
+    return get_parse_pool().submit(r.text).result()  # CPU in the parse pool, off the GIL
+
+
+def _crawl_one_prefix_http(s: requests.Session, pool: ThreadPoolExecutor,
+                           prefix: str, window_days: int,
+                           resume: Optional[Dict] = None, on_page=None) -> List[Dict]:
+    """
+    HTTP twin of _crawl_one_prefix: same pages, same kept records.
+    resume/on_page behave as in _crawl_one_prefix_async.
+    """
+    today = date.today()
+    if window_days is None:
+        window_days = int(os.getenv("NBP_WINDOW_DAYS", "90"))
+
+    window_start = _window_start(window_days)
+
+    def in_window(d):
+        return d is not None and window_start <= d <= today
+
+    keep: List[Dict] = []
+    kept = 0
+    PER_PAGE_CAP = int(os.getenv("NBP_MAX_DETAIL_PER_PREFIX", "0"))  # 0 = unlimited
+    MAX_PAGES    = int(os.getenv("NBP_MAX_PAGES_PER_PREFIX", "0"))    # 0 = unlimited
+    cap = int(os.getenv("NBP_TARGET_TOTAL", "0"))
+
+    def _hand_off(pages_done, page_keep, last_row):
+        if on_page:
+            on_page(prefix, pages_done, page_keep, last_row)
+        else:
+            keep.extend(page_keep)
+
+    term, pages_seen = _search_start(prefix, resume)
+    with metrics.timer("results_nav_seconds"):
+        resp = _submit_search(s, term)
+    if resp is None:
+        return keep
+
+    while True:
+        if MAX_PAGES and pages_seen >= MAX_PAGES:
+            break
+
+        html = resp.text
+        archive_page("results", html, prefix=prefix, page=pages_seen+1, url=resp.url)
+        with metrics.timer("parse_seconds", kind="results"):
+            rows_all = _parse_results_table(html)
+        if not rows_all:
+            break
+
+        active_pref_rows = _select_rows(rows_all, prefix, pages_seen, window_start)
+        if active_pref_rows is None:
+            break
+        if resume:
+            active_pref_rows = _resume_rows(active_pref_rows, resume)
+            resume = None
+
+        page_keep: List[Dict] = []
+        rows_iter = active_pref_rows if PER_PAGE_CAP == 0 else active_pref_rows[:PER_PAGE_CAP]
+
+        # fetch this page's detail pages concurrently; map() keeps list order
+        for row, info in zip(rows_iter, pool.map(lambda r: _fetch_detail(s, r), rows_iter)):
+            if info is None:
+                metrics.inc("rows", outcome="detail_failed")
+                continue
+            if info.get("status") and not _status_ok(info["status"]):
+                metrics.inc("rows", outcome="inactive")
+                continue
+            if any(in_window(info.get(k)) for k in ("filing_date", "event_date_filed")):
+                page_keep.append(_build_record(row, info))
+                kept += 1
+                metrics.inc("rows", outcome="kept")
+                metrics.inc("rows_kept", prefix=prefix)
+                if cap and kept >= cap:
+                    _hand_off(pages_seen + 1, page_keep, row)
+                    return keep
+            else:
+                metrics.inc("rows", outcome="out_of_window")
+
+        _hand_off(pages_seen + 1, page_keep, rows_all[-1])
+
+        # Next results page for SAME prefix
+        next_url = _next_list_url(html, resp.url)
+        if not next_url:
+            break
+        with metrics.timer("results_nav_seconds"):
+            resp = s.get(next_url, timeout=TIMEOUT)
+        resp.raise_for_status()
+        _sleep()
+        pages_seen += 1
+
+    if on_page:
+        on_page(prefix, pages_seen, [], None, done=True)
+    return keep
+
+
+def fetch_recent_by_name_prefixes_http(*, window_days: int = None, prefixes: Iterable[str], concurrency: int = None,
+                                       resume: Dict[str, Dict] = None, on_page=None) -> List[Dict]:
+    """
+    Crawl prefixes over plain HTTP. `concurrency` prefixes run at once, and
+    all of them share one pool of NBP_HTTP_DETAIL_WORKERS detail fetchers.
+    on_page is called from the prefix worker threads.
+    """
+    if window_days is None:
+        window_days = int(os.getenv("NBP_WINDOW_DAYS", "90"))
+    if concurrency is None:
+        concurrency = int(os.getenv("NBP_CONCURRENCY", "2"))
+
+    prefixes = list(prefixes)
+    if not prefixes:
+        return []
+    concurrency = max(1, min(concurrency, len(prefixes)))
+    resume = resume or {}
+
+    results: List[Dict] = []
+    stopped = threading.Event()
+
+    def _worker(pref: str) -> List[Dict]:
+        if stopped.is_set():  # queued behind a unit that hit a stopped writer
+            return []
+        t0 = time.monotonic()
+        try:
+            with http_session() as s:
+                return _crawl_one_prefix_http(s, detail_pool, pref, window_days, resume.get(pref), on_page)
+        finally:
+            metrics.inc("prefix_seconds", time.monotonic() - t0, prefix=pref)
+
+    with ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as detail_pool, \
+         ThreadPoolExecutor(max_workers=concurrency) as ex:
+        futs = {ex.submit(_worker, pref): pref for pref in prefixes}
+        for fut in futs:
+            try:
+                results.extend(fut.result())
+            except PipelineStopped:
+                stopped.set()
+                raise
+            except Exception as e:
+                metrics.inc("prefix_errors")
+                print(f"[sunbiz][{futs[fut]}] worker error:", e)
+
+    return results
@@ -1,22 +1,30 @@
-import os, re, time
+import os, re, time, asyncio, threading
 from datetime import date, timedelta
-from typing import List, Dict, Iterable
+from typing import List, Dict, Iterable, Optional, Tuple
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from playwright.async_api import async_playwright, TimeoutError as PWAsyncTimeout
 from bs4 import BeautifulSoup
 from dateutil.parser import parse as parse_dt
 from urllib.parse import urljoin
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import random
 
+from .html_archive import archive_page, ARCHIVE_DIR
+from .sunbiz_docnum import classify_doc, OUT
+from .sunbiz_detail import DATE_DOC_RX, NO_TEXT_TAGS, parse_detail_lxml, parse_detail_text, tidy_text
+from .parse_pool import get_parse_pool, done_future
+from .pipeline import PipelineStopped
+from . import crawl_metrics as metrics
+from .rate_control import get_controller, install as install_rate_controller, is_error_page
+
 
 
 BS_PARSER = os.getenv("NBP_BS_PARSER", "lxml")
-DATE_DOC_RX = re.compile(r'^\d{1,2}/\d{1,2}/\d{4}\s+--\s+', re.I)
 
 
 
-HOME = "https://search.sunbiz.org"
-BYNAME = "https://search.sunbiz.org/Inquiry/CorporationSearch/ByName"
+HOME = os.getenv("NBP_SUNBIZ_BASE", "https://search.sunbiz.org").rstrip("/")  # a local stand-in for benchmarks
+BYNAME = f"{HOME}/Inquiry/CorporationSearch/ByName"
 USER_AGENT = os.getenv("NBP_UA", "Mozilla/5.0 (Macintosh; Intel Mac OS X) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0 Safari/537.36")
 DEBUG = os.getenv("NBP_DEBUG", "0") == "1"
 
@@ -26,6 +34,167 @@ SLEEP_MS = int(os.getenv("NBP_SLEEP_MS", "600"))  # between page actions
 
 STATUS_RX = os.getenv("NBP_STATUS_REGEX", r"^\s*active\b")  # matches “Active”, case-insensitive
 
+# Requests the parsers never need are aborted at the context (NBP_BLOCK_TYPES=""
+# and NBP_BLOCK_URLS="" load everything). NBP_LOAD_STATE=domcontentloaded stops
+# waiting for network idle on the home page and after a search.
+BLOCK_TYPES = {t.strip() for t in os.getenv("NBP_BLOCK_TYPES", "image,media,font,stylesheet").split(",") if t.strip()}
+BLOCK_URLS = os.getenv("NBP_BLOCK_URLS", r"google-analytics\.com|googletagmanager\.com|doubleclick\.net|"
+                                         r"facebook\.(?:net|com)/tr|hotjar\.com|newrelic\.com|nr-data\.net")
+BLOCK_URLS_RX = re.compile(BLOCK_URLS, re.I) if BLOCK_URLS else None
+LOAD_STATE = os.getenv("NBP_LOAD_STATE", "networkidle")
+
+# A context that has navigated thousands of detail pages keeps growing (history,
+# renderer heap). At the next results-page boundary past either limit it is
+# closed and the search re-submitted from the page's last row.
+RECYCLE_NAVS = int(os.getenv("NBP_RECYCLE_NAVS", "400"))      # 0 = never by count
+RECYCLE_RSS_MB = int(os.getenv("NBP_RECYCLE_RSS_MB", "1500"))  # worker + its Chromium; 0 = never
+RSS_LOG_S = float(os.getenv("NBP_RSS_LOG_S", "60"))
+RSS_SAMPLE_S = float(os.getenv("NBP_RSS_SAMPLE_S", "5"))      # reuse one /proc scan this long
+
+# doc_numbers ingested recently enough that their detail page can be skipped
+_KNOWN_DOCS: frozenset = frozenset()
+
+def set_known_docs(docs: Iterable[str]):
+    """Install the known-doc set (also used as the process-pool initializer)."""
+    global _KNOWN_DOCS
+    _KNOWN_DOCS = frozenset(docs or ())
+
+def _init_worker(known_docs, rate_controller):
+    """Process-pool initializer: known-doc set + the parent's shared rate controller."""
+    set_known_docs(known_docs)
+    install_rate_controller(rate_controller)
+
+
+def _observe(latency_s: float, html: str = None, ok: bool = True):
+    rate = get_controller()
+    if rate:
+        rate.observe(latency_s, ok and not is_error_page(html))
+
+def _blocked(request) -> bool:
+    if request.resource_type in BLOCK_TYPES or (BLOCK_URLS_RX and BLOCK_URLS_RX.search(request.url)):
+        metrics.inc("blocked_requests", type=request.resource_type)
+        return True
+    return False
+
+def _count_bytes(event):
+    # CDP Network.loadingFinished: bytes on the wire (headers + compressed body)
+    metrics.inc("bytes_transferred", event.get("encodedDataLength") or 0)
+
+def _count_document(event):
+    if event.get("type") == "Document":
+        metrics.inc("documents")
+
+def _prepare_context(ctx, page):
+    """Install the request filter and the transfer counters on a new context and its page."""
+    if BLOCK_TYPES or BLOCK_URLS_RX:
+        ctx.route("**/*", lambda route: route.abort() if _blocked(route.request) else route.continue_())
+    cdp = ctx.new_cdp_session(page)
+    cdp.send("Network.enable")
+    cdp.on("Network.loadingFinished", _count_bytes)
+    cdp.on("Network.responseReceived", _count_document)
+
+async def _aprepare_context(ctx, page):
+    """Async twin of _prepare_context."""
+    if BLOCK_TYPES or BLOCK_URLS_RX:
+        async def _route(route):
+            if _blocked(route.request):
+                await route.abort()
+            else:
+                await route.continue_()
+        await ctx.route("**/*", _route)
+    cdp = await ctx.new_cdp_session(page)
+    await cdp.send("Network.enable")
+    cdp.on("Network.loadingFinished", _count_bytes)
+    cdp.on("Network.responseReceived", _count_document)
+
+def _wait_loaded(page):
+    """After a click that navigates: LOAD_STATE, falling back to domcontentloaded."""
+    try: page.wait_for_load_state(LOAD_STATE, timeout=15000)
+    except PWTimeout: page.wait_for_load_state("domcontentloaded", timeout=15000)
+
+async def _await_loaded(page):
+    try: await page.wait_for_load_state(LOAD_STATE, timeout=15000)
+    except PWAsyncTimeout: await page.wait_for_load_state("domcontentloaded", timeout=15000)
+
+def _tree_rss_mb(root: int = None) -> float:
+    """RSS of this worker process plus all its descendants (the Chromium it launched), from /proc."""
+    root = root or os.getpid()
+    children: Dict[int, List[int]] = {}
+    for d in os.listdir("/proc"):
+        if not d.isdigit():
+            continue
+        try:
+            with open(f"/proc/{d}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(d))
+    total, todo = 0, [root]
+    page_kb = os.sysconf("SC_PAGE_SIZE") // 1024
+    while todo:
+        pid = todo.pop()
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_kb
+        except (OSError, IndexError, ValueError):
+            pass
+        todo.extend(children.get(pid, ()))
+    return total / 1024
+
+_rss_logged = [0.0]
+_rss_sample = [float("-inf"), 0.0]  # (monotonic time, MB) of the last /proc scan
+
+def _sampled_rss_mb() -> float:
+    """_tree_rss_mb(), rescanned at most every NBP_RSS_SAMPLE_S rather than at every page."""
+    now = time.monotonic()
+    if now - _rss_sample[0] >= RSS_SAMPLE_S:
+        _rss_sample[:] = [now, _tree_rss_mb()]
+    return _rss_sample[1]
+
+def _rss_high(prefix: str, navs: int) -> bool:
+    """True once worker RSS is over NBP_RECYCLE_RSS_MB; logs it every NBP_RSS_LOG_S."""
+    if not (RECYCLE_RSS_MB or RSS_LOG_S) or not os.path.isdir("/proc"):
+        return False
+    rss = _sampled_rss_mb()
+    now = time.monotonic()
+    if RSS_LOG_S and now - _rss_logged[0] >= RSS_LOG_S:
+        _rss_logged[0] = now
+        print(f"[sunbiz][{prefix}] worker pid={os.getpid()} rss={rss:.0f}MB navs={navs}")
+    return bool(RECYCLE_RSS_MB) and rss >= RECYCLE_RSS_MB
+
+def _should_recycle(prefix: str, navs: int) -> bool:
+    """Check the recycle limits at a page boundary (one context per worker process)."""
+    if RECYCLE_NAVS and navs >= RECYCLE_NAVS:
+        return True
+    return _rss_high(prefix, navs)
+
+def _open_search(browser, term: str):
+    """New context + page showing the ByName results for `term`; (ctx, None) if the form is missing."""
+    ctx = browser.new_context(user_agent=USER_AGENT, java_script_enabled=True, locale="en-US")
+    page = ctx.new_page()
+    _prepare_context(ctx, page)
+    page.goto(HOME, wait_until=LOAD_STATE, timeout=60000); _sleep()
+    page.goto(BYNAME, wait_until="domcontentloaded", timeout=60000); _sleep()
+    box = page.query_selector('input[name*="SearchTerm" i], input[type="text"]')
+    if not box: return ctx, None
+    box.fill(term); _sleep(200)
+    btn = page.query_selector('button:has-text("Search"), input[type="submit"]')
+    if not btn: return ctx, None
+    btn.click()
+    _wait_loaded(page)
+    _sleep()
+    return ctx, page
+
+# Skip detail pages whose doc number says they were filed before the window.
+# Off by default: a row is kept when its Date Filed *or* Event Date Filed is in
+# the window, and the results list shows no event date, so an old doc number
+# (a reinstatement, an amendment) is never certainly out. NBP_DOC_YEAR_FILTER=1
+# trades those rows for fewer detail fetches.
+DOC_YEAR_FILTER = os.getenv("NBP_DOC_YEAR_FILTER", "0") == "1"
+
+# detail fetches avoided in this process, by reason
+SKIP_COUNTS = {"known": 0, "doc_year": 0}
+_skip_lock = threading.Lock()
 
 
 def _status_ok(s: str) -> bool:
@@ -34,19 +203,48 @@ def _status_ok(s: str) -> bool:
 def _norm(s: str) -> str:
     return re.sub(r'[^A-Z0-9]', '', (s or '').upper())
 
+# Leading unit of a split prefix: "S-" is "S" followed by a space or punctuation
+# ("S & S", "S-TEK"), names Sunbiz lists before "S0" that no sub-prefix reaches.
+LEAD_MARK = "-"
+
+def _unit_term(unit: str) -> str:
+    """Search term of a work unit (a leading unit searches from its parent)."""
+    return unit[:-len(LEAD_MARK)] if unit.endswith(LEAD_MARK) else unit
+
 def _matches_prefix(name: str, prefix: str) -> bool:
+    if prefix.endswith(LEAD_MARK):
+        parent = _unit_term(prefix).upper()
+        raw = (name or "").strip().upper()
+        return raw.startswith(parent) and not re.match(r"[A-Z0-9]", raw[len(parent):])
     return _norm(name).startswith(_norm(prefix))
 
 # jittered sleep to avoid bursty patterns
 JITTER_MS = int(os.getenv("NBP_JITTER_MS", "0"))
 
 def _sleep(ms=None):
+    # with the shared rate controller, pacing is a token instead of a fixed delay
+    rate = get_controller()
+    if rate:
+        rate.acquire()
+        return
     if ms is None:
         ms = SLEEP_MS
     if JITTER_MS > 0:
         ms = ms + random.randint(0, JITTER_MS)
     time.sleep(ms / 1000)
 
+async def _asleep(ms=None):
+    """Same politeness delay as _sleep, but yields to other crawl tasks."""
+    rate = get_controller()
+    if rate:
+        await rate.acquire_async()
+        return
+    if ms is None:
+        ms = SLEEP_MS
+    if JITTER_MS > 0:
+        ms = ms + random.randint(0, JITTER_MS)
+    await asyncio.sleep(ms / 1000)
+
 
 def _save_debug(name: str, html: str):
     if not DEBUG: return
@@ -86,8 +284,16 @@ def _parse_results_table(html: str) -> List[Dict]:
             out.append({"name": name, "doc": doc, "status": status, "href": href})
     return out
 
-# --- replace _parse_detail with this ---
+# detail parser: "lxml" (sunbiz_detail, single tree walk) or "bs4" (the reference below)
+DETAIL_PARSER = os.getenv("NBP_DETAIL_PARSER", "lxml")
+
 def _parse_detail(html: str) -> Dict:
+    with metrics.timer("parse_seconds", kind="detail"):
+        if DETAIL_PARSER == "bs4":
+            return _parse_detail_bs4(html)
+        return parse_detail_lxml(html)
+
+def _parse_detail_bs4(html: str) -> Dict:
     """
     Parse a Sunbiz detail page and return normalized fields.
     Captures:
@@ -106,7 +312,9 @@ def _parse_detail(html: str) -> Dict:
 
     parser = os.getenv("NBP_BS_PARSER", "lxml")
     soup = BeautifulSoup(html, parser)
-    text = soup.get_text("\n", strip=True)
+    for el in soup.find_all(NO_TEXT_TAGS):
+        el.decompose()
+    text = tidy_text(soup.get_text("\n", strip=True))
 
     lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
 
@@ -149,7 +357,7 @@ def _parse_detail(html: str) -> Dict:
         except: pass
 
     effective_date = None
-    m = re.search(r"Effective Date\s*:?\s*(\d{1,2}/\d{1,2}/\d{4}|NONE)", text, re.I)
+    m = re.search(r"(?<!Event )Effective Date\s*:?\s*(\d{1,2}/\d{1,2}/\d{4}|NONE)", text, re.I)
     if m and m.group(1).upper() != "NONE":
         try: effective_date = parse_dt(m.group(1)).date()
         except: pass
@@ -302,7 +510,7 @@ def _parse_detail(html: str) -> Dict:
         i = 0
         while i < len(lines):
             if lines[i].lower().startswith("title"):
-                title = lines[i].split(None, 1)[1].strip() if " " in lines[i] else lines[i].strip()
+                title = lines[i].split(None, 1)[1].strip() if " " in lines[i] else None  # bare "Title": vacant
                 i += 1
                 # next non-title line = name
                 name = None
@@ -344,69 +552,269 @@ def _parse_detail(html: str) -> Dict:
         "officers": officers,
     }
 
-def fetch_recent_by_name_prefixes(*, window_days: int = None, prefixes: Iterable[str]) -> List[Dict]:
-    """Run one Playwright browser per prefix in parallel (process pool)."""
-    if window_days is None:
-        window_days = int(os.getenv("NBP_WINDOW_DAYS", "90"))
+# The keep window is the last N days or year-to-date, whichever starts earlier;
+# NBP_WINDOW_YTD=0 makes it just the last N days (the scheduler's short passes).
+WINDOW_YTD = os.getenv("NBP_WINDOW_YTD", "1") == "1"
 
-    prefixes = list(prefixes)
-    max_workers = int(os.getenv("NBP_CONCURRENCY", "8"))  # be polite
+def _window_start(window_days: int) -> date:
+    today = date.today()
+    ninety_start = today - timedelta(days=window_days)
+    if not WINDOW_YTD:
+        return ninety_start
+    return min(date(today.year, 1, 1), ninety_start)
 
-    results: List[Dict] = []
-    with ProcessPoolExecutor(max_workers=max_workers) as ex:
-        futures = [ex.submit(_crawl_one_prefix, pref, window_days) for pref in prefixes]
-        for fut in as_completed(futures):
-            results.extend(fut.result())
-    return results
+def _select_rows(rows_all: List[Dict], prefix: str, pages_seen: int,
+                 window_start: date = None) -> Optional[List[Dict]]:
+    """
+    Apply the prefix-boundary rule to one results page.
+    Returns the Active rows to open, or None when the prefix has rolled off.
+    """
+    metrics.inc("results_pages", prefix=prefix)
+
+    # 1) Detect prefix boundary using ALL rows (Active + Inactive)
+    pref_rows_all = [r for r in rows_all if _matches_prefix(r.get("name", ""), prefix)]
+
+    # If we’ve already paged at least once and the current page has NO rows
+    # with our prefix, Sunbiz rolled past our prefix → stop this prefix.
+    if pages_seen > 0 and not pref_rows_all:
+        print(f"[sunbiz][{prefix}] prefix rolled off at page {pages_seen+1}; stopping.")
+        return None
+
+    # 2) Only CLICK details for Active rows within that prefix
+    active_pref_rows = [r for r in pref_rows_all if _status_ok(r.get("status"))]
+
+    # 3) ...whose doc_number isn't already known (and not yet due for re-verification)
+    fresh_rows = [r for r in active_pref_rows if r.get("doc") not in _KNOWN_DOCS]
+    known_skipped = len(active_pref_rows) - len(fresh_rows)
+
+    # 4) ...and whose doc number doesn't place the filing before the window
+    year_skipped = 0
+    if DOC_YEAR_FILTER and window_start is not None:
+        candidates = [r for r in fresh_rows if classify_doc(r.get("doc"), window_start) != OUT]
+        year_skipped = len(fresh_rows) - len(candidates)
+        fresh_rows = candidates
+
+    with _skip_lock:
+        SKIP_COUNTS["known"] += known_skipped
+        SKIP_COUNTS["doc_year"] += year_skipped
+    metrics.inc("rows", len(rows_all) - len(pref_rows_all), outcome="other_prefix")
+    metrics.inc("rows", len(pref_rows_all) - len(active_pref_rows), outcome="inactive_listing")
+    metrics.inc("rows", known_skipped, outcome="skipped_known")
+    metrics.inc("rows", year_skipped, outcome="skipped_doc_year")
+
+    print(
+        f"[sunbiz][{prefix}] page {pages_seen+1}: "
+        f"total={len(rows_all)} pref={len(pref_rows_all)} active_pref={len(active_pref_rows)} "
+        f"known_skipped={known_skipped} year_skipped={year_skipped}"
+    )
+    return fresh_rows
 
-# --- Parallel wrapper --------------------------------------------------------
-def fetch_recent_by_name_prefixes_parallel(*, window_days: int, prefixes: Iterable[str], concurrency: int = 8) -> List[Dict]:
+def _build_record(row: Dict, info: Dict) -> Dict:
+    """Merge a results-list row with its parsed detail page into an entity record."""
+    return {
+        "name": row["name"][:255],
+        "doc_number": row["doc"][:100],
+        "entity_type": (info.get("entity_type") or None),
+        "filing_date": info.get("filing_date"),
+        "effective_date": info.get("effective_date"),
+        "fei_ein": info.get("fei_ein"),
+        "last_event": info.get("last_event"),
+        "event_date_filed": info.get("event_date_filed"),
+        "event_effective_date": info.get("event_effective_date"),
+        "registered_agent": info.get("registered_agent_name"),
+        "registered_agent_address": info.get("registered_agent_address"),
+        "principal_address": info.get("principal_address"),
+        "mailing_address": info.get("mailing_address"),
+        "city": info.get("city"),
+        "county": None,
+        "officers": info.get("officers") or [],
+        "status": info.get("status"),
+    }
+
+def _search_start(prefix: str, resume: Optional[Dict]):
+    """(search term, pages already done) for a fresh or resumed prefix crawl."""
+    if resume and resume.get("page") and resume.get("last_name"):
+        print(f"[sunbiz][{prefix}] resuming after page {resume['page']} at {resume['last_name']!r}")
+        return resume["last_name"], resume["page"]
+    return _unit_term(prefix), 0
+
+def _resume_rows(rows: List[Dict], resume: Optional[Dict]) -> List[Dict]:
+    """On the first page after a resume, drop rows up to and including the checkpointed doc."""
+    docs = [r.get("doc") for r in rows]
+    if resume and resume.get("last_doc") in docs:
+        return rows[docs.index(resume["last_doc"]) + 1:]
+    return rows
+
+def fetch_recent_by_name_prefixes(*, window_days: int = None, prefixes: Iterable[str], concurrency: int = None,
+                                  resume: Dict[str, Dict] = None, on_page=None) -> List[Dict]:
     """
-    Run fetch_recent_by_name_prefixes over multiple workers in parallel.
-    Each worker handles a slice of prefixes. Uses threads; each worker
-    launches its own Playwright session.
+    Run one Playwright browser per prefix in parallel (process pool).
+    The pool takes prefixes in the order given as workers free up.
+    Worker processes can't call back, so on_page (see fetch_recent_by_name_prefixes_async)
+    fires once per finished prefix with its page count, all of its rows and done=True.
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
+    if window_days is None:
+        window_days = int(os.getenv("NBP_WINDOW_DAYS", "90"))
 
     prefixes = list(prefixes)
-    if concurrency < 1:
-        concurrency = 1
-    if concurrency > len(prefixes):
-        concurrency = len(prefixes)
-
-    # split prefixes into N buckets via round-robin so each worker gets spread out
-    buckets = [prefixes[i::concurrency] for i in range(concurrency)]
+    resume = resume or {}
+    max_workers = concurrency or int(os.getenv("NBP_CONCURRENCY", "8"))  # be polite
 
     results: List[Dict] = []
-
-    def _worker(batch: List[str]) -> List[Dict]:
-        if not batch:
-            return []
-        # reuse the single-worker crawler you already have
-        return fetch_recent_by_name_prefixes(window_days=window_days, prefixes=batch)
-
-    with ThreadPoolExecutor(max_workers=concurrency) as ex:
-        futs = [ex.submit(_worker, b) for b in buckets]
-        for fut in as_completed(futs):
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(_KNOWN_DOCS, get_controller())) as ex:
+        futures = {ex.submit(_crawl_one_prefix_metered, pref, window_days, resume.get(pref)): pref for pref in prefixes}
+        for fut in as_completed(futures):
             try:
-                results.extend(fut.result())
+                rows, pages, snap = fut.result()
             except Exception as e:
-                print("[sunbiz] worker error:", e)
-
+                metrics.inc("prefix_errors")
+                print(f"[sunbiz][{futures[fut]}] worker error:", e)
+                continue
+            metrics.merge(snap)
+            if on_page:
+                try:
+                    on_page(futures[fut], pages, rows, None, done=True)
+                except PipelineStopped:
+                    for f in futures:
+                        f.cancel()  # don't crawl queued units into a stopped writer
+                    raise
+            else:
+                results.extend(rows)
     return results
 
+# --- Parallel wrapper --------------------------------------------------------
+def fetch_recent_by_name_prefixes_parallel(*, window_days: int, prefixes: Iterable[str], concurrency: int = 8,
+                                           resume: Dict[str, Dict] = None, on_page=None) -> List[Dict]:
+    """
+    Run fetch_recent_by_name_prefixes with `concurrency` browser processes
+    pulling from one shared work list, in the order given (longest first
+    from jobs._crawl_plan): a worker that finishes early takes the next
+    prefix instead of idling behind a fixed slice.
+    """
+    prefixes = list(prefixes)
+    if not prefixes:
+        return []
+    concurrency = max(1, min(concurrency, len(prefixes)))
+    return fetch_recent_by_name_prefixes(window_days=window_days, prefixes=prefixes, concurrency=concurrency,
+                                         resume=resume, on_page=on_page)
+
+
+
+# --- Page extraction ----------------------------------------------------------
+# "html": serialize the DOM with page.content() and parse it in Python.
+# "dom":  run a small extractor inside the page and only ship its JSON back.
+# The archive needs page.content() anyway, so "dom" only takes effect with
+# NBP_ARCHIVE_DIR="" — otherwise the serialized page is parsed in Python as in "html".
+EXTRACT = os.getenv("NBP_EXTRACT", "html")
+DOM_EXTRACT = EXTRACT == "dom" and not ARCHIVE_DIR
+if EXTRACT == "dom" and ARCHIVE_DIR:
+    print(f"[sunbiz] WARNING: NBP_EXTRACT=dom is ignored while archiving to {ARCHIVE_DIR!r}; "
+          f"set NBP_ARCHIVE_DIR='' to extract in the page")
+
+# Visible text nodes in document order, trimmed — the lines of sunbiz_detail.detail_text()
+_DOM_TEXT_JS = """
+const SKIP = new Set([%s]);
+const textParts = (root) => {
+  const out = [];
+  const walk = (el) => {
+    for (const n of el.childNodes) {
+      if (n.nodeType === 3) { const s = n.nodeValue.trim(); if (s) out.push(s); }
+      else if (n.nodeType === 1 && !SKIP.has(n.tagName)) walk(n);
+    }
+  };
+  walk(root);
+  return out;
+};
+""" % ", ".join(f'"{t.upper()}"' for t in NO_TEXT_TAGS)
+
+DETAIL_JS = "() => {" + _DOM_TEXT_JS + "return textParts(document.documentElement); }"
+
+# Same table/row rules as _parse_results_table
+RESULTS_JS = "() => {" + _DOM_TEXT_JS + """
+const cell = (el) => textParts(el).join(" ");
+const table = [...document.querySelectorAll("table")].find((t) => {
+  const x = cell(t).toLowerCase();
+  return x.includes("document number") && x.includes("status");
+});
+if (!table) return [];
+const rows = [];
+for (const tr of table.querySelectorAll("tr")) {
+  if (tr.querySelector("th")) continue;
+  const tds = tr.querySelectorAll("td");
+  if (tds.length < 3) continue;
+  const a = tds[0].querySelector("a");
+  const row = {name: cell(tds[0]), doc: cell(tds[1]), status: cell(tds[2]), href: a ? a.getAttribute("href") : null};
+  if (row.name && row.doc && row.href) rows.push(row);
+}
+return rows;
+}"""
+
+
+def _read_results(page, prefix: str, page_no: int) -> List[Dict]:
+    if DOM_EXTRACT:
+        with metrics.timer("parse_seconds", kind="results"):
+            return page.evaluate(RESULTS_JS)
+    html = page.content()
+    archive_page("results", html, prefix=prefix, page=page_no)
+    with metrics.timer("parse_seconds", kind="results"):
+        return _parse_results_table(html)
+
+
+def _read_detail(page, row: Dict, url: str):
+    """(future of the parsed detail, page text or html for error-page checks)."""
+    if DOM_EXTRACT:
+        with metrics.timer("parse_seconds", kind="detail"):
+            text = "\n".join(page.evaluate(DETAIL_JS))
+            return done_future(parse_detail_text(text)), text
+    dhtml = page.content()
+    archive_page("detail", dhtml, doc_number=row["doc"], name=row["name"], url=url)
+    return get_parse_pool().submit(dhtml), dhtml
+
+
+async def _aread_results(page, prefix: str, page_no: int) -> List[Dict]:
+    if DOM_EXTRACT:
+        with metrics.timer("parse_seconds", kind="results"):
+            return await page.evaluate(RESULTS_JS)
+    html = await page.content()
+    archive_page("results", html, prefix=prefix, page=page_no)
+    with metrics.timer("parse_seconds", kind="results"):
+        return _parse_results_table(html)
+
+
+async def _aread_detail(page, row: Dict, url: str):
+    if DOM_EXTRACT:
+        with metrics.timer("parse_seconds", kind="detail"):
+            text = "\n".join(await page.evaluate(DETAIL_JS))
+            return done_future(parse_detail_text(text)), text
+    dhtml = await page.content()
+    archive_page("detail", dhtml, doc_number=row["doc"], name=row["name"], url=url)
+    return await get_parse_pool().asubmit(dhtml), dhtml
+
+
+def _crawl_one_prefix_metered(prefix: str, window_days: int, resume: Optional[Dict] = None):
+    """Pool-worker entry: (rows, pages walked, this prefix's metrics snapshot) for the parent to merge."""
+    metrics.reset()
+    t0 = time.monotonic()
+    try:
+        rows, pages = _crawl_one_prefix(prefix, window_days, resume)
+    finally:
+        metrics.inc("prefix_seconds", time.monotonic() - t0, prefix=prefix)
+    return rows, pages, metrics.snapshot()
 
 
-def _crawl_one_prefix(prefix: str, window_days: int) -> List[Dict]:
-    """Crawl ALL pages for one prefix and return kept rows."""
+def _crawl_one_prefix(prefix: str, window_days: int, resume: Optional[Dict] = None) -> Tuple[List[Dict], int]:
+    """
+    Crawl ALL pages for one prefix: (kept rows, result pages walked, counting
+    a resumed run's earlier pages, the same count on_page reports).
+    With a checkpoint in `resume`, seek back by searching for its last name
+    and continue after its last doc instead of starting from page 1.
+    """
     today = date.today()
     if window_days is None:
         window_days = int(os.getenv("NBP_WINDOW_DAYS", "90"))
 
-    # Use the larger window: last N days OR year-to-date (whichever starts earlier)
-    year_start   = date(today.year, 1, 1)
-    ninety_start = today - timedelta(days=window_days)
-    window_start = min(year_start, ninety_start)
+    window_start = _window_start(window_days)
 
     def in_window(d):
         return d is not None and window_start <= d <= today
@@ -418,54 +826,32 @@ def _crawl_one_prefix(prefix: str, window_days: int) -> List[Dict]:
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=(os.getenv("NBP_HEADLESS", "1") == "1"))
-        ctx = browser.new_context(user_agent=USER_AGENT, java_script_enabled=True, locale="en-US")
-        page = ctx.new_page()
+
+        term, pages_seen = _search_start(prefix, resume)
 
         # warm-up + search
-        page.goto(HOME, wait_until="networkidle", timeout=60000); _sleep()
-        page.goto(BYNAME, wait_until="domcontentloaded", timeout=60000); _sleep()
-        box = page.query_selector('input[name*="SearchTerm" i], input[type="text"]')
-        if not box: browser.close(); return keep
-        box.fill(prefix); _sleep(200)
-        btn = page.query_selector('button:has-text("Search"), input[type="submit"]')
-        if not btn: browser.close(); return keep
-        btn.click()
-        try: page.wait_for_load_state("networkidle", timeout=15000)
-        except PWTimeout: page.wait_for_load_state("domcontentloaded", timeout=15000)
-        _sleep()
+        ctx, page = _open_search(browser, term)
+        if not page: browser.close(); return keep, pages_seen
+        navs = 3
+        pages_done = pages_seen
 
-        pages_seen = 0
         while True:
             if MAX_PAGES and pages_seen >= MAX_PAGES:
                 break
 
-            html = page.content()
-            rows_all = _parse_results_table(html)
+            rows_all = _read_results(page, prefix, pages_seen+1)
             if not rows_all:
                 break
 
-            pref_norm = _norm(prefix)
-
-            # 1) Detect prefix boundary using ALL rows (Active + Inactive)
-            pref_rows_all = [r for r in rows_all if _matches_prefix(r.get("name", ""), pref_norm)]
-
-            # If we’ve already paged at least once and the current page has NO rows
-            # with our prefix, Sunbiz rolled past our prefix → stop this prefix.
-            if pages_seen > 0 and not pref_rows_all:
-                print(f"[sunbiz][{prefix}] prefix rolled off at page {pages_seen+1}; stopping.")
+            active_pref_rows = _select_rows(rows_all, prefix, pages_seen, window_start)
+            if active_pref_rows is None:
                 break
-
-            # 2) Only CLICK details for Active rows within that prefix
-            active_pref_rows = [r for r in pref_rows_all if _status_ok(r.get("status"))]
-
-            print(
-                f"[sunbiz][{prefix}] page {pages_seen+1}: "
-                f"total={len(rows_all)} pref={len(pref_rows_all)} active_pref={len(active_pref_rows)}"
-            )
+            if resume:
+                active_pref_rows = _resume_rows(active_pref_rows, resume)
+                resume = None
 
             rows_iter = active_pref_rows if PER_PAGE_CAP == 0 else active_pref_rows[:PER_PAGE_CAP]
-
-
+            parsing = []
 
             for row in rows_iter:
                 detail_url = row["href"]
@@ -474,12 +860,14 @@ def _crawl_one_prefix(prefix: str, window_days: int) -> List[Dict]:
 
                 # robust nav to detail
                 nav_ok = False
+                t0 = time.monotonic()
                 for attempt in range(2):
                     try:
                         page.goto(detail_url, wait_until="domcontentloaded", timeout=60000)
                         nav_ok = True
                         break
                     except Exception:
+                        metrics.inc("nav_retries")
                         # fall back to clicking a link if direct nav gets aborted
                         try:
                             # try clicking a link that matches the document number or the name
@@ -495,65 +883,417 @@ def _crawl_one_prefix(prefix: str, window_days: int) -> List[Dict]:
                         except Exception:
                             pass
                 if not nav_ok:
+                    metrics.inc("nav_failures")
+                    metrics.inc("rows", outcome="detail_failed")
+                    _observe(time.monotonic() - t0, ok=False)
                     _save_debug(f"detail_nav_err_{row.get('doc','unknown')}", page.content())
                     continue
+                nav_s = time.monotonic() - t0
+                navs += 2  # the detail page and the go_back below
+                metrics.observe("detail_nav_seconds", nav_s)
+                metrics.inc("detail_pages")
 
                 _sleep(300)
-                dhtml = page.content()
-
-                info = _parse_detail(page.content())
+                info_fut, dtext = _read_detail(page, row, detail_url)
+                _observe(nav_s, dtext)
+                parsing.append((row, info_fut))  # parses in the pool while we navigate on
 
                 # go back to list BEFORE next item or page turn
-                page.go_back(wait_until="domcontentloaded", timeout=60000)
+                with metrics.timer("go_back_seconds"):
+                    page.go_back(wait_until="domcontentloaded", timeout=60000)
                 _sleep(200)
 
+            for row, info_fut in parsing:
+                info = info_fut.result()
                 if info.get("status") and not _status_ok(info["status"]):
+                    metrics.inc("rows", outcome="inactive")
                     continue
 
                 # keep if Date Filed OR Event Date Filed is in window
                 if any(in_window(info.get(k)) for k in ("filing_date", "event_date_filed")):
-                    keep.append({
-                        "name": row["name"][:255],
-                        "doc_number": row["doc"][:100],
-                        "entity_type": (info.get("entity_type") or None),
-                        "filing_date": info.get("filing_date"),
-                        "effective_date": info.get("effective_date"),
-                        "fei_ein": info.get("fei_ein"),
-                        "last_event": info.get("last_event"),
-                        "event_date_filed": info.get("event_date_filed"),
-                        "event_effective_date": info.get("event_effective_date"),
-                        "registered_agent": info.get("registered_agent_name"),
-                        "registered_agent_address": info.get("registered_agent_address"),
-                        "principal_address": info.get("principal_address"),
-                        "mailing_address": info.get("mailing_address"),
-                        "city": info.get("city"),
-                        "county": None,
-                        "officers": info.get("officers") or [],
-                        "status": info.get("status"),
-                    })
+                    keep.append(_build_record(row, info))
+                    metrics.inc("rows", outcome="kept")
+                    metrics.inc("rows_kept", prefix=prefix)
 
                     cap = int(os.getenv("NBP_TARGET_TOTAL", "0"))
                     if cap and len(keep) >= cap:
                         browser.close()
-                        return keep
+                        return keep, pages_seen + 1
+                else:
+                    metrics.inc("rows", outcome="out_of_window")
+            pages_done = pages_seen + 1
 
             # Next results page for SAME prefix
             next_loc = page.locator("a", has_text=re.compile(r"^\s*Next List\s*$", re.I)).first
             if not next_loc.count():
                 next_loc = page.locator("a", has_text=re.compile(r"^\s*Next>", re.I)).first
-            if next_loc.count():
-                next_loc.click()
-                try: page.wait_for_load_state("networkidle", timeout=15000)
-                except PWTimeout: page.wait_for_load_state("domcontentloaded", timeout=15000)
+            if next_loc.count() and _should_recycle(prefix, navs):
+                # fresh context, then seek: the list starting at this page's last name,
+                # minus the rows up to its doc, is the next page
+                last = rows_all[-1]
+                print(f"[sunbiz][{prefix}] recycling browser context after {navs} navigations")
+                metrics.inc("context_recycles")
+                ctx.close()
+                with metrics.timer("results_nav_seconds"):
+                    ctx, page = _open_search(browser, last["name"])
+                if not page:
+                    break
+                resume = {"last_doc": last["doc"]}
+                navs = 3
+                pages_seen += 1
+            elif next_loc.count():
+                with metrics.timer("results_nav_seconds"):
+                    next_loc.click()
+                    _wait_loaded(page)
                 _sleep()
+                navs += 1
                 pages_seen += 1
             else:
                 break
 
         browser.close()
+    return keep, pages_done
+
+
+
+# --- Async engine: one browser, bounded page pool ----------------------------
+class _PagePool:
+    """
+    Bounded pool of browser contexts (one page each) inside a single Chromium.
+    The pool size is the global concurrency budget: no more than `size`
+    pages exist at once, and prefix tasks wait here for a free one.
+    """
+    def __init__(self, browser, size: int):
+        self.browser = browser
+        self.size = max(1, size)
+        self._slots = asyncio.Semaphore(self.size)  # pages handed out; taken before any page is created
+        self._free = []     # idle pages
+        self._contexts = []
+        self._ctx_of = {}   # id(page) -> its context
+        self._navs = {}     # id(page) -> navigations since the context was created
+        self._warmed = set()
+        self._rss_recycled_at = float("-inf")
+
+    async def _new_page(self):
+        ctx = await self.browser.new_context(user_agent=USER_AGENT, java_script_enabled=True, locale="en-US")
+        self._contexts.append(ctx)
+        try:
+            page = await ctx.new_page()
+            await _aprepare_context(ctx, page)
+        except BaseException:
+            self._contexts.remove(ctx)
+            try:
+                await ctx.close()
+            except Exception:
+                pass
+            raise
+        self._ctx_of[id(page)] = ctx
+        self._navs[id(page)] = 0
+        return page
+
+    async def acquire(self):
+        await self._slots.acquire()
+        if self._free:
+            return self._free.pop()
+        try:
+            return await self._new_page()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def count_navs(self, page, n: int = 1) -> int:
+        self._navs[id(page)] = self._navs.get(id(page), 0) + n
+        return self._navs[id(page)]
+
+    def should_recycle(self, prefix: str, page) -> bool:
+        """
+        _should_recycle for a pooled page. RSS is the whole shared Chromium, so
+        over the limit only the busiest context is recycled, at most one per
+        NBP_RSS_SAMPLE_S, and the next check sees memory after that close.
+        """
+        navs = self._navs.get(id(page), 0)
+        if RECYCLE_NAVS and navs >= RECYCLE_NAVS:
+            return True
+        if not _rss_high(prefix, navs):
+            return False
+        now = time.monotonic()
+        if now - self._rss_recycled_at < RSS_SAMPLE_S or navs < max(self._navs.values(), default=0):
+            return False
+        self._rss_recycled_at = now
+        return True
+
+    async def recycle(self, page):
+        """Close the page's context and hand back a fresh page in its place (same pool slot)."""
+        ctx = self._ctx_of.pop(id(page), None)
+        self._navs.pop(id(page), None)
+        self._warmed.discard(id(page))
+        if ctx is not None:
+            self._contexts.remove(ctx)
+            try:
+                await ctx.close()
+            except Exception:
+                pass
+            _rss_sample[0] = float("-inf")  # rescan before the next RSS decision
+        return await self._new_page()  # on failure, release() of the closed page only frees the slot
+
+    def needs_warmup(self, page) -> bool:
+        if id(page) in self._warmed:
+            return False
+        self._warmed.add(id(page))
+        return True
+
+    def release(self, page):
+        if id(page) in self._ctx_of:  # not a page whose context a failed recycle closed
+            self._free.append(page)
+        self._slots.release()
+
+    async def close(self):
+        for ctx in self._contexts:
+            try:
+                await ctx.close()
+            except Exception:
+                pass
+
+
+async def _asearch(pool: _PagePool, page, term: str) -> bool:
+    """Warm up (once per pooled page) and submit a ByName search for `term`."""
+    if pool.needs_warmup(page):
+        await page.goto(HOME, wait_until=LOAD_STATE, timeout=60000); await _asleep()
+    await page.goto(BYNAME, wait_until="domcontentloaded", timeout=60000); await _asleep()
+    box = await page.query_selector('input[name*="SearchTerm" i], input[type="text"]')
+    if not box: return False
+    await box.fill(term); await _asleep(200)
+    btn = await page.query_selector('button:has-text("Search"), input[type="submit"]')
+    if not btn: return False
+    await btn.click()
+    await _await_loaded(page)
+    await _asleep()
+    pool.count_navs(page, 3)
+    return True
+
+
+async def _crawl_one_prefix_async(pool: _PagePool, prefix: str, window_days: int,
+                                  resume: Optional[Dict] = None, on_page=None) -> List[Dict]:
+    """
+    Async twin of _crawl_one_prefix: same navigation, same kept records.
+    With on_page, each finished results page is handed off as
+    on_page(prefix, pages_done, rows, last_row) instead of being returned,
+    followed by on_page(prefix, pages_done, [], None, done=True) at the end.
+    """
+    today = date.today()
+    if window_days is None:
+        window_days = int(os.getenv("NBP_WINDOW_DAYS", "90"))
+
+    window_start = _window_start(window_days)
+
+    def in_window(d):
+        return d is not None and window_start <= d <= today
+
+    keep: List[Dict] = []
+    kept = 0
+    PER_PAGE_CAP = int(os.getenv("NBP_MAX_DETAIL_PER_PREFIX", "0"))  # 0 = unlimited
+    MAX_PAGES    = int(os.getenv("NBP_MAX_PAGES_PER_PREFIX", "0"))    # 0 = unlimited
+
+    def _hand_off(pages_done, page_keep, last_row):
+        if on_page:
+            on_page(prefix, pages_done, page_keep, last_row)
+        else:
+            keep.extend(page_keep)
+
+    term, pages_seen = _search_start(prefix, resume)
+    page = await pool.acquire()
+    try:
+        # warm-up once per pooled page, then search
+        if not await _asearch(pool, page, term):
+            return keep
+
+        while True:
+            if MAX_PAGES and pages_seen >= MAX_PAGES:
+                break
+
+            rows_all = await _aread_results(page, prefix, pages_seen+1)
+            if not rows_all:
+                break
+
+            active_pref_rows = _select_rows(rows_all, prefix, pages_seen, window_start)
+            if active_pref_rows is None:
+                break
+            if resume:
+                active_pref_rows = _resume_rows(active_pref_rows, resume)
+                resume = None
+
+            page_keep: List[Dict] = []
+            rows_iter = active_pref_rows if PER_PAGE_CAP == 0 else active_pref_rows[:PER_PAGE_CAP]
+            parsing = []
+
+            for row in rows_iter:
+                detail_url = row["href"]
+                if not detail_url.startswith("http"):
+                    detail_url = urljoin(HOME, detail_url)
+
+                # robust nav to detail
+                nav_ok = False
+                t0 = time.monotonic()
+                for attempt in range(2):
+                    try:
+                        await page.goto(detail_url, wait_until="domcontentloaded", timeout=60000)
+                        nav_ok = True
+                        break
+                    except Exception:
+                        metrics.inc("nav_retries")
+                        # fall back to clicking a link if direct nav gets aborted
+                        try:
+                            candidate = (
+                                page.locator("a", has_text=(row.get("doc") or "")).first
+                                if row.get("doc") else page.locator("table a", has_text=(row.get("name") or "")).first
+                            )
+                            if candidate and await candidate.count():
+                                await candidate.click()
+                                await page.wait_for_load_state("domcontentloaded", timeout=60000)
+                                nav_ok = True
+                                break
+                        except Exception:
+                            pass
+                if not nav_ok:
+                    metrics.inc("nav_failures")
+                    metrics.inc("rows", outcome="detail_failed")
+                    _observe(time.monotonic() - t0, ok=False)
+                    _save_debug(f"detail_nav_err_{row.get('doc','unknown')}", await page.content())
+                    continue
+                nav_s = time.monotonic() - t0
+                pool.count_navs(page, 2)  # the detail page and the go_back below
+                metrics.observe("detail_nav_seconds", nav_s)
+                metrics.inc("detail_pages")
+
+                await _asleep(300)
+                info_fut, dtext = await _aread_detail(page, row, detail_url)
+                _observe(nav_s, dtext)
+                parsing.append((row, info_fut))  # parses in the pool while we navigate on
+
+                # go back to list BEFORE next item or page turn
+                with metrics.timer("go_back_seconds"):
+                    await page.go_back(wait_until="domcontentloaded", timeout=60000)
+                await _asleep(200)
+
+            for row, info_fut in parsing:
+                info = await asyncio.wrap_future(info_fut)
+                if info.get("status") and not _status_ok(info["status"]):
+                    metrics.inc("rows", outcome="inactive")
+                    continue
+
+                # keep if Date Filed OR Event Date Filed is in window
+                if any(in_window(info.get(k)) for k in ("filing_date", "event_date_filed")):
+                    page_keep.append(_build_record(row, info))
+                    kept += 1
+                    metrics.inc("rows", outcome="kept")
+                    metrics.inc("rows_kept", prefix=prefix)
+
+                    cap = int(os.getenv("NBP_TARGET_TOTAL", "0"))
+                    if cap and kept >= cap:
+                        _hand_off(pages_seen + 1, page_keep, row)
+                        return keep
+                else:
+                    metrics.inc("rows", outcome="out_of_window")
+
+            _hand_off(pages_seen + 1, page_keep, rows_all[-1])
+
+            # Next results page for SAME prefix
+            next_loc = page.locator("a", has_text=re.compile(r"^\s*Next List\s*$", re.I)).first
+            if not await next_loc.count():
+                next_loc = page.locator("a", has_text=re.compile(r"^\s*Next>", re.I)).first
+            if await next_loc.count() and pool.should_recycle(prefix, page):
+                # fresh context, then seek: the list starting at this page's last name,
+                # minus the rows up to its doc, is the next page
+                last = rows_all[-1]
+                print(f"[sunbiz][{prefix}] recycling browser context after {pool.count_navs(page, 0)} navigations")
+                metrics.inc("context_recycles")
+                page = await pool.recycle(page)
+                with metrics.timer("results_nav_seconds"):
+                    if not await _asearch(pool, page, last["name"]):
+                        break
+                resume = {"last_doc": last["doc"]}
+                pages_seen += 1
+            elif await next_loc.count():
+                with metrics.timer("results_nav_seconds"):
+                    await next_loc.click()
+                    await _await_loaded(page)
+                await _asleep()
+                pool.count_navs(page)
+                pages_seen += 1
+            else:
+                break
+    finally:
+        pool.release(page)
+    if on_page:
+        on_page(prefix, pages_seen, [], None, done=True)
     return keep
 
 
+async def _fetch_recent_async(window_days: int, prefixes: List[str], budget: int,
+                              resume: Dict[str, Dict], on_page) -> List[Dict]:
+    results: List[Dict] = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=(os.getenv("NBP_HEADLESS", "1") == "1"))
+        pool = _PagePool(browser, budget)
+
+        async def _one(pref: str) -> List[Dict]:
+            t0 = time.monotonic()
+            try:
+                return await _crawl_one_prefix_async(pool, pref, window_days, resume.get(pref), on_page)
+            except PipelineStopped:
+                raise
+            except Exception as e:
+                metrics.inc("prefix_errors")
+                print(f"[sunbiz][{pref}] worker error:", e)
+                return []
+            finally:
+                metrics.inc("prefix_seconds", time.monotonic() - t0, prefix=pref)
+
+        # `budget` workers pull units in the order given (longest first), so at most
+        # `budget` units are in flight and prefix_seconds times the crawl, not the wait
+        todo = iter(prefixes)
+
+        async def _worker():
+            for pref in todo:
+                results.extend(await _one(pref))
+
+        tasks = [asyncio.ensure_future(_worker()) for _ in range(budget)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # the writer stopped (or we were cancelled): stop the other workers too
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            await pool.close()
+            await browser.close()
+    return results
+
+
+def fetch_recent_by_name_prefixes_async(*, window_days: int = None, prefixes: Iterable[str], concurrency: int = None,
+                                        resume: Dict[str, Dict] = None, on_page=None) -> List[Dict]:
+    """
+    Crawl prefixes with ONE Chromium and a bounded pool of contexts/pages.
+    `concurrency` (or NBP_PAGE_BUDGET) is the global page budget shared by
+    every prefix; returns the same records as _crawl_one_prefix.
+    `resume` maps prefix → checkpoint; `on_page` streams rows per results
+    page (see _crawl_one_prefix_async) instead of returning them.
+    """
+    if window_days is None:
+        window_days = int(os.getenv("NBP_WINDOW_DAYS", "90"))
+    if concurrency is None:
+        concurrency = int(os.getenv("NBP_CONCURRENCY", "2"))
+    budget = int(os.getenv("NBP_PAGE_BUDGET", str(concurrency)))
+
+    prefixes = list(prefixes)
+    if not prefixes:
+        return []
+    return asyncio.run(_fetch_recent_async(window_days, prefixes, min(budget, len(prefixes)),
+                                           resume or {}, on_page))
+
+
 
 def fetch_new_by_name_prefixes(target_dates, prefixes: Iterable[str]) -> List[Dict]:
     """
@@ -607,9 +1347,10 @@ def fetch_new_by_name_prefixes(target_dates, prefixes: Iterable[str]) -> List[Di
         browser = p.chromium.launch(headless=(os.getenv("NBP_HEADLESS", "1") == "1"))
         ctx = browser.new_context(user_agent=USER_AGENT, java_script_enabled=True, locale="en-US")
         page = ctx.new_page()
+        _prepare_context(ctx, page)
 
         # Warm-up
-        page.goto(HOME, wait_until="networkidle", timeout=60000)
+        page.goto(HOME, wait_until=LOAD_STATE, timeout=60000)
         _sleep()
 
         for pref in prefixes:
@@ -631,10 +1372,7 @@ def fetch_new_by_name_prefixes(target_dates, prefixes: Iterable[str]) -> List[Di
                 _save_debug(f"byname_no_submit_{pref}", page.content())
                 continue
             btn.click()
-            try:
-                page.wait_for_load_state("networkidle", timeout=15000)
-            except PWTimeout:
-                page.wait_for_load_state("domcontentloaded", timeout=15000)
+            _wait_loaded(page)
             _sleep()
 
             # Paginate through results
@@ -647,6 +1385,7 @@ def fetch_new_by_name_prefixes(target_dates, prefixes: Iterable[str]) -> List[Di
 
                 html = page.content()
                 _save_debug(f"results_{pref}_p{pages_seen+1}", html)
+                archive_page("results", html, prefix=pref, page=pages_seen+1)
                 rows_all = _parse_results_table(html)
                 if not rows_all:
                     break
@@ -684,6 +1423,7 @@ def fetch_new_by_name_prefixes(target_dates, prefixes: Iterable[str]) -> List[Di
                     dhtml = page.content()
                     if DEBUG:
                         _save_debug(f"detail_{row['doc']}", dhtml)
+                    archive_page("detail", dhtml, doc_number=row["doc"], name=row["name"], url=page.url)
 
                     try:
                         info = _parse_detail(dhtml)
@@ -732,10 +1472,7 @@ def fetch_new_by_name_prefixes(target_dates, prefixes: Iterable[str]) -> List[Di
                 next_loc = page.locator("a", has_text=re.compile(r"^(Next List|Next>)$", re.I)).first
                 if next_loc.count():
                     next_loc.click()
-                    try:
-                        page.wait_for_load_state("networkidle", timeout=15000)
-                    except PWTimeout:
-                        page.wait_for_load_state("domcontentloaded", timeout=15000)
+                    _wait_loaded(page)
                     _sleep()
                     pages_seen += 1
                 else:
@@ -2,6 +2,25 @@ from flask import Response, url_for
 from datetime import date
 from ..models import Jurisdiction, Stat
 
+def get_changefreq(population: int) -> str:
+    """
+    Determine change frequency based on population.
+    Higher population = more business filings = more frequent updates
+    (the crawl scheduler refreshes jurisdictions on the same tiers)
+    """
+    if population is None or population == 0:
+        return "monthly"  # Default for unknown/zero population
+    elif population >= 300000:
+        return "daily"  # Updates every weekday
+    elif population >= 100000:
+        return "weekly"  # Every 2 business days ≈ weekly
+    elif population >= 50000:
+        return "weekly"  # Every 3 business days ≈ weekly
+    elif population >= 25000:
+        return "weekly"  # Every week
+    else:  # 0-25k
+        return "monthly"  # Every 3 weeks ≈ monthly
+
 def sitemap_xml():
     fl = Jurisdiction.query.filter_by(kind="state", slug="florida").first()
     if not fl:
@@ -13,24 +32,6 @@ def sitemap_xml():
     today = date.today()
     urls = []
 
-    def get_changefreq(population: int) -> str:
-        """
-        Determine change frequency based on population.
-        Higher population = more business filings = more frequent updates
-        """
-        if population is None or population == 0:
-            return "monthly"  # Default for unknown/zero population
-        elif population >= 300000:
-            return "daily"  # Updates every weekday
-        elif population >= 100000:
-            return "weekly"  # Every 2 business days ≈ weekly
-        elif population >= 50000:
-            return "weekly"  # Every 3 business days ≈ weekly
-        elif population >= 25000:
-            return "weekly"  # Every week
-        else:  # 0-25k
-            return "monthly"  # Every 3 weeks ≈ monthly
-
     def get_priority(kind: str, population: int = 0) -> str:
         """
         Calculate priority based on jurisdiction type and population.
@@ -0,0 +1,220 @@
+# nbp/services/spool.py
+# Durable hand-off between the crawl and the database. Crawlers append every
+# finished results page to an append-only JSONL spool (one directory per run,
+# rotated into fixed-size segments, fsynced per page); the ingester tails it
+# and only after a DB commit advances the committed offset (committed.json).
+# A failed commit, or a crash on either side, leaves the rows in the spool
+# and the next ingest replays everything past the committed offset.
+#
+#   <NBP_SPOOL_DIR>/<run_id>/seg-000001.jsonl ...   pages, in write order
+#   <NBP_SPOOL_DIR>/<run_id>/committed.json         {"segment", "offset"} already in the DB
+#   <NBP_SPOOL_DIR>/<run_id>/CLOSED                 the crawl finished writing
+import os, json, glob, time, threading
+from datetime import date, datetime
+from typing import Callable, Dict, List, Tuple
+
+from .pipeline import _merge_mark
+
+SPOOL_DIR = os.getenv("NBP_SPOOL_DIR", "")                       # empty = no spool (in-memory pipeline)
+SEGMENT_BYTES = int(os.getenv("NBP_SPOOL_SEGMENT_MB", "64")) * 1024 * 1024
+FSYNC = os.getenv("NBP_SPOOL_FSYNC", "1") == "1"                  # fsync each page before the crawl moves on
+KEEP_SEGMENTS = os.getenv("NBP_SPOOL_KEEP", "0") == "1"           # keep fully ingested segments
+IDLE_EXIT_S = float(os.getenv("NBP_SPOOL_IDLE_EXIT_S", "300"))    # stop tailing an unclosed spool after this quiet
+
+Position = Tuple[int, int]  # (segment number, byte offset)
+
+
+def dumps(obj) -> str:
+    """JSON that round-trips the date/datetime fields of entity records (see loads)."""
+    def default(v):
+        if isinstance(v, datetime):
+            return {"__datetime__": v.isoformat()}
+        if isinstance(v, date):
+            return {"__date__": v.isoformat()}
+        return str(v)
+    return json.dumps(obj, default=default, ensure_ascii=False)
+
+
+def loads(s) -> object:
+    def hook(d):
+        if len(d) == 1:
+            if "__date__" in d:
+                return date.fromisoformat(d["__date__"])
+            if "__datetime__" in d:
+                return datetime.fromisoformat(d["__datetime__"])
+        return d
+    if isinstance(s, bytes):
+        s = s.decode("utf-8")
+    return json.loads(s, object_hook=hook)
+
+
+def run_dir(spool_dir: str, run_id: str) -> str:
+    return os.path.join(spool_dir, run_id)
+
+
+def _segments(path: str) -> List[int]:
+    return sorted(int(os.path.basename(f)[4:-6]) for f in glob.glob(os.path.join(path, "seg-*.jsonl")))
+
+
+def _seg_path(path: str, n: int) -> str:
+    return os.path.join(path, f"seg-{n:06d}.jsonl")
+
+
+class SpoolWriter:
+    """Append-only page log for one run. on_page has the crawler callback signature."""
+
+    def __init__(self, spool_dir: str, run_id: str, segment_bytes: int = SEGMENT_BYTES):
+        self.path = run_dir(spool_dir, run_id)
+        os.makedirs(self.path, exist_ok=True)
+        try:
+            os.remove(os.path.join(self.path, "CLOSED"))  # a resumed run writes again
+        except FileNotFoundError:
+            pass
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        # never append to a segment an earlier process may have left with a torn last line
+        self._seg = (_segments(self.path) or [0])[-1]
+        self._f = None
+        self.pages = 0
+        self.rows = 0
+
+    def _rotate(self):
+        if self._f:
+            self._f.close()
+        self._seg += 1
+        self._f = open(_seg_path(self.path, self._seg), "ab")
+
+    def on_page(self, prefix, page_no, rows, last_row, done=False):
+        line = (dumps({"unit": prefix, "page": page_no, "rows": rows,
+                       "last_row": last_row, "done": bool(done)}) + "\n").encode("utf-8")
+        with self._lock:
+            if self._f is None or self._f.tell() >= self.segment_bytes:
+                self._rotate()
+            self._f.write(line)
+            self._f.flush()
+            if FSYNC:
+                os.fsync(self._f.fileno())
+            self.pages += 1
+            self.rows += len(rows)
+
+    def close(self):
+        """Seal the spool: the ingester stops once it has caught up."""
+        with self._lock:
+            if self._f:
+                self._f.close()
+                self._f = None
+            with open(os.path.join(self.path, "CLOSED"), "w") as f:
+                f.write(datetime.utcnow().isoformat())
+
+
+class SpoolReader:
+    """Reads pages after the committed offset; commit() moves the offset once they are in the DB."""
+
+    def __init__(self, spool_dir: str, run_id: str):
+        self.path = run_dir(spool_dir, run_id)
+        self._committed_file = os.path.join(self.path, "committed.json")
+        try:
+            with open(self._committed_file) as f:
+                c = json.load(f)
+            self.pos: Position = (c["segment"], c["offset"])
+        except (OSError, ValueError, KeyError):
+            self.pos = ((_segments(self.path) or [1])[0], 0)
+
+    def closed(self) -> bool:
+        return os.path.exists(os.path.join(self.path, "CLOSED"))
+
+    def read(self, max_pages: int) -> List[Tuple[Dict, Position]]:
+        """Up to max_pages complete pages after the read position, each with the position after it."""
+        out: List[Tuple[Dict, Position]] = []
+        seg, off = self.pos
+        while len(out) < max_pages:
+            # listed before reading: if a later segment exists, this one is sealed
+            later = [n for n in _segments(self.path) if n > seg]
+            torn = False
+            fn = _seg_path(self.path, seg)
+            if os.path.exists(fn):
+                with open(fn, "rb") as f:
+                    f.seek(off)
+                    while len(out) < max_pages:
+                        line = f.readline()
+                        if not line.endswith(b"\n"):
+                            torn = bool(line)  # a line still being written, or torn by a crash
+                            break
+                        off += len(line)
+                        out.append((loads(line), (seg, off)))
+            if len(out) >= max_pages or not later:
+                break
+            if torn:
+                print(f"[spool] {os.path.basename(fn)}: skipping incomplete last line at byte {off}")
+            seg, off = later[0], 0
+        self.pos = (seg, off)
+        return out
+
+    def commit(self, pos: Position):
+        """Record everything before `pos` as written to the DB; drop fully ingested segments."""
+        tmp = self._committed_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"segment": pos[0], "offset": pos[1], "at": datetime.utcnow().isoformat()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._committed_file)
+        if not KEEP_SEGMENTS:
+            for n in _segments(self.path):
+                if n < pos[0]:
+                    os.remove(_seg_path(self.path, n))
+
+
+def pending(spool_dir: str, run_id: str) -> bool:
+    """True if the run's spool has pages past the committed offset."""
+    if not os.path.isdir(run_dir(spool_dir, run_id)):
+        return False
+    return bool(SpoolReader(spool_dir, run_id).read(1))
+
+
+def ingest_spool(spool_dir: str, run_id: str, write: Callable, *, batch_size: int,
+                 follow: bool = True, poll_s: float = 1.0, idle_exit_s: float = IDLE_EXIT_S) -> Dict:
+    """
+    Feed spooled pages to write(rows, marks) (run_pipeline's writer contract)
+    in ~batch_size-row batches, committing the offset after each write. With
+    follow, keep tailing until the writer closes the spool (or it has been
+    quiet for idle_exit_s); otherwise stop at the end of what is there now.
+    If write raises, the committed offset stays put and the error propagates.
+    """
+    reader = SpoolReader(spool_dir, run_id)
+    stats = {"pages": 0, "rows": 0, "batches": 0}
+    buf: List[Dict] = []
+    marks: Dict[str, Dict] = {}
+    committed = reader.pos
+    quiet_since = time.monotonic()
+
+    def _flush(pos):
+        nonlocal buf, marks, committed
+        if buf or marks:
+            write(buf, marks)
+            stats["rows"] += len(buf)
+            stats["batches"] += 1
+        if pos != committed:
+            reader.commit(pos)
+            committed = pos
+        buf, marks = [], {}
+
+    while True:
+        closed = reader.closed()  # checked before reading, so pages written just before CLOSED are not missed
+        pages = reader.read(64)
+        for pg, pos in pages:
+            buf.extend(pg["rows"])
+            _merge_mark(marks, pg["unit"], pg["page"], len(pg["rows"]), pg["last_row"], pg["done"])
+            stats["pages"] += 1
+            if len(buf) >= batch_size:
+                _flush(pos)
+        if pages:
+            quiet_since = time.monotonic()
+            continue
+        _flush(reader.pos)
+        if not follow or closed:
+            break
+        if time.monotonic() - quiet_since > idle_exit_s:
+            print(f"[spool] {run_id}: no new pages for {idle_exit_s:.0f}s and the spool is not closed; stopping")
+            break
+        time.sleep(poll_s)
+    return stats
@@ -0,0 +1,155 @@
+# nbp/services/sunbiz_bulk.py
+# Bulk load from the Division of Corporations' fixed-width corporate data
+# files (the quarterly full extract and the daily update files, unzipped).
+# One record per line, 1440 bytes plus the line break; the field layout is the
+# published "Corporate Data File" definition. The file is read through mmap
+# and pages already decoded are dropped from memory as we go, so a multi-GB
+# quarterly file streams in constant memory.
+import os, mmap, struct
+from datetime import date
+from typing import Dict, Iterator, List, Optional
+
+ENCODING = os.getenv("NBP_BULK_ENCODING", "latin-1")
+ACTIVE_ONLY = os.getenv("NBP_BULK_ACTIVE_ONLY", "1") == "1"  # same rule as the crawlers
+RELEASE_BYTES = 64 * 1024 * 1024  # give decoded pages back to the OS every 64 MiB
+
+RECORD_LEN = 1440
+OFFICERS = 6
+FIELDS = [
+    ("doc_number", 12), ("name", 192), ("status", 1), ("filing_type", 15),
+    ("princ_add_1", 42), ("princ_add_2", 42), ("princ_city", 28), ("princ_state", 2),
+    ("princ_zip", 10), ("princ_country", 2),
+    ("mail_add_1", 42), ("mail_add_2", 42), ("mail_city", 28), ("mail_state", 2),
+    ("mail_zip", 10), ("mail_country", 2),
+    ("file_date", 8), ("fei_number", 14), ("more_than_six_officers", 1), ("last_trx_date", 8),
+    ("state_country", 2),
+    ("report_year_1", 4), ("house_flag_1", 1), ("report_date_1", 8),
+    ("report_year_2", 4), ("house_flag_2", 1), ("report_date_2", 8),
+    ("report_year_3", 4), ("house_flag_3", 1), ("report_date_3", 8),
+    ("ra_name", 42), ("ra_name_type", 1), ("ra_add_1", 42), ("ra_city", 28), ("ra_state", 2),
+    ("ra_zip5", 5), ("ra_zip4", 4),
+]
+OFFICER_FIELDS = [
+    ("title", 4), ("name_type", 1), ("name", 42), ("add_1", 42), ("city", 28), ("state", 2),
+    ("zip5", 5), ("zip4", 4),
+]
+for _i in range(1, OFFICERS + 1):
+    FIELDS += [(f"off{_i}_{n}", w) for n, w in OFFICER_FIELDS]
+FIELDS.append(("filler", RECORD_LEN - sum(w for _, w in FIELDS)))
+assert FIELDS[-1][1] >= 0, "field layout is longer than RECORD_LEN"
+
+# one unpack per record instead of ~90 slices
+_LAYOUT = struct.Struct("".join(f"{w}s" for _, w in FIELDS))
+_NAMES = [n for n, _ in FIELDS]
+_OFFICER_KEYS = [[f"off{i}_{n}" for n, _ in OFFICER_FIELDS] for i in range(1, OFFICERS + 1)]
+
+FILING_TYPES = {
+    "DOMP": "Florida Profit Corporation",
+    "DOMNP": "Florida Not For Profit Corporation",
+    "FLAL": "Florida Limited Liability Company",
+    "DOMLP": "Florida Limited Partnership",
+    "FORP": "Foreign Profit Corporation",
+    "FORNP": "Foreign Not For Profit Corporation",
+    "FORL": "Foreign Limited Liability Company",
+    "FORLP": "Foreign Limited Partnership",
+    "NPREG": "Non-Profit Registration",
+    "TRUST": "Declaration of Trust",
+    "AGENT": "Designation of Registered Agent",
+}
+
+
+def _date(s: str) -> Optional[date]:
+    """MMDDYYYY → date (None when blank or invalid)."""
+    if len(s) != 8 or not s.isdigit():
+        return None
+    try:
+        return date(int(s[4:]), int(s[:2]), int(s[2:4]))
+    except ValueError:
+        return None
+
+
+def _address(*parts: str, city: str = "", state: str = "", zip_: str = "") -> Optional[str]:
+    tail = " ".join(x for x in (state, zip_) if x)
+    tail = f"{city}, {tail}" if city and tail else (city or tail)
+    lines = [p for p in parts if p] + ([tail] if tail else [])
+    return ", ".join(lines) if lines else None
+
+
+def decode_record(raw: bytes) -> Dict[str, str]:
+    """One fixed-width record → {field: stripped text}. Short lines are padded."""
+    if len(raw) < RECORD_LEN:
+        raw = raw.ljust(RECORD_LEN)
+    return {n: v.decode(ENCODING).strip() for n, v in zip(_NAMES, _LAYOUT.unpack_from(raw))}
+
+
+def to_entity(f: Dict[str, str]) -> Dict:
+    """Decoded record → the crawler's entity dict (see _build_record)."""
+    officers = []
+    for keys in _OFFICER_KEYS:
+        title, _ntype, name, add_1, city, state, zip5, zip4 = (f[k] for k in keys)
+        if not name:
+            continue
+        zip_ = f"{zip5}-{zip4}" if zip5 and zip4 else zip5
+        officers.append({"title": title or None, "name": name,
+                         "address": _address(add_1, city=city, state=state, zip_=zip_)})
+
+    ra_zip = f"{f['ra_zip5']}-{f['ra_zip4']}" if f["ra_zip5"] and f["ra_zip4"] else f["ra_zip5"]
+    return {
+        "name": f["name"][:255],
+        "doc_number": f["doc_number"],
+        "entity_type": FILING_TYPES.get(f["filing_type"], f["filing_type"] or None),
+        "filing_date": _date(f["file_date"]),
+        "fei_ein": f["fei_number"] or None,
+        "registered_agent": f["ra_name"] or None,
+        "registered_agent_address": _address(f["ra_add_1"], city=f["ra_city"], state=f["ra_state"], zip_=ra_zip),
+        "principal_address": _address(f["princ_add_1"], f["princ_add_2"], city=f["princ_city"],
+                                      state=f["princ_state"], zip_=f["princ_zip"]),
+        "mailing_address": _address(f["mail_add_1"], f["mail_add_2"], city=f["mail_city"],
+                                    state=f["mail_state"], zip_=f["mail_zip"]),
+        "city": f["princ_city"].title() or None,
+        "county": None,
+        "officers": officers,
+        "status": "ACTIVE" if f["status"] == "A" else "INACTIVE",
+    }
+
+
+def iter_records(path: str, since: date = None, active_only: bool = None) -> Iterator[Dict]:
+    """
+    Entity dicts from one data file, in file order. `since` keeps filings on
+    or after that date; active_only (NBP_BULK_ACTIVE_ONLY) drops inactive ones.
+    """
+    if active_only is None:
+        active_only = ACTIVE_ONLY
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            released = 0
+            while True:
+                line = mm.readline()
+                if not line:
+                    break
+                raw = line.rstrip(b"\r\n")
+                if raw.strip():
+                    f = decode_record(raw)
+                    if f["doc_number"] and (not active_only or f["status"] == "A"):
+                        rec = to_entity(f)
+                        if since is None or (rec["filing_date"] and rec["filing_date"] >= since):
+                            yield rec
+                pos = mm.tell()
+                if hasattr(mmap, "MADV_DONTNEED") and pos - released >= RELEASE_BYTES:
+                    released = pos - pos % mmap.PAGESIZE
+                    mm.madvise(mmap.MADV_DONTNEED, 0, released)
+
+
+def iter_batches(path: str, batch_size: int, **kw) -> Iterator[List[Dict]]:
+    batch: List[Dict] = []
+    for rec in iter_records(path, **kw):
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,275 @@
+# nbp/services/sunbiz_detail.py
+# Fast Sunbiz detail-page parser. Same rules and same output dict as
+# scrape_sunbiz_playwright._parse_detail_bs4, but the page is flattened with a
+# single lxml walk (no BeautifulSoup tree) and every pattern is compiled once at
+# import. Select it with NBP_DETAIL_PARSER=lxml (default) or =bs4 to A/B.
+import re
+from datetime import date
+from typing import Dict, List, Optional
+
+from dateutil.parser import parse as parse_dt
+from lxml import html as lxml_html
+
+DATE_DOC_RX = re.compile(r'^\d{1,2}/\d{1,2}/\d{4}\s+--\s+', re.I)
+
+# "Changed: 06/01/2024" / "Name Changed: ..." notes under an address or agent block
+CHANGED_RX = re.compile(r'^(?:Name |Address )?Changed\s*:.*\n?', re.I | re.M)
+
+# never page text: skipped by detail_text(), the in-page extractor (_DOM_TEXT_JS)
+# and the bs4 parser alike (get_text() itself already leaves out all but noscript)
+NO_TEXT_TAGS = ("script", "style", "template", "noscript")
+
+NOISE_RX = re.compile(
+    r'^(Annual Reports|No Annual Reports Filed|Document Images|View image in PDF format|'
+    r'Previous On List|Next On List|Return to List)\b',
+    re.I
+)
+
+TYPE_RX = re.compile(
+    r'\b(Florida|Foreign)\s+('
+    r'Limited Liability Company|Profit Corporation|Not For Profit Corporation|'
+    r'Limited Partnership|Limited Liability Limited Partnership|'
+    r'Limited Liability Partnership|Professional Corporation|'
+    r'Professional Limited Liability Company|General Partnership|Association'
+    r')\b',
+    re.I
+)
+
+STOPS = [
+    "Mailing Address",
+    "Registered Agent",
+    "Registered Agent Name",
+    "Registered Agent Name & Address",
+    "Filing Information",
+    "FEI/EIN Number",
+    "Officer/Director Detail",
+    "Authorized Person(s) Detail",
+    "Annual Reports",
+    "No Annual Reports Filed",
+    "Document Images",
+    "View image in PDF format",
+    "No Name History",
+    "No Events",
+    "Previous On List",
+    "Next On List",
+    "Return to List",
+    "Name and Address",
+    "Status",
+    "Last Event",
+    "Event Date Filed",
+    "Event Effective Date",
+]
+_STOPS_ALT = "|".join(map(re.escape, STOPS))
+
+FILED_RX = re.compile(r"(Date Filed|Filed On)\s*:?\s*(\d{1,2}/\d{1,2}/\d{4})", re.I)
+EFFECTIVE_RX = re.compile(r"(?<!Event )Effective Date\s*:?\s*(\d{1,2}/\d{1,2}/\d{4}|NONE)", re.I)
+ENTITY_TYPE_LABEL_RX = re.compile(r"\bEntity Type\b\s*:?\s*([A-Za-z][A-Za-z &/\-]{2,80})", re.I)
+FEI_RX = re.compile(r"FEI/EIN Number\s*:?\s*([A-Z0-9\- ]+|APPLIED FOR|NONE)", re.I)
+LAST_EVENT_RX = re.compile(r"Last Event\s*:?\s*([^\n]+)", re.I)
+EVENT_FILED_RX = re.compile(r"Event Date Filed\s*:?\s*(\d{1,2}/\d{1,2}/\d{4})", re.I)
+EVENT_EFFECTIVE_RX = re.compile(r"Event Effective Date\s*:?\s*(\d{1,2}/\d{1,2}/\d{4}|NONE)", re.I)
+RA_BLOCK_RX = re.compile(rf"Registered Agent Name\s*&\s*Address\s*\n(.+?)(?:\n(?:{_STOPS_ALT})|$)", re.I | re.S)
+RA_NAME_RX = re.compile(r"Registered Agent(?: Name(?: & Address)?)?\s*\n([^\n]+)", re.I)
+RA_ADDR_RX = re.compile(rf"Registered Agent Address\s*\n(.+?)(?:\n(?:{_STOPS_ALT})|$)", re.I | re.S)
+CITY_RX = re.compile(r"\b([A-Z][A-Za-z .'\-]+),\s*FL\b", re.I)
+STATUS_LINE_RX = re.compile(r"\bStatus\b\s*:?\s*([A-Za-z /\-]+)", re.I)
+
+
+def _section_rx(label: str):
+    """(block up to the next stop, block to end of page) for one section label."""
+    return (re.compile(rf"{re.escape(label)}\s*\n(.+?)\n(?:{_STOPS_ALT})", re.I | re.S),
+            re.compile(rf"{re.escape(label)}\s*\n(.+)$", re.I | re.S))
+
+
+ADDRESS_RX = {label: _section_rx(label) for label in ("Principal Address", "Mailing Address")}
+PEOPLE_RX = {
+    label: re.compile(rf"{re.escape(label)}\s*\n(.+?)(?:\n(?:{_STOPS_ALT})|$)", re.I | re.S)
+    for label in ("Officer/Director Detail", "Authorized Person(s) Detail")
+}
+
+
+def detail_text(html: str) -> str:
+    """
+    Visible text, one stripped string per line — the same string as
+    BeautifulSoup(html, "lxml").get_text("\\n", strip=True) with NO_TEXT_TAGS
+    removed, in one tree walk.
+    """
+    root = lxml_html.document_fromstring(html)
+    out: List[str] = []
+
+    def walk(el):
+        if el.text:
+            s = el.text.strip()
+            if s:
+                out.append(s)
+        for child in el:
+            if isinstance(child.tag, str) and child.tag not in NO_TEXT_TAGS:
+                walk(child)
+            if child.tail:
+                s = child.tail.strip()
+                if s:
+                    out.append(s)
+
+    walk(root)
+    return "\n".join(out)
+
+
+def tidy_text(text: str) -> str:
+    """Flattened detail text with non-breaking spaces as spaces and the "Changed:" notes dropped."""
+    return CHANGED_RX.sub("", text.replace("\xa0", " "))
+
+
+def _date(m, group: int = 1) -> Optional[date]:
+    try:
+        return parse_dt(m.group(group)).date()
+    except Exception:
+        return None
+
+
+def _clean_lines(block: Optional[str], max_lines: int = 12) -> Optional[str]:
+    lines = [ln.strip(" \t\r\n:") for ln in (block or "").splitlines() if ln.strip()]
+    return ", ".join(lines[:max_lines]) if lines else None
+
+
+def _address(text: str, label: str) -> Optional[str]:
+    rx, rx_to_end = ADDRESS_RX[label]
+    m = rx.search(text) or rx_to_end.search(text)
+    return _clean_lines(m.group(1)[:4000] if m else None)
+
+
+def _people(text: str, label: str) -> List[Dict]:
+    # one scan of the section (the bs4 parser matches it twice)
+    raw = PEOPLE_RX[label].search(text)
+    if not raw or not _clean_lines(raw.group(1)[:8000]):
+        return []
+
+    lines = []
+    for ln in raw.group(1).splitlines():
+        t = ln.strip()
+        if not t or NOISE_RX.search(t) or DATE_DOC_RX.search(t):
+            continue
+        lines.append(t)
+
+    people = []
+    i = 0
+    while i < len(lines):
+        if lines[i].lower().startswith("title"):
+            title = lines[i].split(None, 1)[1].strip() if " " in lines[i] else None  # bare "Title": vacant
+            i += 1
+            name = None
+            addr_lines = []
+            while i < len(lines) and not lines[i].lower().startswith("title"):
+                if name is None:
+                    name = lines[i]
+                else:
+                    addr_lines.append(lines[i])
+                i += 1
+            people.append({
+                "title": title,
+                "name": name,
+                "address": ", ".join(addr_lines) if addr_lines else None
+            })
+        else:
+            i += 1
+    return people
+
+
+def parse_detail_text(text: str) -> Dict:
+    """Field extraction over flattened detail text (see detail_text)."""
+    text = tidy_text(text)
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+
+    m = FILED_RX.search(text)
+    filing_date = _date(m, 2) if m else None
+
+    m = EFFECTIVE_RX.search(text)
+    effective_date = _date(m) if m and m.group(1).upper() != "NONE" else None
+
+    # entity type: header lines under "Detail by Entity Name", then label, then anywhere
+    entity_type = None
+    i = next((idx for idx, ln in enumerate(lines) if ln.lower().startswith("detail by entity name")), None)
+    if i is not None:
+        for cand in lines[i+1:i+5]:
+            if TYPE_RX.search(cand):
+                entity_type = cand.strip()
+                break
+    if not entity_type:
+        m = ENTITY_TYPE_LABEL_RX.search(text)
+        if m:
+            entity_type = m.group(1).strip()
+    if not entity_type:
+        m = TYPE_RX.search(text)
+        if m:
+            entity_type = f"{m.group(1)} {m.group(2)}".strip()
+    if entity_type:
+        entity_type = entity_type[:50]
+
+    m = FEI_RX.search(text)
+    fei_ein = m.group(1).strip() if m else None
+
+    m = LAST_EVENT_RX.search(text)
+    last_event = m.group(1).strip() if m else None
+
+    m = EVENT_FILED_RX.search(text)
+    event_date_filed = _date(m) if m else None
+
+    m = EVENT_EFFECTIVE_RX.search(text)
+    event_effective_date = _date(m) if m and m.group(1).upper() != "NONE" else None
+
+    principal_address = _address(text, "Principal Address")
+    mailing_address = _address(text, "Mailing Address")
+
+    ra_name = None
+    ra_addr = None
+    ra_raw = RA_BLOCK_RX.search(text)
+    if ra_raw:
+        ra_lines = [ln.strip() for ln in ra_raw.group(1).splitlines() if ln.strip()]
+        if ra_lines:
+            ra_name = ra_lines[0]
+            if len(ra_lines) > 1:
+                ra_addr = ", ".join(ra_lines[1:])
+    else:
+        m = RA_NAME_RX.search(text)
+        if m:
+            ra_name = m.group(1).strip()
+        m = RA_ADDR_RX.search(text)
+        if m:
+            ra_addr_lines = [ln.strip() for ln in m.group(1).splitlines() if ln.strip()]
+            if ra_addr_lines:
+                ra_addr = ", ".join(ra_addr_lines)
+
+    city = None
+    m = CITY_RX.search(principal_address or mailing_address or text)
+    if m:
+        city = m.group(1).strip().title()
+
+    m = STATUS_LINE_RX.search(text)
+    status = m.group(1).strip() if m else None
+
+    officers = _people(text, "Officer/Director Detail")
+    if not officers:
+        officers = _people(text, "Authorized Person(s) Detail")
+
+    return {
+        "filing_date": filing_date or date.today(),
+        "effective_date": effective_date,
+        "entity_type": entity_type,
+        "fei_ein": fei_ein,
+        "last_event": last_event,
+        "event_date_filed": event_date_filed,
+        "event_effective_date": event_effective_date,
+        "registered_agent_name": ra_name,
+        "registered_agent_address": ra_addr,
+        "principal_address": principal_address,
+        "mailing_address": mailing_address,
+        "city": city,
+        "county": None,
+        "status": status,
+        "officers": officers,
+    }
+
+
+def parse_detail_lxml(html: str) -> Dict:
+    if not html:
+        return {"filing_date": date.today()}
+    return parse_detail_text(detail_text(html))
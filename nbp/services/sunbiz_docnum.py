@@ -0,0 +1,40 @@
+# nbp/services/sunbiz_docnum.py
+# Sunbiz document numbers encode series and filing year: L25000123456 is an
+# LLC (series L) filed in 2025, sequence 000123456. Older numbering schemes
+# (pure digits, short letter+digits) don't carry a year and decode to None.
+import os, re
+from datetime import date
+from typing import Optional, Tuple
+
+DOC_RX = re.compile(r"^([A-Z])(\d{2})(\d{9})$")
+
+# classification of a results-list row against the crawl window
+OUT = "out"          # filed in a year that ends before the window starts
+MAYBE = "maybe"      # filed in a year that overlaps the window
+UNKNOWN = "unknown"  # no year in the doc number
+
+YEAR_SLACK_DAYS = int(os.getenv("NBP_DOC_YEAR_SLACK_DAYS", "0"))
+
+
+def parse_doc_number(doc: str) -> Optional[Tuple[str, int, int]]:
+    """'L25000123456' → ('L', 2025, 123456); None for numbers without a year."""
+    m = DOC_RX.match((doc or "").strip().upper())
+    if not m:
+        return None
+    yy = int(m.group(2))
+    century = 2000 if yy <= date.today().year % 100 else 1900
+    return m.group(1), century + yy, int(m.group(3))
+
+
+def format_doc_number(series: str, year: int, seq: int) -> str:
+    return f"{series}{year % 100:02d}{seq:09d}"
+
+
+def classify_doc(doc: str, window_start: date) -> str:
+    parsed = parse_doc_number(doc)
+    if not parsed:
+        return UNKNOWN
+    year_end = date(parsed[1], 12, 31)
+    if (year_end - window_start).days + YEAR_SLACK_DAYS < 0:
+        return OUT
+    return MAYBE
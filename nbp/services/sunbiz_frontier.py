@@ -0,0 +1,205 @@
+# nbp/services/sunbiz_frontier.py
+# Doc-number frontier crawler: new filings get roughly sequential numbers per
+# series (L25000000001, L25000000002, ...), so instead of walking every name
+# prefix we probe detail pages just past the highest number seen per series
+# and stop after a run of consecutive misses.
+import os, re, time
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from ..models import db, Entity, CrawlFrontier
+from .html_archive import archive_page
+from .sunbiz_docnum import parse_doc_number, format_doc_number
+from .scrape_sunbiz_http import http_session, observe_failure, TIMEOUT, DETAIL_WORKERS
+from .scrape_sunbiz_playwright import (
+    HOME, BS_PARSER, _parse_detail, _status_ok, _window_start, _build_record, _sleep,
+)
+from .rate_control import is_error_page
+
+DOC_DETAIL_URL = os.getenv(
+    "NBP_DOC_DETAIL_URL",
+    "/Inquiry/CorporationSearch/SearchResultDetail?inquirytype=DocumentNumber"
+    "&directionType=Initial&searchNameOrder={doc}&searchTerm={doc}",
+)
+SERIES = [x.strip().upper() for x in os.getenv("NBP_FRONTIER_SERIES", "L,P,N,M,F").split(",") if x.strip()]
+BATCH = int(os.getenv("NBP_FRONTIER_BATCH", "20"))             # detail URLs probed per round
+MAX_MISSES = int(os.getenv("NBP_FRONTIER_MAX_MISSES", "50"))   # consecutive misses before stopping
+# Sunbiz's answer for a document number that does not exist; any other non-detail page is an error
+MISSING_RX = re.compile(os.getenv(
+    "NBP_DOC_MISSING_RX",
+    r"no\s+(?:records?|documents?|entit(?:y|ies)|matches)\s+(?:were\s+)?found|does\s+not\s+exist",
+), re.I)
+
+
+class DetailUnavailable(RuntimeError):
+    """The detail request got an answer that is neither the document nor "no such document"."""
+
+
+def doc_detail_url(doc: str) -> str:
+    return urljoin(HOME, DOC_DETAIL_URL.format(doc=doc))
+
+
+def _entity_name(html: str) -> Optional[str]:
+    """Entity name from the detail header (last <p> of the corporationName block)."""
+    soup = BeautifulSoup(html, BS_PARSER)
+    block = soup.find(class_=re.compile(r"corporationName", re.I))
+    ps = block.find_all("p") if block else []
+    return ps[-1].get_text(" ", strip=True) if ps else None
+
+
+def fetch_detail_by_doc(s, doc: str, raise_errors: bool = False) -> Optional[Tuple[str, str]]:
+    """
+    (name, html) for an existing document number, None when Sunbiz answers
+    that there is no such doc. Anything else (a request failure, another
+    status, a block or captcha page, a detail page without a name) raises
+    with raise_errors and otherwise also gives None.
+    """
+    url = doc_detail_url(doc)
+    t0 = time.monotonic()
+    try:
+        r = s.get(url, timeout=TIMEOUT)
+    except Exception as e:
+        observe_failure(t0)
+        if raise_errors:
+            raise
+        print(f"[frontier] fetch failed {doc}: {e}")
+        return None
+    _sleep(300)
+    html = r.text
+    if is_error_page(html):
+        problem = f"error page (HTTP {r.status_code})"
+    elif r.status_code == 200 and doc in html and "Filing Information" in html:
+        name = _entity_name(html)
+        if name:
+            archive_page("detail", html, doc_number=doc, name=name, url=url)
+            return name, html
+        problem = "detail page without an entity name"
+    elif r.status_code in (200, 404) and MISSING_RX.search(html):
+        return None
+    else:
+        problem = f"unexpected HTTP {r.status_code} response"
+    if raise_errors:
+        raise DetailUnavailable(f"{doc}: {problem}")
+    print(f"[frontier] fetch failed {doc}: {problem}")
+    return None
+
+
+def _known_seqs(series: str, year: int) -> Set[int]:
+    like = f"{series}{year % 100:02d}%"
+    out = set()
+    for (doc,) in db.session.query(Entity.doc_number).filter(Entity.doc_number.like(like)):
+        parsed = parse_doc_number(doc)
+        if parsed and parsed[0] == series and parsed[1] == year:
+            out.add(parsed[2])
+    return out
+
+
+def load_frontier(series: str, year: int, known: Set[int] = None) -> Optional[int]:
+    """
+    Last sequence probed for series/year, seeded from ingested entities the
+    first time. None when nothing is known yet (walking from 1 would re-read
+    the whole year); a prefix crawl provides the seed.
+    """
+    fr = CrawlFrontier.query.filter_by(series=series, year=year).first()
+    if fr:
+        return fr.last_seq
+    known = _known_seqs(series, year) if known is None else known
+    return max(known) if known else None
+
+
+def save_frontier(series: str, year: int, last_seq: int):
+    fr = CrawlFrontier.query.filter_by(series=series, year=year).first()
+    if not fr:
+        fr = CrawlFrontier(series=series, year=year, last_seq=0)
+        db.session.add(fr)
+    fr.last_seq = max(fr.last_seq or 0, last_seq)
+    db.session.commit()
+
+
+def probe_series(s, pool: ThreadPoolExecutor, series: str, year: int, start_seq: int,
+                 known: Set[int], window_days: int = None,
+                 batch: int = BATCH, max_misses: int = MAX_MISSES) -> Iterator[Tuple[List[Dict], int]]:
+    """
+    Probe detail URLs past `start_seq` in concurrent batches. Yields
+    (kept records, frontier to save) per batch and stops once `max_misses`
+    numbers in a row don't exist. Known docs count as hits without being
+    fetched. A fetch that still fails after one retry is not a miss: the
+    frontier stays below it, so the next run probes it again.
+    """
+    if window_days is None:
+        window_days = int(os.getenv("NBP_WINDOW_DAYS", "90"))
+    today = date.today()
+    window_start = _window_start(window_days)
+
+    def _fetch(q):
+        try:
+            return fetch_detail_by_doc(s, format_doc_number(series, year, q), raise_errors=True)
+        except Exception as e:
+            return e
+
+    last_hit = start_seq
+    first_error = None  # lowest sequence whose fetch failed; the saved frontier stays below it
+    nxt = start_seq + 1
+    while nxt - 1 - last_hit < max_misses:
+        seqs = list(range(nxt, nxt + batch))
+        todo = [q for q in seqs if q not in known]
+        fetched = dict(zip(todo, pool.map(_fetch, todo)))
+        retry = [q for q in todo if isinstance(fetched[q], Exception)]
+        if retry:
+            fetched.update(zip(retry, pool.map(_fetch, retry)))
+
+        records: List[Dict] = []
+        for q in seqs:
+            if q in known:
+                last_hit = q
+                continue
+            hit = fetched.get(q)
+            if isinstance(hit, Exception):
+                print(f"[frontier] fetch failed {format_doc_number(series, year, q)}: {hit}")
+                if first_error is None:
+                    first_error = q
+                continue
+            if not hit:
+                continue
+            last_hit = q
+            name, html = hit
+            info = _parse_detail(html)
+            if info.get("status") and not _status_ok(info["status"]):
+                continue
+            if any(d is not None and window_start <= d <= today
+                   for d in (info.get("filing_date"), info.get("event_date_filed"))):
+                records.append(_build_record({"name": name, "doc": format_doc_number(series, year, q)}, info))
+
+        frontier = last_hit if first_error is None else min(last_hit, first_error - 1)
+        print(f"[frontier][{series}{year % 100:02d}] probed {seqs[0]}..{seqs[-1]} "
+              f"kept={len(records)} last_hit={last_hit} frontier={frontier}")
+        nxt += batch
+        yield records, frontier
+
+
+def crawl_frontier(series_list: List[str] = None, window_days: int = None) -> Iterator[Tuple[str, int, List[Dict], int]]:
+    """
+    Walk every series forward from its frontier (needs an app context).
+    Yields (series, year, records, last_hit) per probe batch; the caller
+    upserts the records and then calls save_frontier, so the frontier only
+    moves past rows that are committed.
+    """
+    series_list = series_list or SERIES
+    today = date.today()
+    years = [today.year - 1, today.year] if today.month == 1 else [today.year]  # late last-year numbers in January
+
+    with http_session() as s, ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as pool:
+        for year in years:
+            for series in series_list:
+                known = _known_seqs(series, year)
+                start = load_frontier(series, year, known)
+                if start is None:
+                    print(f"[frontier][{series}{year % 100:02d}] no seed yet; run a prefix crawl first")
+                    continue
+                print(f"[frontier][{series}{year % 100:02d}] starting at seq {start} (known={len(known)})")
+                for records, last_hit in probe_series(s, pool, series, year, start, known, window_days):
+                    yield series, year, records, last_hit
@@ -0,0 +1,123 @@
+# nbp/services/work_units.py
+# Turn the flat prefix list into roughly balanced work units using the page
+# counts observed in earlier runs: a hot prefix like "S" becomes S-, S0..S9,
+# SA..SZ (and deeper if a child is still hot). "S-" is the leading unit for
+# "S & S", "S-TEK" and other names listed before "S0". Matching goes through
+# _matches_prefix, so the prefix-boundary stop logic is unchanged.
+# Units are then ordered longest-first from their measured crawl durations, so
+# workers pulling from the shared list finish close together (LPT scheduling).
+import math, os, statistics
+from typing import Dict, Iterable, List, Optional
+from ..models import db, CrawlPrefixStat
+from .scrape_sunbiz_playwright import LEAD_MARK
+
+SUBPREFIX_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+MAX_DEPTH = int(os.getenv("NBP_UNIT_MAX_DEPTH", "3"))  # longest sub-prefix
+
+
+def load_prefix_pages() -> Dict[str, int]:
+    return {s.prefix: s.pages for s in CrawlPrefixStat.query}
+
+
+def record_prefix_pages(prefix: str, pages: int, rows_kept: int):
+    stat = CrawlPrefixStat.query.filter_by(prefix=prefix).first()
+    if not stat:
+        stat = CrawlPrefixStat(prefix=prefix)
+        db.session.add(stat)
+    stat.pages = pages
+    stat.rows_kept = rows_kept
+    db.session.commit()
+
+
+def load_prefix_durations() -> Dict[str, float]:
+    return {s.prefix: s.duration_s for s in CrawlPrefixStat.query if s.duration_s}
+
+
+def record_prefix_durations(durations: Dict[str, float]):
+    """Wall seconds of units crawled start to finish in one run."""
+    for prefix, secs in durations.items():
+        stat = CrawlPrefixStat.query.filter_by(prefix=prefix).first()
+        if not stat:
+            stat = CrawlPrefixStat(prefix=prefix, pages=0, rows_kept=0)
+            db.session.add(stat)
+        stat.duration_s = round(secs, 1)
+    db.session.commit()
+
+
+def _children(prefix: str) -> List[str]:
+    """The units a split prefix becomes: its leading unit, then one per next character."""
+    return [prefix + LEAD_MARK] + [prefix + c for c in SUBPREFIX_CHARS]
+
+
+def _estimate(prefix: str, page_counts: Dict[str, int]) -> Optional[int]:
+    """Pages (or seconds) for a prefix: the sum of its crawled children if split before, else its own."""
+    children = [page_counts[u] for u in _children(prefix) if u in page_counts]
+    if children:
+        return sum(children)
+    return page_counts.get(prefix)
+
+
+def plan_work_units(prefixes: List[str], page_counts: Dict[str, int],
+                    concurrency: int = 1, target_pages: int = None,
+                    pinned: Iterable[str] = ()) -> List[str]:
+    """
+    Split every prefix whose estimated page count exceeds `target_pages`
+    (NBP_UNIT_TARGET_PAGES, default: total pages / (4 × concurrency)) into
+    its leading unit plus one-character-longer sub-prefixes, recursively.
+    Prefixes without history stay whole until a run has measured them.
+
+    `pinned` units (the checkpointed ones of a resumed run) are kept exactly
+    as planned before, so a resume never re-crawls a range under another name.
+    """
+    pinned = set(pinned)
+    if target_pages is None:
+        target_pages = int(os.getenv("NBP_UNIT_TARGET_PAGES", "0"))
+    if not target_pages:
+        total = sum(_estimate(p, page_counts) or 0 for p in prefixes)
+        target_pages = max(5, math.ceil(total / (4 * max(1, concurrency))))
+
+    def expand(prefix: str) -> List[str]:
+        if prefix in pinned or prefix.endswith(LEAD_MARK):
+            return [prefix]
+        split_before = any(u.startswith(prefix) for u in pinned)
+        pages = _estimate(prefix, page_counts)
+        if not split_before and (pages is None or pages <= target_pages or len(prefix) >= MAX_DEPTH):
+            return [prefix]
+        out = []
+        for u in _children(prefix):
+            out.extend(expand(u))
+        return out
+
+    units = []
+    for p in prefixes:
+        units.extend(expand(p))
+    return units
+
+
+def estimate_seconds(units: List[str], durations: Dict[str, float],
+                     page_counts: Dict[str, int]) -> Dict[str, float]:
+    """
+    Expected crawl seconds per unit: its measured duration, else its pages ×
+    the median seconds/page of measured units, else the median estimate.
+    Empty when nothing has been measured or counted yet.
+    """
+    est = {u: _estimate(u, durations) for u in units}
+    rates = [durations[p] / page_counts[p] for p in durations if page_counts.get(p)]
+    per_page = statistics.median(rates) if rates else None
+    for u in units:
+        if est[u] is None:
+            pages = _estimate(u, page_counts)
+            if pages is not None and (per_page or not durations):
+                est[u] = pages * (per_page or 1.0)
+    known = [v for v in est.values() if v is not None]
+    if not known:
+        return {}
+    fill = statistics.median(known)
+    return {u: (v if v is not None else fill) for u, v in est.items()}
+
+
+def order_longest_first(units: List[str], estimates: Dict[str, float]) -> List[str]:
+    """LPT order; ties and unknowns keep their planned order."""
+    if not estimates:
+        return list(units)
+    return sorted(units, key=lambda u: -estimates.get(u, 0.0))
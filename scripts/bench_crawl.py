@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+End-to-end crawl benchmark against the local Sunbiz stand-in.
+
+Starts scripts/sunbiz_standin.py, runs jobs.run_all() in a child process
+against a fresh database with NBP_SUNBIZ_BASE pointed at the stand-in, and
+reports entities/minute, requests/entity and the crawl's peak RSS.
+
+Run with: python scripts/bench_crawl.py --entities 3000 --latency-ms 50 --engine http \\
+              --env NBP_CONCURRENCY=4 --env NBP_RATE_START=20
+Other NBP_* settings are taken from the environment (or --env KEY=VALUE).
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import shutil
+import resource
+import tempfile
+import subprocess
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _child():
+    """Inside the crawl process: create the schema on the scratch DB, then crawl."""
+    from flask import Flask
+    from nbp.models import db, Entity
+
+    app = Flask("bench")
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ["DATABASE_URL"]
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+
+    import jobs
+    jobs.run_all()
+
+    with app.app_context():
+        print("[bench] " + json.dumps({"entities": Entity.query.count()}), flush=True)
+
+
+def _stats(base):
+    with urllib.request.urlopen(f"{base}/__stats", timeout=5) as r:
+        return json.loads(r.read())
+
+
+def _wait_for(base, proc, timeout=30):
+    t_end = time.time() + timeout
+    while time.time() < t_end:
+        if proc.poll() is not None:
+            raise RuntimeError("stand-in exited during startup")
+        try:
+            return _stats(base)
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("stand-in did not come up")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--entities", type=int, default=2000, help="stand-in dataset size")
+    ap.add_argument("--latency-ms", type=int, default=0)
+    ap.add_argument("--jitter-ms", type=int, default=0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--engine", choices=("http", "async", "process"), default="http",
+                    help="http needs no browser; async/process need Playwright's Chromium")
+    ap.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                    help="extra setting for the crawl process (repeatable)")
+    ap.add_argument("--database-url", default=None, help="default: a throwaway SQLite file")
+    ap.add_argument("--log", default=None, help="write the crawl output here (default: discard)")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child()
+        return 0
+
+    base = f"http://127.0.0.1:{args.port}"
+    standin = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "sunbiz_standin.py"), "--port", str(args.port),
+         "--entities", str(args.entities), "--latency-ms", str(args.latency_ms),
+         "--jitter-ms", str(args.jitter_ms), "--error-rate", str(args.error_rate)],
+        stdout=subprocess.DEVNULL,
+    )
+    tmpdir = tempfile.mkdtemp(prefix="nbp-bench-")
+    try:
+        before = _wait_for(base, standin)
+
+        env = dict(os.environ)
+        env.update({
+            "NBP_SUNBIZ_BASE": base,
+            "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(tmpdir, 'bench.db')}",
+            "NBP_ARCHIVE_DIR": "",
+            "NBP_USE_BROWSER": "0" if args.engine == "http" else "1",
+        })
+        if args.engine != "http":
+            env["NBP_ENGINE"] = args.engine
+        for kv in args.env:
+            k, _, v = kv.partition("=")
+            env[k] = v
+
+        log = open(args.log, "w") if args.log else subprocess.DEVNULL
+        t0 = time.time()
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"],
+                               env=env, cwd=os.path.dirname(HERE),
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        elapsed = time.time() - t0
+        peak_rss_kib = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss  # KiB on Linux
+        if log is not subprocess.DEVNULL:
+            log.write(child.stdout)
+            log.close()
+
+        if child.returncode != 0:
+            print(child.stdout[-4000:])
+            print(f"[bench] crawl failed (exit {child.returncode})")
+            return 1
+
+        entities = 0
+        crawl = {}
+        for line in child.stdout.splitlines():
+            if line.startswith("[bench] "):
+                entities = json.loads(line[len("[bench] "):])["entities"]
+            elif line.startswith("[metrics] "):
+                crawl = json.loads(line[len("[metrics] "):])
+        after = _stats(base)
+        requests = after["requests"] - before["requests"]
+        by_kind = {k: after[k] - before[k] for k in after if k != "requests"}
+
+        report = {
+            "engine": args.engine,
+            "entities": entities,
+            "seconds": round(elapsed, 1),
+            "entities_per_min": round(entities / elapsed * 60, 1) if elapsed else None,
+            "requests": requests,
+            "requests_per_entity": round(requests / entities, 2) if entities else None,
+            "peak_rss_mib": round(peak_rss_kib / 1024, 1),
+            "bytes_per_page": crawl.get("bytes_per_page"),
+            "mib_transferred": round(crawl.get("totals", {}).get("bytes_transferred", 0) / 2**20, 1),
+            "blocked_requests": crawl.get("by_label", {}).get("blocked_requests", {}),
+            "standin": {"entities": args.entities, "latency_ms": args.latency_ms,
+                        "jitter_ms": args.jitter_ms, "error_rate": args.error_rate},
+            "requests_by_kind": by_kind,
+            "settings": {k: v for k, v in sorted(env.items()) if k.startswith("NBP_")},
+        }
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print(f"[bench] engine={report['engine']} entities={entities} in {report['seconds']}s")
+            print(f"[bench] entities/min={report['entities_per_min']} requests/entity={report['requests_per_entity']} "
+                  f"peak_rss={report['peak_rss_mib']} MiB")
+            print(f"[bench] transferred={report['mib_transferred']} MiB bytes/page={report['bytes_per_page']} "
+                  f"blocked={report['blocked_requests']}")
+            print(f"[bench] requests: {by_kind}")
+        return 0
+    finally:
+        standin.terminate()
+        standin.wait()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
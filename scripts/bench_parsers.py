@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Offline parser benchmark + golden check over saved Sunbiz pages.
+
+Fixtures live in scripts/fixtures/sunbiz/:
+  detail_*.html   entity detail pages  → _parse_detail (bs4 / lxml backends)
+  results_*.html  ByName result lists  → _parse_results_table
+  bydate_*.html   ByDate result lists  → _find_results_table + parse_filing_row
+and golden/<fixture>.json holds the correct fields for each page, checked by
+hand against the page, not whatever the parser happens to return. Add a page
+by saving it (an NBP_DEBUG dump, or read_page() from the raw-page archive),
+run --update-golden for a first draft, then correct the new JSON by hand
+before committing it (and fix the parsers until --check passes).
+
+Run with: python scripts/bench_parsers.py [--repeat 50] [--check] [--update-golden]
+"""
+
+import sys
+import os
+import glob
+import json
+import time
+import argparse
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bs4 import BeautifulSoup
+
+from nbp.services.scrape_sunbiz import _find_results_table, parse_filing_row
+from nbp.services.scrape_sunbiz_playwright import BS_PARSER, _parse_results_table, _parse_detail_bs4
+from nbp.services.sunbiz_detail import parse_detail_lxml
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sunbiz")
+GOLDEN = os.path.join(FIXTURES, "golden")
+
+
+def _bydate_rows(html):
+    table = _find_results_table(BeautifulSoup(html, BS_PARSER))
+    if not table:
+        return []
+    rows = []
+    for tr in table.find_all("tr"):
+        if tr.find("th"):
+            continue
+        rec = parse_filing_row(tr)
+        if rec:
+            rows.append(rec)
+    return rows
+
+
+# kind → {backend: parser}; the first backend of each kind writes the golden file
+BACKENDS = {
+    "detail": {"bs4": _parse_detail_bs4, "lxml": parse_detail_lxml},
+    "results": {"bs4": _parse_results_table},
+    "bydate": {"bs4": _bydate_rows},
+}
+
+
+def _kind(fn):
+    base = os.path.basename(fn)
+    if base.startswith("detail_"):
+        return "detail"
+    if "bydate" in base:
+        return "bydate"
+    return "results"
+
+
+def _jsonable(obj):
+    return json.loads(json.dumps(obj, default=lambda v: v.isoformat() if isinstance(v, date) else str(v)))
+
+
+def _golden_path(fn):
+    return os.path.join(GOLDEN, os.path.basename(fn).rsplit(".", 1)[0] + ".json")
+
+
+def _pct(sorted_ms, p):
+    return sorted_ms[min(len(sorted_ms) - 1, int(round(p / 100 * (len(sorted_ms) - 1))))]
+
+
+def bench(parser, pages, repeat):
+    times = []
+    for _ in range(repeat):
+        for html in pages:
+            t0 = time.perf_counter()
+            parser(html)
+            times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+
+    # separate pass: tracemalloc slows parsing down too much to time under it
+    tracemalloc.start()
+    for html in pages:
+        parser(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_s = sum(times) / 1000
+    return {
+        "pages_per_sec": round(len(times) / total_s, 1) if total_s else None,
+        "p50_ms": round(_pct(times, 50), 3),
+        "p99_ms": round(_pct(times, 99), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=50, help="passes over the corpus per backend")
+    ap.add_argument("--check", action="store_true", help="only compare every backend with the golden output")
+    ap.add_argument("--update-golden", action="store_true",
+                    help="rewrite golden JSON from the first backend (a draft to correct by hand)")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args()
+
+    files = sorted(glob.glob(os.path.join(FIXTURES, "*.html")))
+    if not files:
+        print(f"no fixtures in {FIXTURES}")
+        return 1
+    corpus = {}
+    for fn in files:
+        with open(fn, encoding="utf-8") as f:
+            corpus.setdefault(_kind(fn), []).append((fn, f.read()))
+
+    failures = 0
+    for kind, items in corpus.items():
+        for name, parser in BACKENDS[kind].items():
+            for fn, html in items:
+                gp = _golden_path(fn)
+                if args.update_golden and name == next(iter(BACKENDS[kind])):
+                    out = _jsonable(parser(html))
+                    os.makedirs(GOLDEN, exist_ok=True)
+                    with open(gp, "w", encoding="utf-8") as f:
+                        json.dump(out, f, indent=2, sort_keys=True)
+                        f.write("\n")
+                    continue
+                if not os.path.exists(gp):
+                    print(f"[golden] missing {os.path.basename(gp)} (run with --update-golden)")
+                    failures += 1
+                    continue
+                with open(gp, encoding="utf-8") as f:
+                    golden = json.load(f)
+                if _jsonable(parser(html)) != golden:
+                    print(f"[golden] MISMATCH {kind}/{name}: {os.path.basename(fn)}")
+                    failures += 1
+    if args.update_golden:
+        print(f"[golden] wrote {len(files)} files to {GOLDEN}")
+        return 0
+    print(f"[golden] {len(files)} fixtures, {failures} mismatches")
+    if args.check:
+        return 1 if failures else 0
+
+    report = []
+    for kind, items in corpus.items():
+        pages = [html for _, html in items]
+        for name, parser in BACKENDS[kind].items():
+            row = {"kind": kind, "backend": name, "pages": len(pages)}
+            row.update(bench(parser, pages, args.repeat))
+            report.append(row)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'kind':<8} {'backend':<8} {'pages':>5} {'pages/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'peak KiB':>9}")
+        for r in report:
+            print(f"{r['kind']:<8} {r['backend']:<8} {r['pages']:>5} {r['pages_per_sec']:>9} "
+                  f"{r['p50_ms']:>8} {r['p99_ms']:>8} {r['peak_kib']:>9}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for search.sunbiz.org, for crawl benchmarks without network.
+
+Serves a synthetic, seeded dataset with the same page flow the crawlers use:
+home, the ByName form (POST → 302 to SearchResults), paginated result lists
+with "Next List", detail pages by aggregateId or document number, and the
+ByDate form (POST → 302 to DateResults, numbered page links plus "Next").
+Pages pull a stylesheet, logo, web font and analytics script like the real
+site, so browser runs can measure request blocking (NBP_BLOCK_TYPES/URLS).
+GET /__stats returns request counts as JSON.
+
+Run with: python scripts/sunbiz_standin.py --port 8765 --entities 5000 --latency-ms 80 --error-rate 0.01
+then point the crawler at it with NBP_SUNBIZ_BASE=http://127.0.0.1:8765
+"""
+
+import re
+import sys
+import html
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode
+
+WORDS = ("ACME SUN PALM BAY OCEAN CORAL GULF KEY STAR BLUE GREEN HOME CARE AUTO TECH LAW MEDIA "
+         "SERVICES GROUP HOLDINGS CAPITAL COASTAL EAGLE HARBOR ISLAND METRO NORTH PRIME ROYAL "
+         "SOUTH SUMMIT TRUST UNITED VISTA WEST").split()
+# first letters roughly follow Florida name volume, so S/A/C/M/T are hot and Q/X/Z cold
+FIRST_CHAR_WEIGHTS = {
+    **{c: 1 for c in "0123456789"},
+    "A": 30, "B": 20, "C": 26, "D": 16, "E": 12, "F": 14, "G": 14, "H": 12, "I": 8, "J": 10,
+    "K": 8, "L": 14, "M": 24, "N": 10, "O": 8, "P": 20, "Q": 1, "R": 14, "S": 34, "T": 22,
+    "U": 4, "V": 6, "W": 8, "X": 1, "Y": 2, "Z": 2,
+}
+SUFFIXES = [("LLC", "L", "Florida Limited Liability Company"),
+            ("INC.", "P", "Florida Profit Corporation"),
+            ("FOUNDATION, INC.", "N", "Florida Not For Profit Corporation")]
+
+PAGE_SIZE = 20
+FORM = '''<html><head><title>Search by Entity Name</title></head><body>
+<form action="/Inquiry/CorporationSearch/ByName" method="post">
+<input type="hidden" name="__RequestVerificationToken" value="standin-token"/>
+<input type="hidden" name="InquiryType" value="EntityName"/>
+<input id="SearchTerm" name="SearchTerm" type="text" value=""/>
+<input type="submit" value="Search Now"/></form></body></html>'''
+DATE_FORM = '''<html><head><title>Search by Filing Date</title></head><body>
+<form action="/Inquiry/CorporationSearch/SearchByDate" method="post">
+<input type="hidden" name="__RequestVerificationToken" value="standin-token"/>
+<input id="FromDate" name="FromDate" type="text" value=""/>
+<input id="ToDate" name="ToDate" type="text" value=""/>
+<input type="submit" name="SearchButton" value="Search"/></form></body></html>'''
+ERROR_PAGE = "<html><body><h1>Service Unavailable</h1></body></html>"
+# subresources of every HTML page: path → (content type, size in bytes)
+ASSETS = {
+    "/static/site.css": ("text/css", 60_000),
+    "/static/logo.png": ("image/png", 25_000),
+    "/static/font.woff2": ("font/woff2", 40_000),
+    "/static/analytics.js": ("application/javascript", 30_000),
+}
+ASSET_TAGS = ('<link rel="stylesheet" href="/static/site.css"/>'
+              '<link rel="preload" as="font" type="font/woff2" href="/static/font.woff2" crossorigin/>'
+              '<script async src="/static/analytics.js"></script>')
+
+
+def _norm(s):
+    return re.sub(r'[^A-Z0-9]', '', s.upper())
+
+
+def build_dataset(n, seed=7, recent_share=0.4):
+    """n entities sorted the way Sunbiz lists them; recent_share filed in the last ~6 months."""
+    rnd = random.Random(seed)
+    chars, weights = zip(*FIRST_CHAR_WEIGHTS.items())
+    today = date.today()
+    seqs = {}
+    out = []
+    for i in range(n):
+        suffix, series, etype = rnd.choice(SUFFIXES)
+        first = rnd.choices(chars, weights)[0]
+        name = f"{first}{rnd.choice(WORDS)} {rnd.choice(WORDS)} {i} {suffix}"
+        if rnd.random() < recent_share:
+            filed = today - timedelta(days=rnd.randint(0, 180))
+        else:
+            filed = date(rnd.randint(1995, today.year - 1), rnd.randint(1, 12), rnd.randint(1, 28))
+        key = (series, filed.year)
+        seqs[key] = seqs.get(key, 0) + 1 + rnd.randint(0, 2)
+        doc = f"{series}{filed.year % 100:02d}{seqs[key]:09d}"
+        status = "Active" if rnd.random() < 0.8 else "INACT"
+        out.append({"name": name, "doc": doc, "status": status, "filed": filed, "type": etype})
+    out.sort(key=lambda e: _norm(e["name"]))
+    return out
+
+
+def results_page(entities, keys, term):
+    i = _bisect(keys, _norm(term))
+    rows = entities[i:i + PAGE_SIZE]
+    trs = "".join(
+        f'<tr><td class="large-width"><a href="/Inquiry/CorporationSearch/SearchResultDetail?'
+        f'inquirytype=EntityName&amp;directionType=Initial&amp;aggregateId={e["doc"]}" '
+        f'title="View Details">{html.escape(e["name"])}</a></td>'
+        f'<td class="medium-width">{e["doc"]}</td><td class="small-width">{e["status"]}</td></tr>'
+        for e in rows)
+    nxt = ""
+    if i + PAGE_SIZE < len(entities):
+        q = urlencode({"inquiryType": "EntityName", "inquiryDirectionType": "ForwardList",
+                       "searchTerm": entities[i + PAGE_SIZE]["name"]})
+        nxt = f'<a href="/Inquiry/CorporationSearch/SearchResults?{html.escape(q)}" title="Next List">Next List</a>'
+    return (f'<html><head><title>Search Results</title></head><body><div class="page-title"><h1>Entity Name List</h1></div>'
+            f'<div id="search-results"><table><thead><tr><th>Corporate Name</th><th>Document Number</th>'
+            f'<th>Status</th></tr></thead><tbody>{trs}</tbody></table></div>'
+            f'<div class="navigationBar">{nxt}</div></body></html>')
+
+
+def date_results_page(by_date, day, page):
+    """One page of the filings listed for `day`, with links to up to 10 page numbers around it."""
+    rows = by_date.get(day, [])
+    n_pages = max(1, -(-len(rows) // PAGE_SIZE))
+    page = min(max(page, 1), n_pages)
+    trs = "".join(
+        f'<tr><td><a href="/Inquiry/CorporationSearch/SearchResultDetail?inquirytype=DocumentNumber&amp;'
+        f'searchTerm={e["doc"]}">{html.escape(e["name"])}</a></td><td>{e["doc"]}</td>'
+        f'<td>{html.escape(e["type"].upper())}</td><td>{e["filed"].strftime("%m/%d/%Y")}</td></tr>'
+        for e in rows[(page - 1) * PAGE_SIZE:page * PAGE_SIZE])
+    link = lambda p, label: (f'<a href="/Inquiry/CorporationSearch/DateResults?'
+                             f'{html.escape(urlencode({"date": day.strftime("%m/%d/%Y"), "page": p}))}">{label}</a>')
+    first = max(1, min(page - 4, n_pages - 9))
+    nav = " ".join(str(p) if p == page else link(p, p) for p in range(first, min(n_pages, first + 9) + 1))
+    if page < n_pages:
+        nav += " " + link(page + 1, "Next")
+    return (f'<html><head><title>Search Results</title></head><body>'
+            f'<table id="results"><tr><th>Entity Name</th><th>Document Number</th><th>Filing Type</th>'
+            f'<th>Filing Date</th></tr>{trs}</table><div class="pager">{nav}</div></body></html>')
+
+
+def detail_page(e):
+    fd = e["filed"].strftime("%m/%d/%Y")
+    people = "Officer/Director Detail" if "Corporation" in e["type"] else "Authorized Person(s) Detail"
+    return f'''<html><head><title>Detail by Entity Name</title></head><body>
+<div class="page-title"><h1>Detail by Entity Name</h1></div>
+<div class="searchResultDetail">
+<div class="detailSection corporationName"><p>{e["type"]}</p><p>{html.escape(e["name"])}</p></div>
+<div class="detailSection filingInfo"><span>Filing Information</span><div>
+<label>Document Number</label><span>{e["doc"]}</span>
+<label>FEI/EIN Number</label><span>NONE</span>
+<label>Date Filed</label><span>{fd}</span>
+<label>Effective Date</label><span>{fd}</span>
+<label>State</label><span>FL</span>
+<label>Status</label><span>{"ACTIVE" if e["status"] == "Active" else "INACTIVE"}</span></div></div>
+<div class="detailSection"><span>Principal Address</span><div>123 MAIN ST<br/>MIAMI, FL 33101</div></div>
+<div class="detailSection"><span>Mailing Address</span><div>PO BOX 1<br/>MIAMI, FL 33101</div></div>
+<div class="detailSection"><span>Registered Agent Name &amp; Address</span><span>DOE, JOHN</span><span><div>123 MAIN ST<br/>MIAMI, FL 33101</div></span></div>
+<div class="detailSection"><span>{people}</span><span>Name &amp; Address</span><br/><br/><span>Title MGR</span><br/><br/>DOE, JOHN<br/><span><div>123 MAIN ST<br/>MIAMI, FL 33101</div></span></div>
+<div class="detailSection"><span>Annual Reports</span><span>No Annual Reports Filed</span></div>
+<div class="detailSection"><span>Document Images</span><table><tr><td><a href="#">{fd} -- {e["type"]}</a></td><td>View image in PDF format</td></tr></table></div>
+</div></body></html>'''
+
+
+def _bisect(keys, k):
+    lo, hi = 0, len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if keys[mid] < k:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def make_handler(entities, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=7):
+    by_doc = {e["doc"]: e for e in entities}
+    keys = [_norm(e["name"]) for e in entities]
+    by_date = {}
+    for e in sorted(entities, key=lambda e: e["doc"]):
+        by_date.setdefault(e["filed"], []).append(e)
+    rnd = random.Random(seed)
+    lock = threading.Lock()
+    stats = {"requests": 0, "errors": 0, "home": 0, "form": 0, "search": 0, "results": 0, "detail": 0,
+             "bydate": 0, "asset": 0, "other": 0}
+
+    def _count(kind, error=False):
+        with lock:
+            stats["requests"] += 1
+            stats[kind] += 1
+            stats["errors"] += int(error)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+        def log_message(self, *a):
+            pass
+
+        def _send(self, body, code=200, headers=None, content_type="text/html; charset=utf-8"):
+            if isinstance(body, str):
+                body = body.replace("<head>", "<head>" + ASSET_TAGS, 1).replace(
+                    "<body>", '<body><img src="/static/logo.png" alt="Division of Corporations"/>', 1)
+            b = body.encode("utf-8") if isinstance(body, str) else body
+            self.send_response(code)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(b)))
+            self.end_headers()
+            self.wfile.write(b)
+
+        def _serve(self, kind, render):
+            with lock:
+                delay = latency_ms + (rnd.randint(0, jitter_ms) if jitter_ms else 0)
+                fail = error_rate > 0 and rnd.random() < error_rate
+            if delay:
+                time.sleep(delay / 1000)
+            _count(kind, fail)
+            if fail:
+                return self._send(ERROR_PAGE, 503)
+            return render()
+
+        def do_GET(self):
+            u = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(u.query).items()}
+            if u.path == "/__stats":
+                with lock:
+                    return self._send(json.dumps(stats), headers={"Cache-Control": "no-store"})
+            if u.path in ASSETS:
+                ctype, size = ASSETS[u.path]
+                return self._serve("asset", lambda: self._send(b"\0" * size, content_type=ctype))
+            if u.path == "/":
+                return self._serve("home", lambda: self._send(
+                    "<html><head><title>Division of Corporations</title></head><body>Division of Corporations</body></html>"))
+            if u.path.endswith("/ByName"):
+                return self._serve("form", lambda: self._send(FORM))
+            if u.path.endswith("/SearchResults"):
+                return self._serve("results", lambda: self._send(results_page(entities, keys, q.get("searchTerm", ""))))
+            if u.path.endswith("/ByDate"):
+                return self._serve("form", lambda: self._send(DATE_FORM))
+            if u.path.endswith("/DateResults"):
+                try:
+                    day = datetime.strptime(q.get("date", ""), "%m/%d/%Y").date()
+                except ValueError:
+                    return self._serve("bydate", lambda: self._send("bad date", 400))
+                page = int(q.get("page", "1") or 1)
+                return self._serve("bydate", lambda: self._send(date_results_page(by_date, day, page)))
+            if u.path.endswith("/SearchResultDetail"):
+                e = by_doc.get(q.get("aggregateId") or q.get("searchTerm") or "")
+                if not e:
+                    return self._serve("detail", lambda: self._send("<html><body>No records found.</body></html>", 404))
+                return self._serve("detail", lambda: self._send(detail_page(e)))
+            return self._serve("other", lambda: self._send("not found", 404))
+
+        def do_POST(self):
+            n = int(self.headers.get("Content-Length", 0))
+            body = parse_qs(self.rfile.read(n).decode())
+            if urlparse(self.path).path.endswith("/SearchByDate"):
+                loc = "/Inquiry/CorporationSearch/DateResults?" + urlencode(
+                    {"date": body.get("FromDate", [""])[0], "page": 1})
+                return self._serve("search", lambda: self._send("", 302, {"Location": loc}))
+            term = body.get("SearchTerm", [""])[0]
+            loc = "/Inquiry/CorporationSearch/SearchResults?" + urlencode({"inquiryType": "EntityName", "searchTerm": term})
+            return self._serve("search", lambda: self._send("", 302, {"Location": loc}))
+
+    return Handler
+
+
+def serve(port=8765, entities=2000, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=7, background=True):
+    data = build_dataset(entities, seed=seed)
+    srv = ThreadingHTTPServer(("127.0.0.1", port), make_handler(data, latency_ms, jitter_ms, error_rate, seed))
+    srv.daemon_threads = True
+    if background:
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--entities", type=int, default=2000, help="dataset size")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--latency-ms", type=int, default=0, help="added to every response")
+    ap.add_argument("--jitter-ms", type=int, default=0, help="random extra latency, 0..N ms")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 503 error page")
+    args = ap.parse_args()
+
+    srv = serve(args.port, args.entities, args.latency_ms, args.jitter_ms, args.error_rate, args.seed, background=False)
+    print(f"[standin] serving {args.entities} entities on http://127.0.0.1:{args.port}", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
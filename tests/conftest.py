@@ -0,0 +1,5 @@
+import os, sys
+
+# nbp/__init__ imports billing, which refuses to load without a Stripe key
+os.environ.setdefault("STRIPE_SECRET_KEY", "sk_test_dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,97 @@
+import asyncio
+
+from nbp.services.scrape_sunbiz_playwright import _PagePool
+
+
+class _FakeCDP:
+    async def send(self, *a, **kw):
+        pass
+
+    def on(self, *a, **kw):
+        pass
+
+
+class _FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        await asyncio.sleep(0.01)  # let every acquirer reach the pool before the first page exists
+        self.browser.open += 1
+        self.browser.peak = max(self.browser.peak, self.browser.open)
+        return object()
+
+    async def route(self, *a, **kw):
+        pass
+
+    async def new_cdp_session(self, page):
+        return _FakeCDP()
+
+    async def close(self):
+        self.browser.open -= 1
+
+
+class _FakeBrowser:
+    def __init__(self, fail_first=0):
+        self.open = self.peak = self.contexts = 0
+        self.fail_first = fail_first
+
+    async def new_context(self, **kw):
+        await asyncio.sleep(0.01)
+        self.contexts += 1
+        if self.contexts <= self.fail_first:
+            raise RuntimeError("context failed")
+        return _FakeContext(self)
+
+
+def _run(pool_size, tasks, fail_first=0):
+    browser = _FakeBrowser(fail_first)
+
+    async def main():
+        pool = _PagePool(browser, pool_size)
+
+        async def one(_):
+            try:
+                page = await pool.acquire()
+            except RuntimeError:
+                return False
+            try:
+                await asyncio.sleep(0.005)
+            finally:
+                pool.release(page)
+            return True
+
+        done = await asyncio.gather(*(one(i) for i in range(tasks)))
+        await pool.close()
+        return done
+
+    return browser, asyncio.run(main())
+
+
+def test_peak_pages_within_budget():
+    browser, done = _run(2, 36)
+    assert all(done)
+    assert browser.peak <= 2
+    assert browser.contexts == 2
+
+
+def test_failed_page_frees_its_slot():
+    browser, done = _run(2, 10, fail_first=2)
+    assert done.count(False) == 2 and done.count(True) == 8
+    assert browser.peak <= 2
+
+
+def test_rss_recycles_one_context_at_a_time(monkeypatch):
+    from nbp.services import scrape_sunbiz_playwright as pw
+
+    monkeypatch.setattr(pw, "_rss_high", lambda prefix, navs: True)
+    monkeypatch.setattr(pw, "RECYCLE_NAVS", 0)
+    monkeypatch.setattr(pw, "RSS_SAMPLE_S", 60)
+    pool = _PagePool(_FakeBrowser(), 3)
+    pages = [object(), object(), object()]
+    for navs, page in zip((10, 30, 20), pages):
+        pool._navs[id(page)] = navs
+
+    # every task sees the same high RSS; only the busiest context goes, and only once per sample
+    assert [pool.should_recycle("A", p) for p in pages] == [False, True, False]
+    assert not pool.should_recycle("A", pages[1])
@@ -0,0 +1,74 @@
+import glob
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+import bench_parsers  # noqa: E402
+
+FIXTURES = sorted(glob.glob(os.path.join(bench_parsers.FIXTURES, "*.html")))
+CASES = [(fn, name) for fn in FIXTURES for name in bench_parsers.BACKENDS[bench_parsers._kind(fn)]]
+
+
+def _parsed(fn, backend="lxml"):
+    with open(fn, encoding="utf-8") as f:
+        html = f.read()
+    return bench_parsers._jsonable(bench_parsers.BACKENDS[bench_parsers._kind(fn)][backend](html))
+
+
+def _fixture(name):
+    return os.path.join(bench_parsers.FIXTURES, name)
+
+
+@pytest.mark.parametrize("fn,backend", CASES, ids=[f"{os.path.basename(f)}-{b}" for f, b in CASES])
+def test_matches_golden(fn, backend):
+    with open(bench_parsers._golden_path(fn), encoding="utf-8") as f:
+        assert _parsed(fn, backend) == json.load(f)
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_changed_notes_and_nbsp_stay_out_of_addresses(backend):
+    info = _parsed(_fixture("detail_llc_officers.html"), backend)
+    assert info["principal_address"] == "1234 N MAIN ST, STE 100, TAMPA, FL 33602"
+    assert info["registered_agent_address"] == "1234 N MAIN ST, STE 100, TAMPA, FL 33602"
+
+    info = _parsed(_fixture("detail_corp_many_officers.html"), backend)
+    assert info["mailing_address"] == "2501 N ORANGE AVE, SUITE 400, ORLANDO, FL 32804"
+    assert info["registered_agent_address"] == "2501 N ORANGE AVE, SUITE 400, ORLANDO, FL 32804"
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_event_effective_date_is_not_the_effective_date(backend):
+    info = _parsed(_fixture("detail_corp_many_officers.html"), backend)
+    assert info["effective_date"] is None
+    assert info["event_effective_date"] == "2024-02-14"
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_vacant_officer_has_no_title(backend):
+    officers = _parsed(_fixture("detail_nonprofit_sparse.html"), backend)["officers"]
+    assert officers[-1] == {"title": None, "name": "VACANT", "address": None}
+
+
+def test_bydate_row_fields():
+    first = _parsed(_fixture("bydate_results.html"), "bs4")[0]
+    assert first["doc_number"] == "P20000005000"
+    assert first["entity_type"] == "DOMESTIC PROFIT"
+    assert first["name"] == "ACADIA PROPERTIES LLC"
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_noscript_text_is_skipped(backend):
+    with open(_fixture("detail_corp_directors.html"), encoding="utf-8") as f:
+        html = f.read()
+    noisy = html.replace(
+        '<div class="detailSection"><span>Mailing Address</span>',
+        '<noscript>Principal Address<br/>ENABLE JAVASCRIPT, FL 00000</noscript>'
+        '<div class="detailSection"><span>Mailing Address</span>')
+    assert noisy != html
+    parse = bench_parsers.BACKENDS["detail"][backend]
+    assert bench_parsers._jsonable(parse(noisy)) == bench_parsers._jsonable(parse(html))
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from nbp.services import redis_queue
+from nbp.services.redis_queue import LeaseLost, WorkQueue, run_worker
+
+
+def _queue(lease_s=300.0):
+    return WorkQueue(fakeredis.FakeRedis(), "run-1", lease_s=lease_s)
+
+
+def _row(name, doc):
+    return {"name": name, "doc_number": doc}
+
+
+def test_worker_pages_reach_the_stream_and_ack_clears_them():
+    q = _queue()
+    assert q.enqueue(["A", "B"], meta={"window_days": 30}) == 2
+    assert q.meta() == {"window_days": 30}
+
+    def fetch_recent(*, window_days, prefixes, concurrency, resume, on_page):
+        (unit,) = prefixes
+        on_page(unit, 1, [_row(unit + " ONE LLC", unit + "1")], {"name": unit + " ONE LLC", "doc": unit + "1"})
+        on_page(unit, 1, [], None, done=True)
+
+    stats = run_worker(q, fetch_recent, window_days=30)
+    assert stats == {"finished": 2, "pages": 4, "rows": 2, "lost": 0, "released": 0}
+    assert q.remaining() == 0
+    assert q.counts()["done"] == 2
+
+    pages = q.read_results(count=10, block_s=0)
+    assert [(p["unit"], p["page"], p["done"]) for _, p in pages] == [
+        ("A", 1, False), ("A", 1, True), ("B", 1, False), ("B", 1, True)]
+    assert pages[0][1]["rows"] == [_row("A ONE LLC", "A1")]
+
+    # delivered but not acked: a restarted ingester re-reads them
+    assert len(q.read_results(count=10, block_s=0, pending=True)) == 4
+    q.ack([msg_id for msg_id, _ in pages])
+    assert q.read_results(count=10, block_s=0, pending=True) == []
+    assert q.counts()["stream"] == 0
+
+
+def test_expired_lease_is_taken_over_with_its_resume_point():
+    q = _queue(lease_s=0.05)
+    q.enqueue(["A"])
+    first = q.lease()
+    assert q.lease() is None  # still leased
+    q.publish(first, 3, [_row("A ONE LLC", "A1")], {"name": "A ONE LLC", "doc": "A1"})
+
+    time.sleep(0.1)
+    second = q.lease()
+    assert second.unit == "A" and second.attempts == 2
+    assert second.resume == {"page": 3, "last_name": "A ONE LLC", "last_doc": "A1"}
+
+
+def test_stale_worker_cannot_publish_heartbeat_or_release():
+    q = _queue(lease_s=0.05)
+    q.enqueue(["A"])
+    stale = q.lease()
+    time.sleep(0.1)
+    fresh = q.lease()
+    q.publish(fresh, 5, [], {"name": "AZ LLC", "doc": "A9"})
+
+    with pytest.raises(LeaseLost):
+        q.publish(stale, 1, [_row("A ONE LLC", "A1")], None, done=True)
+    assert stale.lost
+    assert not q.heartbeat(stale)
+    q.release(stale)  # a no-op for the stale worker
+
+    # the unit is still leased to the fresh worker, its resume point intact and nothing stale in the stream
+    assert q.counts()["done"] == 0 and q.counts()["leased"] == 1
+    assert [p["page"] for _, p in q.read_results(count=10, block_s=0)] == [5]
+    q.publish(fresh, 6, [], None, done=True)
+    assert q.remaining() == 0
+
+
+def test_unit_fails_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(redis_queue, "MAX_ATTEMPTS", 1)
+    q = _queue(lease_s=0.05)
+    q.enqueue(["A"])
+    assert q.lease().attempts == 1
+    time.sleep(0.1)
+    assert q.lease() is None
+    assert q.counts()["failed"] == 1 and q.remaining() == 0
@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+from datetime import date
+
+import pytest
+
+from nbp.services.spool import SpoolReader, SpoolWriter, ingest_spool, pending
+
+
+def _page(w, unit, page_no, docs, done=False):
+    rows = [{"doc_number": d, "filing_date": date(2024, 5, 1)} for d in docs]
+    w.on_page(unit, page_no, rows, {"name": docs[-1], "doc": docs[-1]} if docs else None, done=done)
+
+
+def _spool(tmp_path, segment_bytes=1 << 20):
+    w = SpoolWriter(str(tmp_path), "run-1", segment_bytes=segment_bytes)
+    _page(w, "A", 1, ["A1", "A2"])
+    _page(w, "A", 2, ["A3"], done=True)
+    _page(w, "B", 1, ["B1", "B2"])
+    _page(w, "B", 2, ["B3", "B4"], done=True)
+    return w
+
+
+def _docs(batches):
+    return [r["doc_number"] for rows, _ in batches for r in rows]
+
+
+def test_ingest_commits_the_offset_and_does_not_reread(tmp_path):
+    w = _spool(tmp_path, segment_bytes=1)  # one page per segment
+    w.close()
+    batches = []
+    stats = ingest_spool(str(tmp_path), "run-1", lambda rows, marks: batches.append((rows, marks)),
+                         batch_size=3, follow=False)
+
+    assert stats == {"pages": 4, "rows": 7, "batches": 2}
+    assert _docs(batches) == ["A1", "A2", "A3", "B1", "B2", "B3", "B4"]
+    assert batches[0][0][0]["filing_date"] == date(2024, 5, 1)
+    assert batches[0][1]["A"] == {"page": 2, "last_row": {"name": "A3", "doc": "A3"}, "rows": 3, "done": True}
+
+    with open(os.path.join(tmp_path, "run-1", "committed.json")) as f:
+        committed = json.load(f)
+    assert (committed["segment"], committed["offset"]) == SpoolReader(str(tmp_path), "run-1").pos
+    assert not pending(str(tmp_path), "run-1")
+    assert len(os.listdir(os.path.join(tmp_path, "run-1"))) == 3  # last segment, committed.json, CLOSED
+
+
+def test_failed_write_is_replayed_without_duplicates(tmp_path):
+    _spool(tmp_path).close()
+    written = []
+
+    def fail_second(rows, marks):
+        if written:
+            raise RuntimeError("db down")
+        written.append((rows, marks))
+
+    with pytest.raises(RuntimeError):
+        ingest_spool(str(tmp_path), "run-1", fail_second, batch_size=3, follow=False)
+    assert _docs(written) == ["A1", "A2", "A3"]
+    assert pending(str(tmp_path), "run-1")
+
+    ingest_spool(str(tmp_path), "run-1", lambda rows, marks: written.append((rows, marks)),
+                 batch_size=3, follow=False)
+    assert _docs(written) == ["A1", "A2", "A3", "B1", "B2", "B3", "B4"]
+    assert not pending(str(tmp_path), "run-1")
+
+
+def test_follow_tails_until_closed(tmp_path):
+    w = SpoolWriter(str(tmp_path), "run-1")
+    batches = []
+
+    def crawl():
+        _page(w, "A", 1, ["A1"], done=True)
+        w.close()
+
+    t = threading.Thread(target=crawl)
+    t.start()
+    stats = ingest_spool(str(tmp_path), "run-1", lambda rows, marks: batches.append((rows, marks)),
+                         batch_size=100, poll_s=0.01, idle_exit_s=float("inf"))
+    t.join()
+    assert stats["rows"] == 1 and _docs(batches) == ["A1"]
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from nbp.services import scrape_sunbiz_http as http_engine
+from nbp.services import scrape_sunbiz_playwright as pw
+from nbp.services.pipeline import PipelineStopped
+
+
+def test_http_engine_reraises_stop_and_skips_queued_units(monkeypatch):
+    started = []
+
+    def fake_crawl(s, pool, pref, window_days, resume, on_page):
+        started.append(pref)
+        raise PipelineStopped("writer stopped")
+
+    monkeypatch.setattr(http_engine, "_crawl_one_prefix_http", fake_crawl)
+    with pytest.raises(PipelineStopped):
+        http_engine.fetch_recent_by_name_prefixes_http(
+            window_days=30, prefixes=["A", "B", "C", "D"], concurrency=1, on_page=lambda *a, **k: None)
+    assert started == ["A"]
+
+
+class _Browser:
+    async def close(self):
+        pass
+
+
+class _Chromium:
+    async def launch(self, headless=True):
+        return _Browser()
+
+
+class _Playwright:
+    chromium = _Chromium()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_async_engine_reraises_stop_and_cancels_other_workers(monkeypatch):
+    started, cancelled = [], []
+
+    async def fake_crawl(pool, pref, window_days, resume, on_page):
+        started.append(pref)
+        if pref == "A":
+            await asyncio.sleep(0)
+            raise PipelineStopped("writer stopped")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(pref)
+            raise
+        return []
+
+    monkeypatch.setattr(pw, "async_playwright", _Playwright)
+    monkeypatch.setattr(pw, "_crawl_one_prefix_async", fake_crawl)
+    with pytest.raises(PipelineStopped):
+        asyncio.run(pw._fetch_recent_async(30, ["A", "B", "C", "D"], 2, {}, lambda *a, **k: None))
+    assert started == ["A", "B"]
+    assert cancelled == ["B"]
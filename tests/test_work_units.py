@@ -0,0 +1,46 @@
+from bisect import bisect_left
+
+from nbp.services.scrape_sunbiz_playwright import _search_start, _select_rows
+from nbp.services.work_units import plan_work_units
+
+# Sunbiz lists names in plain character order: space and punctuation sort before digits and letters
+NAMES = sorted([
+    "RZ HOLDINGS LLC", "S", "S & S PLUMBING LLC", "S-TEK SOLUTIONS INC", "S.A.M. TRUCKING LLC",
+    "S0LAR GROUP LLC", "S1 CAPITAL LLC", "SA HOLDINGS LLC", "SAB ENTERPRISES INC",
+    "SEA BREEZE LLC", "SS MARINE LLC", "SUN COAST LLC", "SZ PARTNERS LLC", "T & T LLC",
+])
+ROWS = [{"name": n, "doc": f"L24{i:09d}", "status": "Active"} for i, n in enumerate(NAMES)]
+PER_PAGE = 2
+
+
+def _crawl(unit):
+    """Names a unit keeps: results pages from its search term until the prefix rolls off."""
+    term, _ = _search_start(unit, None)
+    start = bisect_left(NAMES, term)
+    kept, pages_seen = [], 0
+    while start + pages_seen * PER_PAGE < len(ROWS):
+        page = ROWS[start + pages_seen * PER_PAGE:start + (pages_seen + 1) * PER_PAGE]
+        rows = _select_rows(page, unit, pages_seen)
+        if rows is None:
+            break
+        kept.extend(r["name"] for r in rows)
+        pages_seen += 1
+    return kept
+
+
+def test_split_units_cover_punctuated_names():
+    units = plan_work_units(["S"], {"S": 100}, target_pages=5)
+    assert units[0] == "S-" and "S0" in units and "SZ" in units
+    seen = set()
+    for u in units:
+        seen.update(_crawl(u))
+    assert seen == {n for n in NAMES if n.startswith("S")}
+
+
+def test_leading_unit_stops_at_first_sub_prefix():
+    assert _crawl("S-") == ["S", "S & S PLUMBING LLC", "S-TEK SOLUTIONS INC", "S.A.M. TRUCKING LLC"]
+
+
+def test_unsplit_prefix_unchanged():
+    assert plan_work_units(["S"], {"S": 3}, target_pages=5) == ["S"]
+    assert set(_crawl("S")) == {n for n in NAMES if n.startswith("S")}